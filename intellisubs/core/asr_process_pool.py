@@ -0,0 +1,136 @@
+# Multi-process ASR executor for folder-scale batches
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# State of a worker process (set by _init_worker)
+_worker_manager = None
+
+
+def partition_cpu_threads(num_workers: int, cpu_count: int = None) -> int:
+    """Returns the `cpu_threads` per worker so that all workers together use each core once."""
+    cpu_count = cpu_count or os.cpu_count() or 1
+    return max(1, cpu_count // max(1, num_workers))
+
+
+def build_worker_config(config: dict, num_workers: int, tuned_settings: Optional[Dict[str, Any]] = None,
+                        cpu_count: int = None) -> dict:
+    """
+    Derives the configuration of one worker process from the application config.
+
+    Every worker gets an explicit compute type (the calibrated one for "auto") and an equal share
+    of the CPU threads with a single CTranslate2 worker, so N processes never oversubscribe the
+    machine. LLM enhancement is not part of the ASR workflow and is disabled in workers.
+
+    Args:
+        config (dict): Application config.
+        num_workers (int): Number of worker processes.
+        tuned_settings (dict, optional): Calibrated settings (`ASRTuningStore.get`) for the model and device.
+        cpu_count (int, optional): Number of cores; defaults to `os.cpu_count()`.
+
+    Returns:
+        dict: Config for the `WorkflowManager` of a worker.
+    """
+    worker_config = dict(config)
+    compute_type = worker_config.get("asr_compute_type", "auto")
+    if compute_type == "auto":
+        compute_type = (tuned_settings or {}).get("compute_type", "float32")
+    worker_config["asr_compute_type"] = compute_type
+    worker_config["asr_cpu_threads"] = partition_cpu_threads(num_workers, cpu_count)
+    worker_config["asr_num_workers"] = 1
+    worker_config["asr_parallel_chunks"] = 0 # Files are the unit of parallelism here
+    worker_config["asr_model_pool_max_mb"] = 0 # One resident model per worker
+    worker_config["llm_enabled"] = False
+    return worker_config
+
+
+def _init_worker(worker_config: dict, log_level: int):
+    """Process initializer: loads one `WorkflowManager` (and its Whisper model) per worker."""
+    global _worker_manager
+    import atexit
+    from .workflow_manager import WorkflowManager
+
+    logging.basicConfig(level=log_level, format=f"%(asctime)s - ASRWorker[{os.getpid()}] - %(levelname)s - %(message)s")
+    _worker_manager = WorkflowManager(config=worker_config, logger=logging.getLogger("ASRWorker"))
+    atexit.register(_worker_manager.close_resources_sync)
+
+
+def _process_file(file_path: str, process_kwargs: dict) -> Tuple[str, list, float]:
+    """Runs the full subtitle workflow for one file inside a worker process."""
+    started_at = time.perf_counter()
+    preview_text, structured_data = _worker_manager.process_audio_to_subtitle(audio_video_path=file_path, **process_kwargs)
+    return preview_text, structured_data, time.perf_counter() - started_at
+
+
+class ASRProcessPool:
+    """
+    Transcribes the files of a batch in N worker processes.
+
+    Each worker holds its own `WorkflowManager`/`WhisperService` with `cpu_threads` partitioned
+    across the workers (see `build_worker_config`), so one file per core group is processed at a
+    time instead of one file per machine. Workers are started with the "spawn" method, which is
+    safe next to the Tk main loop and background threads of the parent process.
+    """
+
+    def __init__(self, config: dict, num_workers: int, tuned_settings: Optional[Dict[str, Any]] = None,
+                 logger: logging.Logger = None):
+        """
+        Args:
+            config (dict): Application config; the worker config is derived with `build_worker_config`.
+            num_workers (int): Number of worker processes.
+            tuned_settings (dict, optional): Calibrated settings for the configured model and device.
+            logger (logging.Logger, optional): Logger instance.
+        """
+        self.logger = logger if logger else logging.getLogger(self.__class__.__name__)
+        self.num_workers = max(1, int(num_workers))
+        self.worker_config = build_worker_config(config, self.num_workers, tuned_settings)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.num_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.worker_config, self.logger.getEffectiveLevel())
+        )
+        self.logger.info(f"ASRProcessPool: 启动 {self.num_workers} 个ASR工作进程 "
+                         f"(每个 cpu_threads={self.worker_config['asr_cpu_threads']}, compute_type={self.worker_config['asr_compute_type']})。")
+
+    def submit(self, file_path: str, **process_kwargs) -> Future:
+        """
+        Queues one file. `process_kwargs` are passed to `WorkflowManager.process_audio_to_subtitle`.
+
+        Returns:
+            Future: Resolves to (preview_text, structured_subtitle_data, elapsed_sec).
+        """
+        return self._executor.submit(_process_file, file_path, process_kwargs)
+
+    def process_batch(self, jobs: List[Tuple[str, dict]]) -> Iterator[Tuple[str, Optional[tuple], Optional[Exception]]]:
+        """
+        Submits all jobs (in order, so longest-first plans are respected) and yields results as they finish.
+
+        Args:
+            jobs (list[tuple[str, dict]]): (file_path, process_kwargs) pairs.
+
+        Yields:
+            tuple[str, tuple | None, Exception | None]: (file_path, result of `submit`, error).
+        """
+        futures = {self.submit(file_path, **process_kwargs): file_path for file_path, process_kwargs in jobs}
+        for future in as_completed(futures):
+            file_path = futures[future]
+            try:
+                yield file_path, future.result(), None
+            except Exception as e:
+                self.logger.error(f"ASRProcessPool: 处理 {file_path} 失败: {e}")
+                yield file_path, None, e
+
+    def shutdown(self, cancel_pending: bool = True):
+        """Stops the workers; queued files that have not started are dropped if `cancel_pending`."""
+        self._executor.shutdown(wait=True, cancel_futures=cancel_pending)
+        self.logger.info("ASRProcessPool: 工作进程已关闭。")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
@@ -7,12 +7,12 @@ class BaseASRService(ABC):
         self.logger = logger if logger else logging.getLogger(self.__class__.__name__)
 
     @abstractmethod
-    def transcribe(self, audio_path: str) -> list:
+    def transcribe(self, audio) -> list:
         """
-        转录给定的音频文件。
+        转录给定的音频。
 
         Args:
-            audio_path (str): 音频文件的路径。
+            audio (str | np.ndarray): 音频文件的路径，或 16kHz 单声道 float32 采样数组。
 
         Returns:
             list: 转录的片段列表，每个片段是一个字典
@@ -31,4 +31,27 @@ class BaseASRService(ABC):
             model_name (str): 要使用的 ASR 模型名称（例如，“small”、“medium”）。
             device (str): 处理设备（“cpu”、“cuda”、“mps”）。
         """
-        pass
\ No newline at end of file
+        pass
+
+    def detect_language(self, audio) -> tuple:
+        """
+        从一段短音频中检测语言。
+
+        默认实现不支持检测，返回 `(None, 0.0)`，调用方应让 `transcribe` 自行检测语言。
+
+        Args:
+            audio (np.ndarray): 16kHz 单声道 float32 采样数组（通常为 30 秒以内的语音片段）。
+
+        Returns:
+            tuple[str | None, float]: (语言代码, 概率)。
+        """
+        return None, 0.0
+
+    def cache_signature(self) -> dict:
+        """
+        返回决定转录结果的设置（模型、计算精度、解码参数等），用作 ASR 结果缓存键的一部分。
+
+        Returns:
+            dict: 可 JSON 序列化的设置字典。
+        """
+        return {"backend": self.__class__.__name__}
@@ -0,0 +1,226 @@
+# CPU auto-tuning of CTranslate2 runtime settings (compute_type, cpu_threads, num_workers)
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from intellisubs.utils.config_manager import get_user_cache_dir
+
+TUNING_FILENAME = "asr_tuning.json"
+DEFAULT_COMPUTE_TYPES = ("int8", "int8_float32", "float32")
+REFERENCE_COMPUTE_TYPE = "float32"
+SAMPLE_RATE = 16000
+
+
+def default_thread_counts(cpu_count: int = None) -> List[int]:
+    """Returns the `cpu_threads` values worth trying on this machine (a quarter, half and all cores)."""
+    cpu_count = cpu_count or os.cpu_count() or 1
+    return sorted({max(1, cpu_count // 4), max(1, cpu_count // 2), cpu_count})
+
+
+def char_error_rate(reference: str, hypothesis: str) -> float:
+    """Character-level edit distance between two transcripts, normalized by the reference length."""
+    reference = "".join(reference.split())
+    hypothesis = "".join(hypothesis.split())
+    if not reference:
+        return 0.0 if not hypothesis else 1.0
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_char in enumerate(reference, 1):
+        current = [i]
+        for j, hyp_char in enumerate(hypothesis, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_char != hyp_char)))
+        previous = current
+    return previous[-1] / len(reference)
+
+
+class ASRTuningStore:
+    """
+    Persists the tuned runtime settings per (model, device) for this machine.
+
+    The CPU count is part of the key, so a settings file copied to a different machine is ignored
+    instead of applying thread counts tuned for other hardware.
+    """
+
+    def __init__(self, path: str = None, logger: logging.Logger = None):
+        """
+        Args:
+            path (str, optional): JSON file holding the tuned settings. Defaults to the per-user cache dir.
+            logger (logging.Logger, optional): Logger instance.
+        """
+        self.logger = logger if logger else logging.getLogger(self.__class__.__name__)
+        self.path = path or os.path.join(get_user_cache_dir(), TUNING_FILENAME)
+        self._lock = threading.Lock()
+
+    def get(self, model_name: str, device: str) -> Optional[Dict[str, Any]]:
+        """Returns the tuned {"compute_type", "cpu_threads", "num_workers", ...} or None if not calibrated."""
+        return self._load().get(self._key(model_name, device))
+
+    def put(self, model_name: str, device: str, settings: Dict[str, Any]):
+        """Stores the tuned settings for a model and device."""
+        with self._lock:
+            data = self._load()
+            data[self._key(model_name, device)] = settings
+            try:
+                partial_path = f"{self.path}.partial"
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                with open(partial_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f, indent=2, ensure_ascii=False)
+                os.replace(partial_path, self.path)
+            except OSError as e:
+                self.logger.warning(f"无法保存ASR调优结果 {self.path}: {e}")
+                return
+        self.logger.info(f"ASR调优结果已保存: {model_name}/{device} -> {settings} ({self.path})")
+
+    def _load(self) -> Dict[str, Any]:
+        if not os.path.isfile(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"无法读取ASR调优文件 {self.path}: {e}")
+            return {}
+
+    @staticmethod
+    def _key(model_name: str, device: str) -> str:
+        return f"{model_name}|{device}|{os.cpu_count()}"
+
+
+class ASRCalibrator:
+    """
+    Benchmarks a short clip across compute types, `cpu_threads` and `num_workers` and picks the
+    fastest configuration whose transcript stays within `tolerance` (character error rate) of the
+    float32 reference.
+
+    `num_workers` only helps when several transcriptions run concurrently, so each candidate runs
+    `num_workers` transcriptions of the clip in parallel and is scored by its real-time factor
+    (wall time per second of transcribed audio).
+    """
+
+    def __init__(self, model_name: str, device: str = "cpu", language: str = None, tolerance: float = 0.05,
+                 model_factory: Callable[..., Any] = None, logger: logging.Logger = None):
+        """
+        Args:
+            model_name (str): Whisper model to tune (e.g. "small").
+            device (str): Device to tune for.
+            language (str, optional): Language of the clip; None lets Whisper detect it.
+            tolerance (float): Maximum character error rate relative to the float32 transcript.
+            model_factory (Callable, optional): Called as `model_factory(model_name, device=..., compute_type=...,
+                                                cpu_threads=..., num_workers=...)`; defaults to `WhisperModel`.
+            logger (logging.Logger, optional): Logger instance.
+        """
+        self.logger = logger if logger else logging.getLogger(self.__class__.__name__)
+        self.model_name = model_name
+        self.device = device
+        self.language = language
+        self.tolerance = tolerance
+        if model_factory is None:
+            from faster_whisper import WhisperModel
+            model_factory = WhisperModel
+        self.model_factory = model_factory
+
+    def run(self, audio: np.ndarray, compute_types: Sequence[str] = DEFAULT_COMPUTE_TYPES,
+            thread_counts: Sequence[int] = None, worker_counts: Sequence[int] = (1, 2)) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Runs the benchmark grid.
+
+        Args:
+            audio (np.ndarray): Mono float32 samples at 16 kHz (a 20-60 s clip is enough).
+            compute_types (Sequence[str]): Compute types to try.
+            thread_counts (Sequence[int], optional): `cpu_threads` values; defaults to `default_thread_counts()`.
+            worker_counts (Sequence[int]): `num_workers` values.
+
+        Returns:
+            tuple[dict | None, list[dict]]: (best settings or None if nothing met the tolerance, all results).
+        """
+        thread_counts = list(thread_counts) if thread_counts else default_thread_counts()
+        clip_sec = len(audio) / SAMPLE_RATE
+        self.logger.info(f"ASR调优开始: 模型 {self.model_name}/{self.device}, 片段 {clip_sec:.1f}s, "
+                         f"compute_type={list(compute_types)}, cpu_threads={thread_counts}, num_workers={list(worker_counts)}")
+
+        reference_text = self._transcribe_text(self._load(REFERENCE_COMPUTE_TYPE, max(thread_counts), 1), audio)
+        results = []
+        for compute_type in compute_types:
+            for cpu_threads in thread_counts:
+                for num_workers in worker_counts:
+                    result = self._benchmark(audio, reference_text, compute_type, cpu_threads, num_workers)
+                    results.append(result)
+
+        accepted = [r for r in results if r.get("error_rate") is not None and r["error_rate"] <= self.tolerance]
+        if not accepted:
+            self.logger.warning("ASR调优: 没有配置满足精度容差，保持默认设置。")
+            return None, results
+        best = min(accepted, key=lambda r: r["rtf"])
+        self.logger.info(f"ASR调优完成: 最佳配置 {best}")
+        return {key: best[key] for key in ("compute_type", "cpu_threads", "num_workers", "rtf", "error_rate")}, results
+
+    def _benchmark(self, audio: np.ndarray, reference_text: str, compute_type: str, cpu_threads: int,
+                   num_workers: int) -> Dict[str, Any]:
+        result = {"compute_type": compute_type, "cpu_threads": cpu_threads, "num_workers": num_workers,
+                  "rtf": None, "error_rate": None}
+        try:
+            model = self._load(compute_type, cpu_threads, num_workers)
+            self._transcribe_text(model, audio[:SAMPLE_RATE]) # Warm-up: first call allocates buffers
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=num_workers) as executor:
+                texts = list(executor.map(lambda _: self._transcribe_text(model, audio), range(num_workers)))
+            elapsed = time.perf_counter() - start
+        except Exception as e:
+            self.logger.warning(f"ASR调优: 配置 {compute_type}/{cpu_threads} 线程/{num_workers} worker 不可用: {e}")
+            return result
+        result["rtf"] = elapsed / (num_workers * len(audio) / SAMPLE_RATE)
+        result["error_rate"] = char_error_rate(reference_text, texts[0])
+        self.logger.info(f"ASR调优: {compute_type}, cpu_threads={cpu_threads}, num_workers={num_workers} -> "
+                         f"RTF {result['rtf']:.3f}, 字符错误率 {result['error_rate']:.3f}")
+        return result
+
+    def _load(self, compute_type: str, cpu_threads: int, num_workers: int):
+        return self.model_factory(self.model_name, device=self.device, compute_type=compute_type,
+                                  cpu_threads=cpu_threads, num_workers=num_workers)
+
+    def _transcribe_text(self, model, audio: np.ndarray) -> str:
+        segments, _ = model.transcribe(audio, beam_size=5, language=self.language)
+        return " ".join(segment.text.strip() for segment in segments)
+
+
+def main(argv: Sequence[str] = None):
+    """Command line entry point: `python -m intellisubs.core.asr_services.calibration <clip>`."""
+    from intellisubs.core.audio_processing.processor import AudioProcessor
+
+    parser = argparse.ArgumentParser(description="Benchmark faster-whisper runtime settings on this machine and save the fastest one.")
+    parser.add_argument("clip", help="Audio/video file to benchmark with")
+    parser.add_argument("--model", default="small", help="Whisper model (default: small)")
+    parser.add_argument("--device", default="cpu", help="Device (default: cpu)")
+    parser.add_argument("--language", default=None, help="Language of the clip (default: auto-detect)")
+    parser.add_argument("--seconds", type=float, default=30.0, help="Length of the clip to use (default: 30)")
+    parser.add_argument("--tolerance", type=float, default=0.05, help="Maximum character error rate vs. float32 (default: 0.05)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2], help="num_workers values to try (default: 1 2)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    logger = logging.getLogger("ASRCalibration")
+    audio = AudioProcessor(logger=logger).decode_audio_to_array(args.clip)[:int(args.seconds * SAMPLE_RATE)]
+    calibrator = ASRCalibrator(args.model, device=args.device, language=args.language, tolerance=args.tolerance, logger=logger)
+    best, results = calibrator.run(audio, worker_counts=args.workers)
+
+    print(f"{'compute_type':<14}{'cpu_threads':>12}{'num_workers':>12}{'RTF':>8}{'CER':>8}")
+    for r in results:
+        rtf = f"{r['rtf']:.3f}" if r["rtf"] is not None else "-"
+        cer = f"{r['error_rate']:.3f}" if r["error_rate"] is not None else "-"
+        print(f"{r['compute_type']:<14}{r['cpu_threads']:>12}{r['num_workers']:>12}{rtf:>8}{cer:>8}")
+    if best is None:
+        print("No configuration met the accuracy tolerance; nothing was saved.")
+        return 1
+    ASRTuningStore(logger=logger).put(args.model, args.device, best)
+    print(f"Saved: {best}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
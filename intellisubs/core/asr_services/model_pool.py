@@ -0,0 +1,180 @@
+# LRU pool of loaded ASR models with a memory budget
+import gc
+import logging
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Tuple
+
+# Approximate parameter counts (millions) of the Whisper checkpoints, used to estimate resident memory
+WHISPER_MODEL_PARAMS_M = {
+    "tiny": 39,
+    "base": 74,
+    "small": 244,
+    "medium": 769,
+    "large": 1550,
+    "large-v1": 1550,
+    "large-v2": 1550,
+    "large-v3": 1550,
+    "large-v3-turbo": 809,
+    "turbo": 809,
+    "distil-small": 166,
+    "distil-medium": 394,
+    "distil-large-v2": 756,
+    "distil-large-v3": 756,
+}
+RUNTIME_OVERHEAD_FACTOR = 1.2 # Activations, tokenizer and allocator slack on top of the weights
+
+ModelKey = Tuple[str, str, str, str]
+
+
+def estimate_model_memory_mb(model_name: str, compute_type: str = "float32") -> float:
+    """
+    Estimates the resident memory of a loaded Whisper model.
+
+    Local model directories are measured on disk; known checkpoint names use their parameter
+    count and the bytes per weight of `compute_type`. Unknown names count as "medium".
+
+    Args:
+        model_name (str): Model size name (e.g. "small") or path of a converted model directory.
+        compute_type (str): CTranslate2 compute type (e.g. "int8", "float16", "float32").
+
+    Returns:
+        float: Estimated memory in megabytes.
+    """
+    if os.path.isdir(model_name):
+        size_bytes = 0
+        for root, _, files in os.walk(model_name):
+            size_bytes += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+        return size_bytes / (1024 * 1024) * RUNTIME_OVERHEAD_FACTOR
+
+    base_name = model_name.lower()
+    if base_name.endswith(".en"):
+        base_name = base_name[:-3]
+    params_m = WHISPER_MODEL_PARAMS_M.get(base_name, WHISPER_MODEL_PARAMS_M["medium"])
+    compute_type = (compute_type or "").lower()
+    if compute_type.startswith("int8"):
+        bytes_per_param = 1
+    elif "16" in compute_type:
+        bytes_per_param = 2
+    else:
+        bytes_per_param = 4
+    return params_m * 1e6 * bytes_per_param / (1024 * 1024) * RUNTIME_OVERHEAD_FACTOR
+
+
+class WhisperModelPool:
+    """
+    Keeps several loaded models resident, keyed by (model_name, device, compute_type, revision).
+
+    `revision` tells apart different weights under the same path (e.g. a model re-imported or
+    re-quantized in the local model store); it is only part of the key, not passed to `loader`.
+
+    Switching back to a model that is still in the pool is free. When the estimated memory of
+    the resident models would exceed `max_memory_mb`, the least-recently-used models are evicted
+    before the new one is loaded. The requested model is always loaded, so a budget of 0 keeps
+    exactly one model (the behaviour of a plain reload).
+
+    A pinned model (the one a service is currently using, see `pin`) is never evicted, since
+    dropping it from the pool would not free it. Loading a second model next to a pinned one
+    may then exceed the budget until `trim` is called.
+    """
+
+    def __init__(self, loader: Callable[[str, str, str], Any], max_memory_mb: float = 4096,
+                 estimate_fn: Callable[[str, str], float] = estimate_model_memory_mb, logger: logging.Logger = None):
+        """
+        Args:
+            loader (Callable[[str, str, str], Any]): Loads a model as `loader(model_name, device, compute_type)`.
+            max_memory_mb (float): Memory budget for all resident models in megabytes.
+            estimate_fn (Callable[[str, str], float]): Estimates a model's memory from (model_name, compute_type).
+            logger (logging.Logger, optional): Logger instance.
+        """
+        self.logger = logger if logger else logging.getLogger(self.__class__.__name__)
+        self.loader = loader
+        self.max_memory_mb = max_memory_mb
+        self.estimate_fn = estimate_fn
+        self._models: "OrderedDict[ModelKey, Tuple[Any, float]]" = OrderedDict()
+        self._pinned = set()
+        self._lock = threading.Lock()
+
+    def acquire(self, model_name: str, device: str, compute_type: str, revision: str = "") -> Any:
+        """
+        Returns the loaded model for the key, loading it (and evicting others) if needed.
+
+        Raises:
+            Exception: Whatever `loader` raises; the pool is left unchanged in that case.
+        """
+        key = (model_name, device, compute_type, revision)
+        with self._lock:
+            entry = self._models.get(key)
+            if entry is not None:
+                self._models.move_to_end(key)
+                self.logger.info(f"模型池命中: {self._describe(key)} (常驻 {len(self._models)} 个模型)")
+                return entry[0]
+
+            memory_mb = self.estimate_fn(model_name, compute_type)
+            self._evict(incoming_mb=memory_mb) # Make room first so peak memory stays within the budget
+            load_start = time.perf_counter()
+            model = self.loader(model_name, device, compute_type)
+            self._models[key] = (model, memory_mb)
+            self.logger.info(f"模型池加载: {self._describe(key)} 用时 {time.perf_counter() - load_start:.2f}s "
+                             f"(估计 {memory_mb:.0f} MB, 共 {self.resident_memory_mb:.0f}/{self.max_memory_mb:.0f} MB)")
+            return model
+
+    def pin(self, model_name: str, device: str, compute_type: str, revision: str = ""):
+        """Protects a model from eviction while it is in use outside the pool."""
+        with self._lock:
+            self._pinned.add((model_name, device, compute_type, revision))
+
+    def unpin(self, model_name: str, device: str, compute_type: str, revision: str = ""):
+        """Makes a pinned model evictable again."""
+        with self._lock:
+            self._pinned.discard((model_name, device, compute_type, revision))
+
+    def trim(self):
+        """Evicts unpinned models until the resident models fit the budget (e.g. after using an extra model)."""
+        with self._lock:
+            self._evict()
+
+    @property
+    def resident_memory_mb(self) -> float:
+        """Estimated memory of all resident models in megabytes."""
+        return sum(memory_mb for _, memory_mb in self._models.values())
+
+    def resident_keys(self) -> list:
+        """Returns the resident keys from least to most recently used."""
+        with self._lock:
+            return list(self._models.keys())
+
+    def clear(self):
+        """Drops every resident model."""
+        with self._lock:
+            self._models.clear()
+            self._pinned.clear()
+        gc.collect()
+
+    def _evict(self, incoming_mb: float = 0.0):
+        """Drops least-recently-used models until they fit the memory budget together with `incoming_mb`."""
+        for key in list(self._models.keys()):
+            if self.resident_memory_mb + incoming_mb <= self.max_memory_mb:
+                break
+            if key in self._pinned:
+                continue
+            evict_start = time.perf_counter()
+            model, memory_mb = self._models.pop(key)
+            try:
+                model_ref = weakref.ref(model)
+            except TypeError:
+                model_ref = None
+            del model
+            gc.collect() # CTranslate2 releases the weights once the model object is collected
+            if model_ref is not None and model_ref() is not None:
+                self.logger.warning(f"模型池淘汰: {self._describe(key)} 已移出模型池，但仍被其他对象引用，内存未释放")
+            else:
+                self.logger.info(f"模型池淘汰: {self._describe(key)} (释放约 {memory_mb:.0f} MB) 用时 {time.perf_counter() - evict_start:.2f}s")
+
+    @staticmethod
+    def _describe(key: ModelKey) -> str:
+        model_name, device, compute_type, revision = key
+        return f"{model_name}/{device}/{compute_type}" + (f"@{revision}" if revision else "")
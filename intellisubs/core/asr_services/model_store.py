@@ -0,0 +1,534 @@
+# Local store of imported faster-whisper (CTranslate2) models for offline use
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import struct
+import tarfile
+import tempfile
+import threading
+import time
+import zipfile
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from intellisubs.utils.config_manager import get_user_cache_dir
+
+MODEL_STORE_DIRNAME = "models"
+MANIFEST_FILENAME = "intellisubs_manifest.json"
+CHECKSUM_FILENAMES = ("SHA256SUMS", "checksums.sha256") # sha256sum-style lists shipped with a bundle
+REQUIRED_MODEL_FILES = ("model.bin", "config.json")
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz")
+QUANTIZATIONS = ("int8",)
+MODEL_NAME_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]*$")
+
+# CTranslate2 model.bin layout (ctranslate2/specs/model_spec.py, binary version 6)
+CT2_BINARY_VERSION = 6
+CT2_DTYPES = ("float32", "int8", "int16", "int32", "float16", "bfloat16") # Index is the type id in the file
+CT2_FLOAT_DTYPES = ("float32", "float16", "bfloat16")
+
+
+def file_sha256(path: str, chunk_bytes: int = 1 << 20) -> str:
+    """Returns the hex SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_bytes), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_checksum_file(path: str) -> Dict[str, str]:
+    """
+    Parses a `sha256sum` output file ("<hash>  <relative path>" per line).
+
+    Returns:
+        dict[str, str]: Relative path (with "/" separators) -> lowercase hex digest.
+    """
+    checksums = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            digest, _, name = line.partition(" ")
+            name = name.strip().lstrip("*")
+            if name.startswith("./"):
+                name = name[2:]
+            checksums[name.replace("\\", "/")] = digest.lower()
+    return checksums
+
+
+def find_model_dir(root: str) -> str:
+    """
+    Finds the CTranslate2 model directory (the one holding model.bin and config.json) below `root`.
+
+    Raises:
+        ValueError: If there is no model directory or more than one.
+    """
+    found = [dirpath for dirpath, _, files in os.walk(root) if all(name in files for name in REQUIRED_MODEL_FILES)]
+    if not found:
+        raise ValueError(f"未找到CTranslate2模型目录 (需要 {', '.join(REQUIRED_MODEL_FILES)}): {root}")
+    if len(found) > 1:
+        raise ValueError(f"包含多个模型目录，请分别导入: {', '.join(sorted(found))}")
+    return found[0]
+
+
+def _model_files(model_dir: str) -> List[str]:
+    """
+    Relative paths ("/" separators) of the files of a model, without the store's own manifest and
+    checksum lists and without hidden entries (e.g. the .cache folder of Hugging Face downloads).
+    """
+    files = []
+    for dirpath, dirnames, names in os.walk(model_dir):
+        dirnames[:] = [name for name in dirnames if not name.startswith(".")]
+        for name in names:
+            if name.startswith("."):
+                continue
+            rel_path = os.path.relpath(os.path.join(dirpath, name), model_dir).replace(os.sep, "/")
+            if rel_path not in (MANIFEST_FILENAME,) + CHECKSUM_FILENAMES:
+                files.append(rel_path)
+    return sorted(files)
+
+
+def _hash_files(model_dir: str) -> Dict[str, Dict[str, Any]]:
+    return {rel_path: {"sha256": file_sha256(os.path.join(model_dir, rel_path)),
+                       "size": os.path.getsize(os.path.join(model_dir, rel_path))}
+            for rel_path in _model_files(model_dir)}
+
+
+def _is_within(root: str, member: str) -> bool:
+    path = os.path.realpath(os.path.join(root, member))
+    return path == root or path.startswith(root + os.sep)
+
+
+def _read_ct2_string(f) -> str:
+    (length,) = struct.unpack("<H", f.read(2))
+    return f.read(length)[:-1].decode("utf-8")
+
+
+def _write_ct2_string(f, value: str):
+    encoded = value.encode("utf-8")
+    f.write(struct.pack("<H", len(encoded) + 1))
+    f.write(encoded + b"\0")
+
+
+def _write_ct2_variable(f, name: str, value: np.ndarray, dtype: str):
+    _write_ct2_string(f, name)
+    f.write(struct.pack("<B", value.ndim))
+    for dim in value.shape:
+        f.write(struct.pack("<I", dim))
+    f.write(struct.pack("<B", CT2_DTYPES.index(dtype)))
+    data = np.ascontiguousarray(value).tobytes()
+    f.write(struct.pack("<I", len(data)))
+    f.write(data)
+
+
+def _to_float32(data: bytes, dtype: str, shape: Tuple[int, ...]) -> np.ndarray:
+    if dtype == "bfloat16":
+        values = (np.frombuffer(data, dtype=np.uint16).astype(np.uint32) << 16).view(np.float32)
+    else:
+        values = np.frombuffer(data, dtype=np.dtype(dtype)).astype(np.float32)
+    return values.reshape(shape)
+
+
+def quantize_int8_rows(weight: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Quantizes a linear/conv/embedding weight to int8 with one scale per output row, exactly as
+    CTranslate2's converters do (`value * scale` rounded, `scale = 127 / max(abs(row))`).
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: (int8 weight of the same shape, float32 scales of shape (rows,)).
+    """
+    rows = weight.reshape(weight.shape[0], -1).astype(np.float32)
+    amax = np.amax(np.abs(rows), axis=1)
+    amax[amax == 0] = 127.0
+    scale = (127.0 / amax).astype(np.float32)
+    quantized = np.rint(rows * scale[:, None]).astype(np.int8)
+    return quantized.reshape(weight.shape), scale
+
+
+def quantize_ct2_model(model_dir: str, quantization: str = "int8", logger: logging.Logger = None) -> Tuple[int, int, int]:
+    """
+    Re-quantizes the weights of a converted CTranslate2 model in place.
+
+    CTranslate2 can quantize at load time (`compute_type="int8"`), but then every load reads the
+    full float weights and converts them. Storing int8 weights makes the model ~2-4x smaller on
+    disk and faster to load. Every float "weight" variable of rank 2 or 3 (linear, conv1d and
+    embedding layers, the ones CTranslate2 pairs with a "weight_scale") is quantized per row;
+    layer norms, biases and other variables are kept. The file is rewritten variable by variable,
+    so memory use is bounded by the largest weight, and replaced atomically.
+
+    Args:
+        model_dir (str): Directory holding model.bin.
+        quantization (str): Target quantization; only "int8".
+        logger (logging.Logger, optional): Logger instance.
+
+    Returns:
+        tuple[int, int, int]: (number of quantized weights, file size before, file size after).
+        Nothing is rewritten if all weights are already quantized.
+
+    Raises:
+        ValueError: If the quantization or the model.bin format version is not supported.
+    """
+    logger = logger if logger else logging.getLogger("CT2Quantizer")
+    if quantization not in QUANTIZATIONS:
+        raise ValueError(f"不支持的量化类型: {quantization} (可选: {', '.join(QUANTIZATIONS)})")
+    model_path = os.path.join(model_dir, "model.bin")
+    size_before = os.path.getsize(model_path)
+
+    with open(model_path, "rb") as f:
+        (version,) = struct.unpack("<I", f.read(4))
+        if version != CT2_BINARY_VERSION:
+            raise ValueError(f"不支持的CTranslate2模型格式版本: {version} (支持 {CT2_BINARY_VERSION})")
+        spec_name = _read_ct2_string(f)
+        (revision,) = struct.unpack("<I", f.read(4))
+        (num_variables,) = struct.unpack("<I", f.read(4))
+        variables = []
+        for _ in range(num_variables):
+            name = _read_ct2_string(f)
+            (rank,) = struct.unpack("<B", f.read(1))
+            shape = struct.unpack(f"<{rank}I", f.read(4 * rank)) if rank else ()
+            (type_id,) = struct.unpack("<B", f.read(1))
+            (num_bytes,) = struct.unpack("<I", f.read(4))
+            variables.append((name, shape, CT2_DTYPES[type_id], f.tell(), num_bytes))
+            f.seek(num_bytes, os.SEEK_CUR)
+        (num_aliases,) = struct.unpack("<I", f.read(4))
+        aliases = [(_read_ct2_string(f), _read_ct2_string(f)) for _ in range(num_aliases)]
+
+    names = {variable[0] for variable in variables}
+    to_quantize = {name for name, shape, dtype, _, _ in variables
+                   if name.rsplit("/", 1)[-1] == "weight" and dtype in CT2_FLOAT_DTYPES and len(shape) in (2, 3)
+                   and f"{name}_scale" not in names}
+    if not to_quantize:
+        logger.info(f"模型权重已是量化格式，无需处理: {model_dir}")
+        return 0, size_before, size_before
+
+    started_at = time.perf_counter()
+    partial_path = f"{model_path}.partial"
+    try:
+        with open(model_path, "rb") as source, open(partial_path, "wb") as target:
+            target.write(struct.pack("<I", version))
+            _write_ct2_string(target, spec_name)
+            target.write(struct.pack("<I", revision))
+            target.write(struct.pack("<I", num_variables + len(to_quantize)))
+            for name, shape, dtype, offset, num_bytes in variables:
+                source.seek(offset)
+                data = source.read(num_bytes)
+                if name in to_quantize:
+                    weight, scale = quantize_int8_rows(_to_float32(data, dtype, shape))
+                    _write_ct2_variable(target, name, weight, "int8")
+                    _write_ct2_variable(target, f"{name}_scale", scale, "float32")
+                    continue
+                _write_ct2_string(target, name)
+                target.write(struct.pack("<B", len(shape)))
+                for dim in shape:
+                    target.write(struct.pack("<I", dim))
+                target.write(struct.pack("<B", CT2_DTYPES.index(dtype)))
+                target.write(struct.pack("<I", num_bytes))
+                target.write(data)
+            target.write(struct.pack("<I", len(aliases)))
+            for alias, variable_name in aliases:
+                _write_ct2_string(target, alias)
+                _write_ct2_string(target, variable_name)
+        os.replace(partial_path, model_path)
+    finally:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+
+    size_after = os.path.getsize(model_path)
+    logger.info(f"模型已量化为 {quantization}: {len(to_quantize)} 个权重, {size_before / 1e6:.1f} MB -> {size_after / 1e6:.1f} MB, "
+                f"用时 {time.perf_counter() - started_at:.1f}s ({model_dir})")
+    return len(to_quantize), size_before, size_after
+
+
+class LocalModelStore:
+    """
+    Directory of imported faster-whisper models, one subdirectory per model name.
+
+    Models are imported from a local directory or archive (no network), checked against the
+    SHA-256 sums shipped with the bundle, optionally re-quantized to int8, and recorded with a
+    manifest of their file hashes so an installation can be verified and re-exported. When a
+    model name (e.g. "small") is in the store, `WhisperService` loads it from here instead of
+    resolving it on the Hugging Face Hub.
+    """
+
+    def __init__(self, root: str = None, logger: logging.Logger = None):
+        """
+        Args:
+            root (str, optional): Store directory. Defaults to the per-user cache dir ("models").
+            logger (logging.Logger, optional): Logger instance.
+        """
+        self.logger = logger if logger else logging.getLogger(self.__class__.__name__)
+        self.root = os.path.abspath(root) if root else get_user_cache_dir(MODEL_STORE_DIRNAME)
+        self._lock = threading.Lock()
+
+    def path_for(self, name: str) -> str:
+        """Returns the directory a model of this name is stored in.
+
+        Raises:
+            ValueError: If the name is not a plain directory name.
+        """
+        if not MODEL_NAME_PATTERN.match(name or ""):
+            raise ValueError(f"模型名称无效: {name!r}")
+        return os.path.join(self.root, name)
+
+    def has_model(self, name: str) -> bool:
+        """True if a model of this name has been imported."""
+        if not MODEL_NAME_PATTERN.match(name or ""):
+            return False
+        return os.path.isfile(os.path.join(self.root, name, MANIFEST_FILENAME))
+
+    def resolve(self, model_name: str) -> str:
+        """Returns the stored directory of `model_name` if it was imported, otherwise `model_name` unchanged."""
+        return self.path_for(model_name) if self.has_model(model_name) else model_name
+
+    def manifest(self, name: str) -> Dict[str, Any]:
+        """Returns the manifest of an imported model.
+
+        Raises:
+            ValueError: If the model is not in the store.
+        """
+        if not self.has_model(name):
+            raise ValueError(f"模型不在本地模型库中: {name} ({self.root})")
+        with open(os.path.join(self.path_for(name), MANIFEST_FILENAME), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def signature(self, name: str) -> Dict[str, Any]:
+        """
+        Identifies the stored weights of an imported model (directory, quantization and model.bin
+        checksum), so re-importing or re-quantizing a model invalidates results keyed on it.
+
+        Raises:
+            ValueError: If the model is not in the store.
+        """
+        manifest = self.manifest(name)
+        return {"path": self.path_for(name), "quantization": manifest.get("quantization"),
+                "model_sha256": manifest["files"].get("model.bin", {}).get("sha256")}
+
+    def list_models(self) -> List[Dict[str, Any]]:
+        """Returns the manifests of all imported models, sorted by name."""
+        if not os.path.isdir(self.root):
+            return []
+        return [self.manifest(name) for name in sorted(os.listdir(self.root)) if self.has_model(name)]
+
+    def import_model(self, source: str, name: str = None, checksums: Dict[str, str] = None,
+                     quantization: str = None, overwrite: bool = False) -> str:
+        """
+        Copies a converted faster-whisper model into the store.
+
+        Expected checksums come from `checksums`, else from the bundle's own manifest (a bundle
+        written by `export_model`), else from a SHA256SUMS/checksums.sha256 file in the bundle.
+        Without any of them the hashes are only recorded. The model is assembled in a staging
+        directory inside the store and moved into place at the end, so a failed or interrupted
+        import never leaves a half-written model behind.
+
+        Args:
+            source (str): Model directory, or .zip/.tar(.gz/.bz2/.xz) archive containing one.
+            name (str, optional): Name to store it under (what `asr_model` refers to). Defaults to the
+                                  name in the bundle manifest, else the directory/archive name without a
+                                  "faster-whisper-" prefix.
+            checksums (dict, optional): Relative file path -> expected SHA-256.
+            quantization (str, optional): Re-quantize the weights after import (see `quantize_ct2_model`).
+            overwrite (bool): Replace an existing model of the same name.
+
+        Returns:
+            str: Directory of the imported model.
+
+        Raises:
+            FileNotFoundError: If `source` does not exist.
+            ValueError: On checksum mismatches, invalid bundles or names, or an existing model without `overwrite`.
+        """
+        source = os.path.abspath(source)
+        if not os.path.exists(source):
+            raise FileNotFoundError(f"模型来源不存在: {source}")
+        os.makedirs(self.root, exist_ok=True)
+        staging_dir = tempfile.mkdtemp(prefix=".import-", dir=self.root)
+        started_at = time.perf_counter()
+        try:
+            if os.path.isdir(source):
+                source_dir = find_model_dir(source)
+            else:
+                self._extract_archive(source, os.path.join(staging_dir, "extracted"))
+                source_dir = find_model_dir(os.path.join(staging_dir, "extracted"))
+
+            bundle_manifest = {}
+            if os.path.isfile(os.path.join(source_dir, MANIFEST_FILENAME)):
+                with open(os.path.join(source_dir, MANIFEST_FILENAME), "r", encoding="utf-8") as f:
+                    bundle_manifest = json.load(f)
+            name = name or bundle_manifest.get("name") or self._default_name(source_dir if os.path.isdir(source) else source)
+            target_dir = self.path_for(name)
+            if os.path.exists(target_dir) and not overwrite:
+                raise ValueError(f"模型已存在: {name} ({target_dir})，如需替换请使用 overwrite")
+
+            source_files = _hash_files(source_dir)
+            expected, checksum_source = self._expected_checksums(source_dir, bundle_manifest, checksums)
+            self._check_checksums(source_files, expected, checksum_source)
+
+            model_dir = os.path.join(staging_dir, "model")
+            if os.path.isdir(source):
+                shutil.copytree(source_dir, model_dir, ignore=shutil.ignore_patterns(".*", MANIFEST_FILENAME, *CHECKSUM_FILENAMES))
+            else:
+                os.replace(source_dir, model_dir)
+                for extra_name in (MANIFEST_FILENAME,) + CHECKSUM_FILENAMES:
+                    if os.path.isfile(os.path.join(model_dir, extra_name)):
+                        os.remove(os.path.join(model_dir, extra_name))
+
+            manifest = {
+                "name": name,
+                "source": source,
+                "imported_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "checksums_verified": checksum_source,
+                "quantization": bundle_manifest.get("quantization"),
+                "source_files": source_files,
+            }
+            if quantization:
+                quantize_ct2_model(model_dir, quantization, logger=self.logger)
+                manifest["quantization"] = quantization
+            manifest["files"] = _hash_files(model_dir) if quantization else source_files
+            with open(os.path.join(model_dir, MANIFEST_FILENAME), "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+            with self._lock:
+                if os.path.exists(target_dir):
+                    shutil.rmtree(target_dir)
+                os.replace(model_dir, target_dir)
+        finally:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+        self.logger.info(f"模型已导入: {name} -> {target_dir} (校验: {checksum_source or '无'}, "
+                         f"量化: {manifest['quantization'] or '原始'}, 用时 {time.perf_counter() - started_at:.1f}s)")
+        return target_dir
+
+    def verify(self, name: str) -> List[str]:
+        """
+        Re-hashes the files of an imported model against its manifest.
+
+        Returns:
+            list[str]: Problems found ("missing: ...", "modified: ..."); empty if the model is intact.
+        """
+        model_dir = self.path_for(name)
+        problems = []
+        for rel_path, expected in self.manifest(name)["files"].items():
+            path = os.path.join(model_dir, rel_path)
+            if not os.path.isfile(path):
+                problems.append(f"missing: {rel_path}")
+            elif os.path.getsize(path) != expected["size"] or file_sha256(path) != expected["sha256"]:
+                problems.append(f"modified: {rel_path}")
+        if problems:
+            self.logger.warning(f"模型校验失败: {name}: {problems}")
+        return problems
+
+    def quantize(self, name: str, quantization: str = "int8") -> Dict[str, Any]:
+        """
+        Re-quantizes an imported model in place and updates its manifest.
+
+        Returns:
+            dict: The updated manifest.
+        """
+        manifest = self.manifest(name)
+        model_dir = self.path_for(name)
+        with self._lock:
+            quantize_ct2_model(model_dir, quantization, logger=self.logger)
+            manifest["quantization"] = quantization
+            manifest["files"] = _hash_files(model_dir)
+            partial_path = os.path.join(model_dir, f"{MANIFEST_FILENAME}.partial")
+            with open(partial_path, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2, ensure_ascii=False)
+            os.replace(partial_path, os.path.join(model_dir, MANIFEST_FILENAME))
+        return manifest
+
+    def export_model(self, name: str, archive_path: str) -> str:
+        """
+        Writes an imported model with its manifest to a .tar.gz bundle that `import_model` verifies
+        on the target machine (e.g. prepared on a connected machine for an air-gapped one).
+
+        Returns:
+            str: Path of the written archive.
+        """
+        model_dir = self.path_for(name)
+        if self.verify(name):
+            raise ValueError(f"模型文件与清单不一致，无法导出: {name}")
+        partial_path = f"{archive_path}.partial"
+        with tarfile.open(partial_path, "w:gz") as archive:
+            archive.add(model_dir, arcname=name)
+        os.replace(partial_path, archive_path)
+        self.logger.info(f"模型已导出: {name} -> {archive_path}")
+        return archive_path
+
+    def warm_up(self, name: str, device: str = "cpu", compute_type: str = "default") -> float:
+        """
+        Loads a stored model with faster-whisper (no network access) and runs a one-second silent
+        inference, which checks that the model works on this machine and pulls its files into the
+        OS page cache.
+
+        Returns:
+            float: Seconds taken by loading and the inference.
+        """
+        from faster_whisper import WhisperModel
+
+        started_at = time.perf_counter()
+        model = WhisperModel(self.path_for(name), device=device, compute_type=compute_type, local_files_only=True)
+        segments_generator, _ = model.transcribe(np.zeros(16000, dtype=np.float32), language="en", beam_size=1)
+        for _ in segments_generator:
+            pass
+        del model
+        elapsed = time.perf_counter() - started_at
+        self.logger.info(f"模型预热完成: {name} ({device}/{compute_type})，用时 {elapsed:.1f}s")
+        return elapsed
+
+    @staticmethod
+    def _default_name(source: str) -> str:
+        base_name = os.path.basename(source.rstrip("/\\"))
+        for suffix in ARCHIVE_SUFFIXES:
+            if base_name.lower().endswith(suffix):
+                base_name = base_name[:-len(suffix)]
+                break
+        if base_name.startswith("faster-whisper-"):
+            base_name = base_name[len("faster-whisper-"):]
+        return base_name
+
+    @staticmethod
+    def _expected_checksums(source_dir: str, bundle_manifest: Dict[str, Any],
+                            checksums: Optional[Dict[str, str]]) -> Tuple[Dict[str, str], Optional[str]]:
+        if checksums:
+            return {path.replace("\\", "/"): digest.lower() for path, digest in checksums.items()}, "provided"
+        if bundle_manifest.get("files"):
+            return {path: entry["sha256"] for path, entry in bundle_manifest["files"].items()}, MANIFEST_FILENAME
+        for checksum_name in CHECKSUM_FILENAMES:
+            if os.path.isfile(os.path.join(source_dir, checksum_name)):
+                return read_checksum_file(os.path.join(source_dir, checksum_name)), checksum_name
+        return {}, None
+
+    def _check_checksums(self, source_files: Dict[str, Dict[str, Any]], expected: Dict[str, str], checksum_source: Optional[str]):
+        if not checksum_source:
+            self.logger.warning("模型包未提供校验和，仅记录文件哈希。")
+            return
+        mismatched = [path for path, digest in expected.items()
+                      if path not in source_files or source_files[path]["sha256"] != digest]
+        if mismatched:
+            raise ValueError(f"模型文件校验失败 ({checksum_source}): {', '.join(sorted(mismatched))}")
+        unchecked = sorted(set(source_files) - set(expected))
+        if unchecked:
+            self.logger.warning(f"以下文件不在校验列表中 ({checksum_source}): {', '.join(unchecked)}")
+
+    @staticmethod
+    def _extract_archive(archive_path: str, output_dir: str):
+        """Extracts a zip/tar archive, refusing members that would land outside `output_dir`."""
+        os.makedirs(output_dir, exist_ok=True)
+        output_root = os.path.realpath(output_dir)
+        if zipfile.is_zipfile(archive_path):
+            with zipfile.ZipFile(archive_path) as archive:
+                for member in archive.namelist():
+                    if not _is_within(output_root, member):
+                        raise ValueError(f"压缩包包含不安全的路径: {member}")
+                archive.extractall(output_root)
+        elif tarfile.is_tarfile(archive_path):
+            with tarfile.open(archive_path) as archive:
+                for member in archive.getmembers():
+                    if not (member.isfile() or member.isdir()) or not _is_within(output_root, member.name):
+                        raise ValueError(f"压缩包包含不安全的条目: {member.name}")
+                archive.extractall(output_root, **({"filter": "data"} if hasattr(tarfile, "data_filter") else {}))
+        else:
+            raise ValueError(f"不支持的压缩包格式 (支持 {', '.join(ARCHIVE_SUFFIXES)}): {archive_path}")
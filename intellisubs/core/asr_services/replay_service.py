@@ -0,0 +1,141 @@
+# Replay / synthetic ASR backend for benchmarking the text pipeline without a model
+import json
+import logging
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .base_asr import BaseASRService
+
+# Character pools the synthetic generator draws text from
+SYNTHETIC_VOCABULARY = {
+    "ja": "あいうえおかきくけこさしすせそたちつてとなにぬねのはひふへほまみむめもやゆよらりるれろわをんアイウエオカキクケコ日本語今天気話時間人",
+    "zh": "的一是在不了有和人这中大为上个国我以要他时来用们生到作地于出就分对成会可主发年动同工也能下过子说产种面而方后多定行学法所民得经",
+    "en": ["the", "a", "we", "you", "time", "people", "said", "going", "right", "today", "really", "think", "about", "would", "there", "know"],
+}
+DEFAULT_SYNTHETIC_SETTINGS = {
+    "count": 1000,              # Number of segments
+    "language": None,           # None: the language passed to `transcribe` (or "ja")
+    "text_chars_mean": 14.0,    # Text length ~ Normal(mean, std), at least 1 character
+    "text_chars_std": 6.0,
+    "sec_per_char": 0.12,       # Segment duration per character
+    "gap_mean_sec": 0.4,        # Gap before each segment ~ Exponential(mean)
+    "seed": 0,
+}
+
+
+class ReplayASRService(BaseASRService):
+    """
+    ASR backend that ignores the audio and returns a recorded or synthetic segment stream.
+
+    Replays segments from a JSON file (a list of segments, or an object with "segments" and
+    "info" as written by `ASRResultCache`), or generates `count` segments with random text
+    length and gaps from a fixed seed. Output is deterministic, so the normalizer, punctuator,
+    segmenter, pysrt conversion and formatters can be benchmarked and profiled at any scale
+    without a model or GPU. Audio-dependent modes (VAD, parallel chunks, stream windows) call
+    `transcribe` per piece of audio and should be disabled when using it.
+    """
+
+    def __init__(self, replay_path: str = None, synthetic: Dict[str, Any] = None, logger: logging.Logger = None):
+        """
+        Args:
+            replay_path (str, optional): JSON file with recorded segments. Takes precedence over `synthetic`.
+            synthetic (dict, optional): Overrides for `DEFAULT_SYNTHETIC_SETTINGS`.
+            logger (logging.Logger, optional): Logger instance.
+        """
+        super().__init__(logger)
+        self.replay_path = replay_path or None
+        self.synthetic = {**DEFAULT_SYNTHETIC_SETTINGS, **(synthetic or {})}
+        self._recorded: Optional[Tuple[List[Dict[str, Any]], Dict[str, Any]]] = None
+        if self.replay_path:
+            self._recorded = self._load_recording(self.replay_path)
+            self.logger.info(f"ReplayASRService: 回放 {self.replay_path} ({len(self._recorded[0])} 个片段)")
+        else:
+            self.logger.info(f"ReplayASRService: 生成合成片段 {self.synthetic}")
+
+    def transcribe(self, audio=None, language: str = None,
+                   progress_callback: Callable[[float, float, Dict[str, Any]], None] = None) -> Tuple[List[Dict[str, Any]], Any]:
+        """
+        Returns the recorded or synthetic segments; `audio` is ignored.
+
+        Args:
+            audio: Ignored.
+            language (str, optional): Language of synthetic text (unless set in the settings) and of the info.
+            progress_callback (Callable, optional): Called per segment like `WhisperService.transcribe_stream`.
+
+        Returns:
+            tuple[list[dict], SimpleNamespace]: (segments, info with `language`, `language_probability`, `duration`).
+        """
+        started_at = time.perf_counter()
+        if self._recorded is not None:
+            segments = [seg.copy() for seg in self._recorded[0]]
+            info_language = self._recorded[1].get("language") or language
+        else:
+            info_language = self.synthetic["language"] or language or "ja"
+            segments = self.generate_segments(info_language)
+        duration = segments[-1]["end"] if segments else 0.0
+        info = SimpleNamespace(language=info_language, language_probability=1.0, duration=duration)
+
+        if progress_callback:
+            for seg in segments:
+                processed_sec = seg["end"]
+                progress_callback(processed_sec / duration if duration else 1.0,
+                                  (time.perf_counter() - started_at) / processed_sec if processed_sec > 0 else 0.0, seg)
+        self.logger.info(f"ReplayASRService: 返回 {len(segments)} 个片段 (语言: {info_language}, 时长 {duration:.1f}s)")
+        return segments, info
+
+    def generate_segments(self, language: str) -> List[Dict[str, Any]]:
+        """Generates the synthetic segment stream for `language` from the configured distributions."""
+        settings = self.synthetic
+        count = int(settings["count"])
+        rng = np.random.default_rng(settings["seed"])
+        lengths = np.maximum(1, np.rint(rng.normal(settings["text_chars_mean"], settings["text_chars_std"], count))).astype(int)
+        gaps = rng.exponential(settings["gap_mean_sec"], count) if settings["gap_mean_sec"] > 0 else np.zeros(count)
+        vocabulary = SYNTHETIC_VOCABULARY.get(language, SYNTHETIC_VOCABULARY["ja"])
+
+        if isinstance(vocabulary, str):
+            # Draw all characters at once; each segment takes the next `length` of them
+            characters = np.array(list(vocabulary))[rng.integers(0, len(vocabulary), int(lengths.sum()))]
+            offsets = np.concatenate(([0], np.cumsum(lengths)))
+            texts = ["".join(characters[offsets[i]:offsets[i + 1]]) for i in range(count)]
+        else:
+            texts = [self._random_words(rng, vocabulary, int(length)) for length in lengths]
+
+        segments = []
+        cursor = 0.0
+        for text, gap in zip(texts, gaps):
+            start = cursor + float(gap)
+            end = start + len(text) * settings["sec_per_char"]
+            segments.append({"start": round(start, 3), "end": round(end, 3), "text": text})
+            cursor = end
+        return segments
+
+    @staticmethod
+    def _random_words(rng: np.random.Generator, vocabulary: List[str], length: int) -> str:
+        words = []
+        while sum(len(word) + 1 for word in words) < length:
+            words.append(vocabulary[int(rng.integers(0, len(vocabulary)))])
+        return " ".join(words)
+
+    @staticmethod
+    def _load_recording(path: str) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, list):
+            return data, {}
+        return data["segments"], data.get("info") or {}
+
+    def detect_language(self, audio=None) -> Tuple[Optional[str], float]:
+        """Returns the language the replayed or synthetic stream is in."""
+        if self._recorded is not None:
+            return self._recorded[1].get("language"), 1.0
+        return self.synthetic["language"], 1.0
+
+    def update_model_and_device(self, model_name: str, device: str):
+        """No model is involved; the settings are ignored."""
+        self.logger.debug(f"ReplayASRService: 忽略模型/设备设置 {model_name}/{device}")
+
+    def cache_signature(self) -> Dict[str, Any]:
+        return {"backend": "replay", "replay_path": self.replay_path, "synthetic": None if self.replay_path else self.synthetic}
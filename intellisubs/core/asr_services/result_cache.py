@@ -0,0 +1,134 @@
+# Persistent cache of raw ASR results
+import hashlib
+import json
+import logging
+import os
+import threading
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Tuple
+
+from .word_store import WordTimestampStore
+
+CACHE_FORMAT_VERSION = 2 # 2: segments carry avg_logprob/no_speech_prob/compression_ratio
+RESULT_EXTENSION = ".json"
+INFO_FIELDS = ("language", "language_probability", "duration")
+
+
+class ASRResultCache:
+    """
+    Size-capped on-disk cache of raw ASR segments, keyed by audio fingerprint and decoding settings.
+
+    Only the ASR output is cached; the text stages (normalizer, punctuator, segmenter) always run
+    on it. Re-processing a file after changing a dictionary or the subtitle timing settings then
+    costs milliseconds instead of a full Whisper pass. Entries are evicted least-recently-used
+    first; a hit refreshes the entry's mtime.
+    """
+
+    def __init__(self, cache_dir: str, max_size_mb: Optional[float] = 256, logger: logging.Logger = None):
+        """
+        Args:
+            cache_dir (str): Directory holding the cached results. Created if missing.
+            max_size_mb (float | None): Total size cap in megabytes; None disables eviction.
+            logger (logging.Logger, optional): Logger instance.
+        """
+        self.logger = logger if logger else logging.getLogger(self.__class__.__name__)
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_size_bytes = None if max_size_mb is None else int(max_size_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.logger.info(f"ASRResultCache initialized at {self.cache_dir} (上限 {max_size_mb} MB)")
+
+    @staticmethod
+    def make_key(audio_key: str, params: Dict[str, Any]) -> str:
+        """
+        Combines an audio fingerprint with everything that changes the ASR output.
+
+        Args:
+            audio_key (str): Fingerprint of the decoded audio (e.g. `DecodedAudioCache.fingerprint`).
+            params (dict): JSON-serializable ASR settings (model, compute type, language, beam size, VAD, ...).
+
+        Returns:
+            str: Hex digest usable as a file name.
+        """
+        hasher = hashlib.sha1()
+        hasher.update(f"v{CACHE_FORMAT_VERSION}|{audio_key}|".encode())
+        hasher.update(json.dumps(params, sort_keys=True, default=str).encode())
+        return hasher.hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[List[Dict[str, Any]], Any]]:
+        """
+        Looks up a cached ASR result.
+
+        Returns:
+            tuple[list[dict], SimpleNamespace] | None: (segments, info with `language`, `language_probability`
+                                                       and `duration`), or None on a miss.
+        """
+        entry_path = self._entry_path(key)
+        if not os.path.isfile(entry_path):
+            self.logger.debug(f"ASR结果缓存未命中: {key}")
+            return None
+        try:
+            with open(entry_path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(entry_path, None) # Mark as most recently used
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"无法读取ASR结果缓存条目 {entry_path}: {e}")
+            return None
+        self.logger.info(f"ASR结果缓存命中: {key} ({len(entry['segments'])} 个片段)")
+        for seg in entry["segments"]:
+            if seg.get("words") is not None:
+                seg["words"] = WordTimestampStore.from_dict(seg["words"])
+        return entry["segments"], SimpleNamespace(**entry["info"])
+
+    def put(self, key: str, segments: List[Dict[str, Any]], info: Any):
+        """Stores the segments and the relevant fields of the transcription info, then enforces the size cap."""
+        entry = {
+            "segments": [{**seg, "words": seg["words"].to_dict()} if isinstance(seg.get("words"), WordTimestampStore) else seg
+                         for seg in segments],
+            "info": {field: getattr(info, field, None) for field in INFO_FIELDS},
+        }
+        entry_path = self._entry_path(key)
+        partial_path = f"{entry_path}.{threading.get_ident()}.partial"
+        try:
+            with open(partial_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(partial_path, entry_path)
+        except (OSError, TypeError, ValueError) as e:
+            self.logger.warning(f"写入ASR结果缓存失败 ({key}): {e}")
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            return
+        self.logger.info(f"ASR结果已写入缓存: {key} ({len(segments)} 个片段)")
+        self._evict(keep_path=entry_path)
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}{RESULT_EXTENSION}")
+
+    def _evict(self, keep_path: str = None):
+        """Deletes least-recently-used entries until the cache fits in `max_size_bytes`."""
+        if self.max_size_bytes is None:
+            return
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith(RESULT_EXTENSION):
+                    continue
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            total_size = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total_size <= self.max_size_bytes:
+                    break
+                if path == keep_path:
+                    continue
+                try:
+                    os.remove(path)
+                    total_size -= size
+                    self.logger.info(f"ASR结果缓存超出上限，已淘汰: {os.path.basename(path)}")
+                except OSError as e:
+                    self.logger.warning(f"淘汰ASR结果缓存条目失败 {path}: {e}")
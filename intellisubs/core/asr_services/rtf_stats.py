@@ -0,0 +1,105 @@
+# Per-preset real-time-factor statistics of completed transcriptions
+import argparse
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, Sequence
+
+from intellisubs.utils.config_manager import get_user_cache_dir
+
+RTF_STATS_FILENAME = "asr_rtf_stats.json"
+
+
+class RTFStatsStore:
+    """
+    Accumulates the achieved real-time factor (wall time per second of audio) per decoding setup.
+
+    Runs are grouped by model, device, compute type and decoding preset on this machine, so the
+    summary answers "how fast is preset X here" when choosing a preset for a deadline-bound job.
+    Only totals are stored; the RTF of a group is total wall time over total audio duration.
+    """
+
+    def __init__(self, path: str = None, logger: logging.Logger = None):
+        """
+        Args:
+            path (str, optional): JSON file holding the statistics. Defaults to the per-user cache dir.
+            logger (logging.Logger, optional): Logger instance.
+        """
+        self.logger = logger if logger else logging.getLogger(self.__class__.__name__)
+        self.path = path or os.path.join(get_user_cache_dir(), RTF_STATS_FILENAME)
+        self._lock = threading.Lock()
+
+    def record(self, model_name: str, device: str, compute_type: str, preset: str, audio_sec: float, elapsed_sec: float):
+        """
+        Adds one transcription to the statistics of its setup. Runs without audio are ignored.
+
+        Args:
+            model_name (str): Whisper model.
+            device (str): Device it ran on.
+            compute_type (str): Resolved compute type (not "auto").
+            preset (str): Decoding preset name.
+            audio_sec (float): Duration of the transcribed audio.
+            elapsed_sec (float): Wall time of the transcription.
+        """
+        if audio_sec <= 0:
+            return
+        key = f"{model_name}|{device}|{compute_type}|{preset}"
+        with self._lock:
+            data = self._load()
+            stats = data.setdefault(key, {"model": model_name, "device": device, "compute_type": compute_type,
+                                          "preset": preset, "runs": 0, "audio_sec": 0.0, "elapsed_sec": 0.0})
+            stats["runs"] += 1
+            stats["audio_sec"] += audio_sec
+            stats["elapsed_sec"] += elapsed_sec
+            stats["last_rtf"] = elapsed_sec / audio_sec
+            try:
+                partial_path = f"{self.path}.partial"
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                with open(partial_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f, indent=2, ensure_ascii=False)
+                os.replace(partial_path, self.path)
+            except OSError as e:
+                self.logger.warning(f"无法保存RTF统计 {self.path}: {e}")
+                return
+        self.logger.info(f"ASR RTF [{key}]: 本次 {stats['last_rtf']:.3f}, 累计 {stats['elapsed_sec'] / stats['audio_sec']:.3f} "
+                         f"({stats['runs']} 次, {stats['audio_sec']:.0f}s 音频)")
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Returns the statistics per setup key, each with the aggregate "rtf" added."""
+        summary = {}
+        for key, stats in self._load().items():
+            rtf = stats["elapsed_sec"] / stats["audio_sec"] if stats.get("audio_sec") else None
+            summary[key] = {**stats, "rtf": rtf}
+        return summary
+
+    def _load(self) -> Dict[str, Any]:
+        if not os.path.isfile(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"无法读取RTF统计文件 {self.path}: {e}")
+            return {}
+
+
+def main(argv: Sequence[str] = None):
+    """Command line entry point: `python -m intellisubs.core.asr_services.rtf_stats` prints the recorded RTFs."""
+    parser = argparse.ArgumentParser(description="Show the real-time factor achieved per model, device and decoding preset.")
+    parser.add_argument("--path", default=None, help="Statistics file (default: per-user cache dir)")
+    args = parser.parse_args(argv)
+
+    summary = RTFStatsStore(path=args.path).summary()
+    if not summary:
+        print("No transcriptions recorded yet.")
+        return 0
+    print(f"{'model':<12}{'device':<8}{'compute_type':<14}{'preset':<10}{'runs':>6}{'audio (s)':>11}{'RTF':>8}")
+    for stats in sorted(summary.values(), key=lambda s: (s["model"], s["device"], s["compute_type"], s["rtf"])):
+        print(f"{stats['model']:<12}{stats['device']:<8}{stats['compute_type']:<14}{stats['preset']:<10}"
+              f"{stats['runs']:>6}{stats['audio_sec']:>11.0f}{stats['rtf']:>8.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,235 @@
+# Helpers for combining ASR segments produced from separate audio windows
+import bisect
+import logging
+import re
+from typing import List, Dict, Any, Tuple
+
+
+def shift_segments(segments: List[Dict[str, Any]], offset_sec: float) -> List[Dict[str, Any]]:
+    """
+    Returns copies of the segments with `start`/`end` moved by `offset_sec`.
+
+    Args:
+        segments (list[dict]): Segment dictionaries with at least `start` and `end`.
+        offset_sec (float): Offset in seconds to add to every timestamp.
+
+    Returns:
+        list[dict]: New segment dictionaries on the shifted timeline (word timestamps included).
+    """
+    shifted = []
+    for seg in segments:
+        new_seg = seg.copy()
+        new_seg["start"] = seg.get("start", 0.0) + offset_sec
+        new_seg["end"] = seg.get("end", 0.0) + offset_sec
+        if seg.get("words") is not None:
+            new_seg["words"] = seg["words"].shifted(offset_sec)
+        shifted.append(new_seg)
+    return shifted
+
+
+def stitch_clip_segments(segments: List[Dict[str, Any]], clips: List[Tuple[float, float]]) -> List[Dict[str, Any]]:
+    """
+    Cleans up segments decoded from separate clips of one file (batched ASR).
+
+    Each segment is clamped to the clip that contains its midpoint (Whisper timestamps can run
+    past the end of a padded clip), segments are put in time order, and a segment that starts
+    before the previous one ends is moved to start at that end.
+
+    Args:
+        segments (list[dict]): Segments with absolute `start`/`end`.
+        clips (list[tuple[float, float]]): The sorted (start_sec, end_sec) clips that were decoded.
+
+    Returns:
+        list[dict]: New segment dictionaries in time order without overlaps.
+    """
+    if not clips:
+        return [seg.copy() for seg in segments]
+    clip_starts = [start for start, _ in clips]
+    stitched = []
+    for seg in sorted(segments, key=lambda s: s.get("start", 0.0)):
+        midpoint = (seg.get("start", 0.0) + seg.get("end", 0.0)) / 2.0
+        clip_index = max(0, bisect.bisect_right(clip_starts, midpoint) - 1)
+        clip_start, clip_end = clips[clip_index]
+        new_seg = seg.copy()
+        new_seg["start"] = min(max(seg.get("start", 0.0), clip_start), clip_end)
+        new_seg["end"] = min(max(seg.get("end", 0.0), new_seg["start"]), clip_end)
+        if stitched and new_seg["start"] < stitched[-1]["end"]:
+            new_seg["start"] = min(stitched[-1]["end"], new_seg["end"])
+        stitched.append(new_seg)
+    return stitched
+
+
+def _normalize_seam_text(text: str) -> str:
+    return re.sub(r"[\W_]+", "", text or "").lower()
+
+
+def _strip_repeated_prefix(previous_text: str, text: str, min_overlap_chars: int) -> str:
+    """Removes the longest prefix of `text` that repeats the end of `previous_text` (at least `min_overlap_chars`)."""
+    previous_text, text = previous_text.strip(), text.strip()
+    for length in range(min(len(previous_text), len(text)), min_overlap_chars - 1, -1):
+        if previous_text.endswith(text[:length]):
+            return re.sub(r"^[\W_]+", "", text[length:])
+    return text
+
+
+def merge_chunk_segments(chunk_results: List[Tuple[float, List[Dict[str, Any]]]], seam_window_sec: float = 2.0,
+                         min_overlap_chars: int = 3, logger: logging.Logger = None) -> List[Dict[str, Any]]:
+    """
+    Joins segments of independently transcribed chunks of one file into a single timeline.
+
+    Chunks are decoded with some padding around their cut points and without the preceding
+    text as context, so Whisper often repeats the last words of the previous chunk at the
+    start of the next one. Near every seam (within `seam_window_sec`), a segment of the later
+    chunk is dropped if its text duplicates a segment at the end of the earlier chunk, and a
+    prefix that repeats the end of the earlier chunk's last segment is cut off. Remaining
+    overlaps are resolved by moving the later segment's start.
+
+    Args:
+        chunk_results (list[tuple[float, list[dict]]]): (chunk start_sec, segments with absolute times) per chunk.
+        seam_window_sec (float): How far from a seam segments are compared.
+        min_overlap_chars (int): Shortest repeated text prefix that is removed.
+        logger (logging.Logger, optional): Logger instance.
+
+    Returns:
+        list[dict]: New segment dictionaries in time order.
+    """
+    logger = logger if logger else logging.getLogger(__name__)
+    merged: List[Dict[str, Any]] = []
+    for chunk_index, (seam_sec, segments) in enumerate(sorted(chunk_results, key=lambda c: c[0])):
+        segments = sorted((seg.copy() for seg in segments), key=lambda s: s.get("start", 0.0))
+        if chunk_index == 0 or not merged:
+            merged.extend(segments)
+            continue
+
+        tail = [seg for seg in merged if seg.get("end", 0.0) >= seam_sec - seam_window_sec]
+        tail_texts = [_normalize_seam_text(seg.get("text", "")) for seg in tail]
+        dropped = 0
+        for seg in segments:
+            if tail and seg.get("start", 0.0) < seam_sec + seam_window_sec:
+                text = _normalize_seam_text(seg.get("text", ""))
+                if text and any(text == tail_text or (len(text) >= min_overlap_chars and text in tail_text)
+                                for tail_text in tail_texts):
+                    dropped += 1
+                    continue
+                stripped = _strip_repeated_prefix(tail[-1].get("text", ""), seg.get("text", ""), min_overlap_chars)
+                if stripped != seg.get("text", "").strip():
+                    if not _normalize_seam_text(stripped):
+                        dropped += 1
+                        continue
+                    seg["text"] = stripped
+            if merged and seg.get("start", 0.0) < merged[-1].get("end", 0.0):
+                seg["start"] = merged[-1]["end"]
+                seg["end"] = max(seg.get("end", 0.0), seg["start"])
+            merged.append(seg)
+        if dropped:
+            logger.debug(f"分块拼接 @ {seam_sec:.2f}s: 丢弃 {dropped} 个接缝处重复片段。")
+    return merged
+
+
+def is_low_confidence(segment: Dict[str, Any], min_avg_logprob: float = -0.8, max_no_speech_prob: float = 0.6,
+                      max_compression_ratio: float = 2.4) -> bool:
+    """
+    Tells whether the decoder's own measures flag a segment as unreliable.
+
+    A low average token log-probability means an uncertain transcript, a high no-speech
+    probability with text suggests a hallucination in noise, and a high gzip compression ratio
+    means repetitive output. Segments without these fields (e.g. from other backends) are trusted.
+    """
+    avg_logprob = segment.get("avg_logprob")
+    no_speech_prob = segment.get("no_speech_prob")
+    compression_ratio = segment.get("compression_ratio")
+    return ((avg_logprob is not None and avg_logprob < min_avg_logprob) or
+            (no_speech_prob is not None and no_speech_prob > max_no_speech_prob) or
+            (compression_ratio is not None and compression_ratio > max_compression_ratio))
+
+
+def find_low_confidence_runs(segments: List[Dict[str, Any]], max_gap_sec: float = 1.0,
+                             **thresholds) -> List[Tuple[int, int]]:
+    """
+    Groups consecutive low-confidence segments (see `is_low_confidence`) into runs to re-decode together.
+
+    Neighbouring flagged segments less than `max_gap_sec` apart form one run, so each re-decode
+    gets a few seconds of context instead of a single short phrase.
+
+    Args:
+        segments (list[dict]): Segments in time order.
+        max_gap_sec (float): Largest gap between flagged segments of the same run.
+        **thresholds: `min_avg_logprob`, `max_no_speech_prob`, `max_compression_ratio` for `is_low_confidence`.
+
+    Returns:
+        list[tuple[int, int]]: (first index, index after the last) per run.
+    """
+    runs: List[Tuple[int, int]] = []
+    for index, seg in enumerate(segments):
+        if not is_low_confidence(seg, **thresholds):
+            continue
+        if runs and runs[-1][1] == index and seg.get("start", 0.0) - segments[index - 1].get("end", 0.0) < max_gap_sec:
+            runs[-1] = (runs[-1][0], index + 1)
+        else:
+            runs.append((index, index + 1))
+    return runs
+
+
+class WindowedSegmentMerger:
+    """
+    Merges segments from overlapping audio windows into one timeline.
+
+    Each window boundary is cut in the middle of the overlap: segments of the earlier window
+    whose midpoint falls before the cut are kept, and segments of the later window whose
+    midpoint falls after it are kept. If the later window has nothing after the cut, the earlier
+    window's segments are kept unchanged. Segments of the most recent window stay pending until
+    the next window (or `flush`) decides where they belong.
+    """
+
+    def __init__(self, overlap_sec: float = 0.0, logger: logging.Logger = None):
+        """
+        Args:
+            overlap_sec (float): Overlap between consecutive windows in seconds.
+            logger (logging.Logger, optional): Logger instance.
+        """
+        self.logger = logger if logger else logging.getLogger(self.__class__.__name__)
+        self.overlap_sec = overlap_sec
+        self._pending: List[Dict[str, Any]] = []
+        self._merged: List[Dict[str, Any]] = []
+
+    def add_window(self, window_start_sec: float, segments: List[Dict[str, Any]]):
+        """
+        Adds the segments of the next window. Timestamps must already be absolute.
+
+        Args:
+            window_start_sec (float): Absolute start time of the window in seconds.
+            segments (list[dict]): Segments of this window on the absolute timeline.
+        """
+        if not self._pending and not self._merged:
+            self._pending = list(segments)
+            return
+
+        cutoff = window_start_sec + self.overlap_sec / 2.0
+        kept_current = [seg for seg in segments if self._midpoint(seg) >= cutoff]
+        if not kept_current:
+            # Nothing in the new window replaces the seam (silence or a failed window),
+            # so the previous window's segments are kept as they are.
+            self._merged.extend(self._pending)
+            self._pending = []
+            return
+        kept_previous = [seg for seg in self._pending if self._midpoint(seg) < cutoff]
+        dropped = len(self._pending) - len(kept_previous) + len(segments) - len(kept_current)
+        if dropped:
+            self.logger.debug(f"窗口拼接 @ {cutoff:.2f}s: 丢弃 {dropped} 个重叠区重复片段。")
+
+        if kept_previous and kept_current and kept_current[0]["start"] < kept_previous[-1]["end"]:
+            kept_current[0] = kept_current[0].copy()
+            kept_current[0]["start"] = kept_previous[-1]["end"]
+
+        self._merged.extend(kept_previous)
+        self._pending = kept_current
+
+    def flush(self) -> List[Dict[str, Any]]:
+        """Finalizes the pending window and returns all merged segments in time order."""
+        self._merged.extend(self._pending)
+        self._pending = []
+        return self._merged
+
+    @staticmethod
+    def _midpoint(seg: Dict[str, Any]) -> float:
+        return (seg.get("start", 0.0) + seg.get("end", 0.0)) / 2.0
@@ -1,85 +1,489 @@
 # Whisper ASR Service Implementation
 from .base_asr import BaseASRService
-from faster_whisper import WhisperModel
+from .model_pool import WhisperModelPool
+from .segment_utils import stitch_clip_segments
+from .word_store import WordTimestampStore
+from faster_whisper import WhisperModel, BatchedInferencePipeline
 import logging
-from typing import Tuple, List, Dict, Any # For type hinting
+import threading
+import time
+import numpy as np
+from concurrent.futures import Future, wait as wait_futures
+from typing import Tuple, List, Dict, Any, Union, Callable, Iterator, Optional # For type hinting
+
+# Named speed/quality tradeoffs for faster-whisper's decoding options.
+# "balanced" equals faster-whisper's defaults (the behaviour before presets existed).
+_TEMPERATURE_FALLBACK = [0.0, 0.2, 0.4, 0.6, 0.8, 1.0]
+DECODING_PRESETS = {
+    # Greedy, no temperature fallback, no conditioning on the previous window; faster-whisper's
+    # Silero VAD skips non-speech. Several times faster, for rough-cut drafts.
+    "draft": {
+        "beam_size": 1, "best_of": 1, "patience": 1.0, "temperature": [0.0],
+        "condition_on_previous_text": False, "vad_filter": True,
+        "no_speech_threshold": 0.6, "log_prob_threshold": -1.0, "compression_ratio_threshold": 2.4,
+    },
+    "balanced": {
+        "beam_size": 5, "best_of": 5, "patience": 1.0, "temperature": _TEMPERATURE_FALLBACK,
+        "condition_on_previous_text": True, "vad_filter": False,
+        "no_speech_threshold": 0.6, "log_prob_threshold": -1.0, "compression_ratio_threshold": 2.4,
+    },
+    # Wider, more patient beam search with the full fallback schedule, for deliverables.
+    "final": {
+        "beam_size": 8, "best_of": 5, "patience": 1.5, "temperature": _TEMPERATURE_FALLBACK,
+        "condition_on_previous_text": True, "vad_filter": False,
+        "no_speech_threshold": 0.6, "log_prob_threshold": -1.0, "compression_ratio_threshold": 2.4,
+    },
+}
+DEFAULT_DECODING_PRESET = "balanced"
 
 class WhisperService(BaseASRService):
-    def __init__(self, model_name: str = "small", device: str = "cpu", compute_type: str = "float32", logger: logging.Logger = None):
+    def __init__(self, model_name: str = "small", device: str = "cpu", compute_type: str = "float32", logger: logging.Logger = None,
+                 model_pool_max_mb: float = 0, cpu_threads: int = 0, num_workers: int = 1, tuning_store=None,
+                 lazy_load: bool = False, warm_up: bool = False, decoding_preset: str = DEFAULT_DECODING_PRESET,
+                 word_timestamps: bool = False, model_store=None, local_files_only: bool = False):
         """
         Initializes the Whisper ASR service.
 
         Args:
             model_name (str): Name of the Whisper model to use (e.g., "tiny", "base", "small", "medium", "large").
             device (str): Device to use for computation ("cpu", "cuda", or "mps").
-            compute_type (str): Compute type for the model (e.g., "int8", "float16", "float32").
+            compute_type (str): Compute type for the model (e.g., "int8", "float16", "float32"), or "auto" to use
+                                the settings saved by the calibration tool for this model and device
+                                (float32 with the given thread settings if it has not been run).
             logger (logging.Logger, optional): Logger instance.
+            model_pool_max_mb (float): Memory budget for keeping previously used models loaded
+                                       (see `WhisperModelPool`). 0 keeps only the current model.
+            cpu_threads (int): CTranslate2 intra-op threads; 0 uses the library default.
+            num_workers (int): Number of transcriptions the model can run concurrently.
+            tuning_store (ASRTuningStore, optional): Source of calibrated settings for compute_type "auto".
+            lazy_load (bool): Do not load the model here; it is loaded by `start_background_load` or on first use.
+            warm_up (bool): Run a one-second dummy inference after loading a model, so the first real
+                            transcription does not pay for buffer allocation and kernel initialization.
+            decoding_preset (str): Name of the `DECODING_PRESETS` entry to decode with.
+            word_timestamps (bool): Have faster-whisper align words; each segment then carries a
+                                    `WordTimestampStore` under "words".
+            model_store (LocalModelStore, optional): Imported models; a model name found there is loaded
+                                                     from its directory instead of the Hugging Face Hub.
+            local_files_only (bool): Never download models; only the model store and the local
+                                     Hugging Face cache are used.
+
+        Raises:
+            ValueError: If `decoding_preset` is not a known preset.
         """
         super().__init__(logger)
         self._model = None # Private attribute for the model instance
+        self._model_key = None # Pool key of `_model`, pinned in the model pool while it is current
         self.model_name = model_name
         self.device = device
         self.compute_type = compute_type
-        self._load_model()
-        self.logger.info(f"WhisperService initialized with model: {model_name}, device: {device}, compute_type: {compute_type}")
+        self.cpu_threads = cpu_threads
+        self.num_workers = num_workers
+        self.tuning_store = tuning_store
+        self.warm_up = warm_up
+        self.word_timestamps = word_timestamps
+        self.model_store = model_store
+        self.local_files_only = local_files_only
+        self.decoding_preset = None
+        self.decoding_options = {}
+        self.set_decoding_preset(decoding_preset)
+        self.runtime_settings = {}
+        self.model_pool = WhisperModelPool(loader=self._create_model, max_memory_mb=model_pool_max_mb, logger=self.logger)
+        self._load_lock = threading.RLock()
+        self._ready_future = None
+        if lazy_load:
+            self.logger.info(f"WhisperService initialized with model: {model_name}, device: {device}, compute_type: {compute_type} "
+                             f"(模型将在后台或首次使用时加载)")
+        else:
+            self._load_model()
+            self.logger.info(f"WhisperService initialized with model: {model_name}, device: {device}, compute_type: {compute_type}")
+
+    @property
+    def is_ready(self) -> bool:
+        """True once the current model is loaded."""
+        return self._model is not None
+
+    def start_background_load(self) -> Future:
+        """
+        Starts loading the current model on a daemon thread.
+
+        Calling it again returns the same future while that load is pending or succeeded.
+
+        Returns:
+            Future: Resolves to the loaded model, or raises the load error.
+        """
+        with self._load_lock:
+            if self._ready_future is None:
+                self._ready_future = Future()
+                if self._model is not None:
+                    self._ready_future.set_result(self._model)
+                else:
+                    threading.Thread(target=self._background_load, args=(self._ready_future,),
+                                     name="WhisperModelLoader", daemon=True).start()
+            return self._ready_future
+
+    def _background_load(self, future: Future):
+        started_at = time.perf_counter()
+        try:
+            self._load_model()
+        except Exception as e:
+            future.set_exception(e)
+            return
+        self.logger.info(f"Whisper模型后台加载完成，用时 {time.perf_counter() - started_at:.1f}s。")
+        future.set_result(self._model)
+
+    def wait_until_ready(self, timeout: float = None):
+        """
+        Blocks until the model is loaded; loads it on this thread if no background load is pending.
+
+        A failed background load is raised once and then forgotten, so the next call retries.
+
+        Args:
+            timeout (float, optional): Maximum seconds to wait for a pending background load.
+
+        Returns:
+            WhisperModel: The loaded model.
+
+        Raises:
+            concurrent.futures.TimeoutError: If the background load does not finish within `timeout`.
+            Exception: The error raised while loading the model.
+        """
+        future = self._ready_future
+        if future is not None:
+            if future.done() and future.exception() is not None:
+                self._ready_future = None
+            future.result(timeout)
+        with self._load_lock:
+            if self._model is None:
+                self._load_model()
+            return self._model
+
+    def set_decoding_preset(self, preset: str):
+        """
+        Selects the decoding options used by all following transcriptions.
+
+        Args:
+            preset (str): "draft", "balanced" or "final" (see `DECODING_PRESETS`).
+
+        Raises:
+            ValueError: If the preset is unknown.
+        """
+        if preset not in DECODING_PRESETS:
+            raise ValueError(f"未知的解码预设: {preset} (可选: {', '.join(DECODING_PRESETS)})")
+        if preset != self.decoding_preset:
+            self.logger.info(f"Whisper解码预设: {preset} {DECODING_PRESETS[preset]}")
+        self.decoding_preset = preset
+        self.decoding_options = dict(DECODING_PRESETS[preset])
+
+    def cache_signature(self) -> Dict[str, Any]:
+        """Returns the settings that determine the transcription output, for keying cached ASR results."""
+        compute_type = self.runtime_settings.get("compute_type") if self._model is not None else None
+        if compute_type is None:
+            compute_type = self._resolve_runtime_settings(verbose=False)["compute_type"]
+        signature = {"backend": "faster-whisper", "model": self.model_name, "device": self.device,
+                     "compute_type": compute_type, "decoding_preset": self.decoding_preset, "decoding": self.decoding_options,
+                     "word_timestamps": self.word_timestamps}
+        _, store_signature = self._model_source(self.model_name)
+        if store_signature:
+            signature["model_store"] = store_signature
+        return signature
+
+    def _model_source(self, model_name: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """Returns (name or stored directory to load, local model store signature or None) of `model_name`."""
+        if self.model_store and self.model_store.has_model(model_name):
+            store_signature = self.model_store.signature(model_name)
+            return store_signature["path"], store_signature
+        return model_name, None
+
+    def _pool_key(self, model_name: str, compute_type: str) -> Tuple[str, str, str, str]:
+        """Model pool key: stored models are keyed by directory and by their weights' quantization/checksum."""
+        source, store_signature = self._model_source(model_name)
+        revision = f"{store_signature['quantization'] or 'original'}:{(store_signature['model_sha256'] or '')[:16]}" if store_signature else ""
+        return source, self.device, compute_type, revision
+
+    def _ensure_model(self) -> bool:
+        """`wait_until_ready` for the transcription methods: logs a load failure and returns False."""
+        try:
+            self.wait_until_ready()
+            return True
+        except Exception as e:
+            self.logger.error(f"Whisper模型加载失败，无法转录: {e}")
+            return False
+
+    def _resolve_runtime_settings(self, verbose: bool = True) -> Dict[str, Any]:
+        """
+        Returns the compute_type/cpu_threads/num_workers to load the current model with.
+
+        Args:
+            verbose (bool): Log the choice at info level (model loads); otherwise at debug level,
+                            since `cache_signature` resolves the settings for every file.
+        """
+        log = self.logger.info if verbose else self.logger.debug
+        settings = {"compute_type": self.compute_type, "cpu_threads": self.cpu_threads, "num_workers": self.num_workers}
+        if self.compute_type != "auto":
+            return settings
+        tuned = self.tuning_store.get(self.model_name, self.device) if self.tuning_store else None
+        if tuned:
+            log(f"使用已校准的ASR运行参数: {self.model_name}/{self.device} -> {tuned}")
+            tuned_settings = {key: tuned.get(key, settings[key]) for key in settings}
+            # Never run fewer workers than the caller needs for concurrent transcriptions
+            tuned_settings["num_workers"] = max(tuned_settings["num_workers"], self.num_workers)
+            return tuned_settings
+        log(f"{self.model_name}/{self.device} 尚未校准，使用 float32 (可运行 intellisubs.core.asr_services.calibration 进行调优)。")
+        settings["compute_type"] = "float32"
+        return settings
 
     def _load_model(self):
-        """Loads the Whisper model based on current settings."""
+        """Loads the Whisper model based on current settings, reusing it from the model pool if resident."""
         try:
-            self.logger.info(f"Loading Whisper model: {self.model_name} on {self.device} with {self.compute_type} compute type...")
-            self._model = WhisperModel(self.model_name, device=self.device, compute_type=self.compute_type)
-            self.logger.info("Whisper model loaded successfully.")
+            with self._load_lock:
+                self.runtime_settings = self._resolve_runtime_settings()
+                if self._model_key is not None:
+                    self.model_pool.unpin(*self._model_key)
+                # Drop our reference first, otherwise an evicted model stays alive while the next one loads
+                self._model = None
+                self._model_key = None
+                model_key = self._pool_key(self.model_name, self.runtime_settings["compute_type"])
+                self._model = self.model_pool.acquire(*model_key)
+                # The current model is referenced here, so evicting it (e.g. when a refinement model is loaded) would not free it
+                self.model_pool.pin(*model_key)
+                self._model_key = model_key
         except Exception as e:
             self.logger.error(f"Failed to load Whisper model {self.model_name}: {e}", exc_info=True)
             raise # Re-raise the exception to indicate a critical failure
 
-    def transcribe(self, audio_path: str, language: str = None) -> Tuple[List[Dict[str, Any]], Any]:
+    def release_unused_models(self):
+        """Evicts models other than the current one that do not fit the model pool budget, e.g. after `model_name` transcriptions."""
+        self.model_pool.trim()
+
+    def _create_model(self, model_name: str, device: str, compute_type: str) -> WhisperModel:
+        """Model pool loader: creates a new `WhisperModel` with the resolved thread settings."""
+        cpu_threads = self.runtime_settings.get("cpu_threads", self.cpu_threads)
+        num_workers = self.runtime_settings.get("num_workers", self.num_workers)
+        self.logger.info(f"Loading Whisper model: {model_name} on {device} with {compute_type} compute type "
+                         f"(cpu_threads={cpu_threads}, num_workers={num_workers})...")
+        # Models from the local model store arrive here as their stored directory (see `_pool_key`)
+        model = WhisperModel(model_name, device=device, compute_type=compute_type,
+                             cpu_threads=cpu_threads, num_workers=num_workers, local_files_only=self.local_files_only)
+        self.logger.info("Whisper model loaded successfully.")
+        if self.warm_up:
+            self._warm_up_model(model)
+        return model
+
+    def _warm_up_model(self, model: WhisperModel):
+        """Runs a one-second silent inference so buffers are allocated before the first real file."""
+        started_at = time.perf_counter()
+        try:
+            segments_generator, _ = model.transcribe(np.zeros(16000, dtype=np.float32), language="en",
+                                                   **{**self.decoding_options, "vad_filter": False})
+            for _ in segments_generator:
+                pass
+        except Exception as e:
+            self.logger.warning(f"Whisper模型预热失败 (不影响转录): {e}")
+            return
+        self.logger.info(f"Whisper模型预热完成，用时 {time.perf_counter() - started_at:.2f}s。")
+
+    def transcribe(self, audio: Union[str, np.ndarray], language: str = None,
+                   progress_callback: Callable[[float, float, Dict[str, Any]], None] = None,
+                   model_name: str = None) -> Tuple[List[Dict[str, Any]], Any]:
         """
-        Transcribes the audio file using Whisper.
+        Transcribes audio using Whisper.
 
         Args:
-            audio_path (str): Path to the audio file.
+            audio (str | np.ndarray): Path to the audio file, or mono float32 samples at 16kHz
+                                      (e.g., from `AudioProcessor.decode_audio_to_array`).
             language (str, optional): Language code for transcription (e.g., "en", "ja", "zh").
                                       If None, faster-whisper will attempt to auto-detect the language.
+            progress_callback (Callable, optional): Called for every decoded segment, see `transcribe_stream`.
+            model_name (str, optional): Decode with this model instead of the current one, see `transcribe_stream`.
 
         Returns:
             tuple[list[dict], Any]: A tuple containing:
-                - A list of segment dictionaries (e.g., [{'text': "...", 'start': 0.0, 'end': 1.5}, ...]).
+                - A list of segment dictionaries (e.g., [{'text': "...", 'start': 0.0, 'end': 1.5,
+                  'avg_logprob': -0.3, 'no_speech_prob': 0.01, 'compression_ratio': 1.4}, ...]).
                 - Transcription info object from faster-whisper.
                 Returns ([], None) on error during transcription.
         """
-        if not self._model:
-            self.logger.error("Whisper model is not loaded. Cannot transcribe.")
-            # raise RuntimeError("Whisper model is not loaded.") # Or return error tuple
+        if not self._ensure_model():
             return [], None
 
-
-        log_lang = language if language else "auto-detect"
-        self.logger.info(f"开始转录: {audio_path} (模型: {self.model_name}, 设备: {self.device}, 语言: {log_lang})")
-        
+        audio_desc = self._describe_audio(audio)
         try:
-            # Pass the language parameter to faster-whisper.
-            # If language is None, faster-whisper performs language detection.
-            segments_generator, info = self._model.transcribe(audio_path, beam_size=5, language=language)
-            
-            transcribed_segments = []
-            for segment in segments_generator:
-                transcribed_segments.append({
-                    "start": segment.start,
-                    "end": segment.end,
-                    "text": segment.text.strip() # Ensure text is stripped
-                })
+            segments_iterator, info = self.transcribe_stream(audio, language=language, progress_callback=progress_callback,
+                                                             model_name=model_name)
+            transcribed_segments = list(segments_iterator)
             self.logger.info(f"转录完成。检测语言: '{info.language}' (概率: {info.language_probability:.2f})，共 {len(transcribed_segments)} 个片段。")
             return transcribed_segments, info
         except Exception as e:
-            self.logger.error(f"ASR转录过程中发生错误 for {audio_path}: {e}", exc_info=True)
+            self.logger.error(f"ASR转录过程中发生错误 for {audio_desc}: {e}", exc_info=True)
+            return [], None
+
+    def transcribe_stream(self, audio: Union[str, np.ndarray], language: str = None,
+                          progress_callback: Callable[[float, float, Dict[str, Any]], None] = None,
+                          model_name: str = None) -> Tuple[Iterator[Dict[str, Any]], Any]:
+        """
+        Starts a transcription and returns a lazy iterator that yields segments as they are decoded.
+
+        faster-whisper decodes one 30-second window per step of its generator, so the first
+        segments are available within seconds instead of after the whole file. Errors raised
+        while decoding propagate from the iterator.
+
+        Args:
+            audio (str | np.ndarray): Path to the audio file, or mono float32 samples at 16kHz.
+            language (str, optional): Language code; None lets faster-whisper detect it (this runs eagerly).
+            progress_callback (Callable[[float, float, dict], None], optional): Called after each segment as
+                `progress_callback(progress, rtf, segment)`, where `progress` is segment end / audio duration
+                (0-1) and `rtf` is the wall time spent so far per second of audio decoded.
+            model_name (str, optional): Decode with this model (e.g. a larger one for re-decoding a few
+                                        segments). It is taken from the model pool, loaded with the current
+                                        device and compute type if it is not resident; the current model
+                                        stays selected and loaded. Call `release_unused_models` when done
+                                        to evict it again if it exceeds the pool budget.
+
+        Returns:
+            tuple[Iterator[dict], Any]: (segment dictionaries like `transcribe`, transcription info).
+
+        Raises:
+            RuntimeError: If the model cannot be loaded.
+        """
+        try:
+            self.wait_until_ready()
+        except Exception as e:
+            raise RuntimeError(f"Whisper模型未加载，无法转录: {e}") from e
+
+        model = self._model
+        if model_name and model_name != self.model_name:
+            try:
+                model = self.model_pool.acquire(*self._pool_key(model_name, self.runtime_settings["compute_type"]))
+            except Exception as e:
+                raise RuntimeError(f"无法加载Whisper模型 {model_name}: {e}") from e
+
+        log_lang = language if language else "auto-detect"
+        self.logger.info(f"开始转录: {self._describe_audio(audio)} (模型: {model_name or self.model_name}, 设备: {self.device}, "
+                         f"语言: {log_lang}, 预设: {self.decoding_preset})")
+        started_at = time.perf_counter()
+        # If language is None, faster-whisper performs language detection before returning.
+        segments_generator, info = model.transcribe(audio, language=language, word_timestamps=self.word_timestamps,
+                                                    **self.decoding_options)
+        return self._iterate_segments(segments_generator, info, started_at, progress_callback, self.word_timestamps), info
+
+    def transcribe_batched(self, audio: np.ndarray, clips: List[Tuple[float, float]], language: str = None,
+                           batch_size: int = 8, progress_callback: Callable[[float, float, Dict[str, Any]], None] = None) -> Tuple[List[Dict[str, Any]], Any]:
+        """
+        Transcribes pre-chunked clips of one file with faster-whisper's `BatchedInferencePipeline`.
+
+        Up to `batch_size` clips are decoded together, which keeps all cores (or the GPU) busy
+        where single-stream beam search leaves most of them idle. Segment timestamps come back
+        on the file's timeline and are stitched with `stitch_clip_segments`.
+
+        Args:
+            audio (np.ndarray): Mono float32 samples at 16kHz.
+            clips (list[tuple[float, float]]): (start_sec, end_sec) clips of at most 30 s
+                                               (e.g. from `AudioProcessor.plan_clips`).
+            language (str, optional): Language code; None lets faster-whisper detect it.
+            batch_size (int): Number of clips decoded per batch.
+            progress_callback (Callable, optional): Per-segment progress callback, see `transcribe_stream`.
+
+        Returns:
+            tuple[list[dict], Any]: Same as `transcribe`; ([], None) on error.
+        """
+        if not self._ensure_model():
+            return [], None
+        if not clips:
+            return [], None
+
+        audio_desc = self._describe_audio(audio)
+        self.logger.info(f"开始批量转录: {audio_desc}, {len(clips)} 个片段 (batch_size={batch_size}, 模型: {self.model_name}, "
+                         f"设备: {self.device}, 语言: {language if language else 'auto-detect'})")
+        try:
+            started_at = time.perf_counter()
+            pipeline = BatchedInferencePipeline(model=self._model)
+            # The clips already are the speech regions; the pipeline's own VAD would replace them
+            options = {**self.decoding_options, "vad_filter": False}
+            segments_generator, info = pipeline.transcribe(
+                audio, language=language, batch_size=batch_size, without_timestamps=False,
+                clip_timestamps=[{"start": start, "end": end} for start, end in clips],
+                word_timestamps=self.word_timestamps, **options
+            )
+            segments = stitch_clip_segments(list(self._iterate_segments(segments_generator, info, started_at, progress_callback,
+                                                                        self.word_timestamps)), clips)
+            elapsed = time.perf_counter() - started_at
+            self.logger.info(f"批量转录完成: {len(segments)} 个片段, 用时 {elapsed:.1f}s (RTF {elapsed / max(len(audio) / 16000, 1e-6):.3f})。")
+            return segments, info
+        except Exception as e:
+            self.logger.error(f"批量ASR转录过程中发生错误 for {audio_desc}: {e}", exc_info=True)
             return [], None
 
+    def detect_language(self, audio: np.ndarray) -> Tuple[str, float]:
+        """
+        Detects the spoken language with faster-whisper's detector on the first 30 seconds of `audio`.
+
+        This is one encoder pass plus one decoder step, far cheaper than a transcription, so it
+        can run per file before choosing the language-specific processing stages.
+
+        Args:
+            audio (np.ndarray): Mono float32 samples at 16kHz, ideally speech only.
+
+        Returns:
+            tuple[str, float]: (language code, probability).
+
+        Raises:
+            RuntimeError: If the model cannot be loaded.
+        """
+        try:
+            self.wait_until_ready()
+        except Exception as e:
+            raise RuntimeError(f"Whisper模型未加载，无法检测语言: {e}") from e
+        started_at = time.perf_counter()
+        language, probability, _ = self._model.detect_language(audio)
+        self.logger.info(f"语言检测: '{language}' (概率: {probability:.2f}), 用时 {time.perf_counter() - started_at:.2f}s")
+        return language, probability
+
+    @staticmethod
+    def _iterate_segments(segments_generator, info, started_at: float,
+                          progress_callback: Callable[[float, float, Dict[str, Any]], None] = None,
+                          with_words: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Converts faster-whisper segments to dictionaries and reports progress after each one.
+
+        Besides `start`/`end`/`text`, each dictionary keeps the decoder's confidence measures
+        (`avg_logprob`, `no_speech_prob`, `compression_ratio`; see `find_low_confidence_runs`)
+        and, with `with_words`, the segment's words as a `WordTimestampStore` under "words".
+        """
+        duration = getattr(info, "duration", 0) or 0
+        for segment in segments_generator:
+            segment_dict = {
+                "start": segment.start,
+                "end": segment.end,
+                "text": segment.text.strip(), # Ensure text is stripped
+                "avg_logprob": getattr(segment, "avg_logprob", None),
+                "no_speech_prob": getattr(segment, "no_speech_prob", None),
+                "compression_ratio": getattr(segment, "compression_ratio", None)
+            }
+            if with_words:
+                segment_dict["words"] = WordTimestampStore.from_words(segment.words)
+            if progress_callback:
+                elapsed = time.perf_counter() - started_at
+                progress = min(1.0, segment.end / duration) if duration > 0 else 0.0
+                rtf = elapsed / segment.end if segment.end > 0 else 0.0
+                progress_callback(progress, rtf, segment_dict)
+            yield segment_dict
+
+    @staticmethod
+    def _describe_audio(audio: Union[str, np.ndarray]) -> str:
+        """Returns a short human-readable description of the audio input for logging."""
+        if isinstance(audio, np.ndarray):
+            return f"<内存音频 {len(audio) / 16000:.2f} 秒>"
+        return str(audio)
+
 
     def update_model_and_device(self, model_name: str, device: str):
         """
-        Updates the Whisper model and device. Reloads the model if settings change.
+        Updates the Whisper model and device. Switches models if settings change; models still
+        resident in the model pool are reused without reloading.
         """
+        if self._ready_future is not None and not self._ready_future.done():
+            self.logger.info("等待后台加载的Whisper模型完成...")
+            wait_futures([self._ready_future])
         if self.model_name != model_name or self.device != device:
             self.logger.info(f"更新Whisper模型/设备：从 {self.model_name}/{self.device} 到 {model_name}/{device}")
             self.model_name = model_name
@@ -0,0 +1,184 @@
+# Compact word-level timestamps captured from faster-whisper
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+class WordTimestampStore:
+    """
+    Word timings of a transcript kept in parallel arrays instead of per-word objects.
+
+    `starts`, `ends` and `probabilities` are float32 arrays; the word texts are concatenated into
+    one string and `offsets` (int32, one longer than the word count) marks where each word begins,
+    so word i is `text[offsets[i]:offsets[i + 1]]`. Words keep Whisper's spacing (English words
+    start with a space), so any slice of the buffer reads as text. An hour-long file with ~100k
+    words takes about 2 MB this way instead of tens of MB as dictionaries, which keeps the words
+    of every processed file around for splitting or re-timing cues at word precision.
+
+    Stores are immutable in practice: every transform returns a new store.
+    """
+
+    def __init__(self, starts: np.ndarray, ends: np.ndarray, text: str, offsets: np.ndarray,
+                 probabilities: Optional[np.ndarray] = None):
+        """
+        Args:
+            starts (np.ndarray): Word start times in seconds.
+            ends (np.ndarray): Word end times in seconds.
+            text (str): All word texts concatenated.
+            offsets (np.ndarray): Start of each word in `text`, followed by `len(text)`.
+            probabilities (np.ndarray, optional): Per-word probabilities; NaN when unknown.
+        """
+        self.starts = np.asarray(starts, dtype=np.float32)
+        self.ends = np.asarray(ends, dtype=np.float32)
+        self.text = text
+        self.offsets = np.asarray(offsets, dtype=np.int32)
+        if probabilities is None:
+            probabilities = np.full(len(self.starts), np.nan, dtype=np.float32)
+        self.probabilities = np.asarray(probabilities, dtype=np.float32)
+        if not (len(self.starts) == len(self.ends) == len(self.probabilities) == len(self.offsets) - 1):
+            raise ValueError("单词时间戳数组长度不一致")
+
+    @classmethod
+    def empty(cls) -> "WordTimestampStore":
+        return cls(np.zeros(0), np.zeros(0), "", np.zeros(1))
+
+    @classmethod
+    def from_words(cls, words: Iterable[Any]) -> "WordTimestampStore":
+        """Builds a store from faster-whisper `Word` objects (anything with `start`, `end`, `word`, `probability`)."""
+        words = list(words or [])
+        texts = [word.word for word in words]
+        offsets = np.zeros(len(words) + 1, dtype=np.int32)
+        np.cumsum([len(text) for text in texts], out=offsets[1:])
+        return cls([word.start for word in words], [word.end for word in words], "".join(texts), offsets,
+                   [getattr(word, "probability", np.nan) for word in words])
+
+    @classmethod
+    def concatenate(cls, stores: Iterable["WordTimestampStore"]) -> "WordTimestampStore":
+        """
+        Joins stores (e.g. the words of all segments of a file) into one store ordered by start time.
+
+        Returns:
+            WordTimestampStore: A new store; an empty one if there are no words.
+        """
+        stores = [store for store in stores if store is not None and len(store)]
+        if not stores:
+            return cls.empty()
+        offsets = [stores[0].offsets]
+        base = stores[0].offsets[-1]
+        for store in stores[1:]:
+            offsets.append(store.offsets[1:] + base)
+            base += store.offsets[-1]
+        joined = cls(np.concatenate([store.starts for store in stores]), np.concatenate([store.ends for store in stores]),
+                     "".join(store.text for store in stores), np.concatenate(offsets),
+                     np.concatenate([store.probabilities for store in stores]))
+        if len(joined) > 1 and np.any(np.diff(joined.starts) < 0):
+            joined = joined.take(np.argsort(joined.starts, kind="stable"))
+        return joined
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory of the arrays and the text buffer in bytes."""
+        return (self.starts.nbytes + self.ends.nbytes + self.probabilities.nbytes + self.offsets.nbytes +
+                len(self.text.encode("utf-8")))
+
+    def word(self, index: int) -> Tuple[float, float, str]:
+        """Returns (start, end, text) of one word."""
+        return float(self.starts[index]), float(self.ends[index]), self.text[self.offsets[index]:self.offsets[index + 1]]
+
+    def words_text(self, first: int, stop: int) -> str:
+        """Returns the text of words `first` to `stop - 1` as one string."""
+        if stop <= first:
+            return ""
+        return self.text[self.offsets[first]:self.offsets[stop]]
+
+    def index_range(self, start_sec: float, end_sec: float) -> Tuple[int, int]:
+        """
+        Finds the words whose midpoint lies in [start_sec, end_sec).
+
+        Returns:
+            tuple[int, int]: (first index, index after the last); equal if no word is in the range.
+        """
+        first = int(np.searchsorted(self.ends, start_sec, side="right"))
+        stop = max(first, int(np.searchsorted(self.starts, end_sec, side="left")))
+        if first < stop and (self.starts[first] + self.ends[first]) / 2.0 < start_sec:
+            first += 1
+        if first < stop and (self.starts[stop - 1] + self.ends[stop - 1]) / 2.0 >= end_sec:
+            stop -= 1
+        return first, stop
+
+    def boundaries(self, start_sec: float, end_sec: float) -> np.ndarray:
+        """
+        Returns the times between consecutive words inside [start_sec, end_sec), i.e. where a cue
+        covering that range can be split without cutting a word (midpoints of the inter-word gaps).
+        """
+        first, stop = self.index_range(start_sec, end_sec)
+        if stop - first < 2:
+            return np.zeros(0, dtype=np.float32)
+        return (self.ends[first:stop - 1] + self.starts[first + 1:stop]) / 2.0
+
+    def nearest_boundary(self, time_sec: float, start_sec: float, end_sec: float) -> Optional[float]:
+        """Returns the word boundary inside [start_sec, end_sec) closest to `time_sec`, or None if there is none."""
+        candidates = self.boundaries(start_sec, end_sec)
+        if not len(candidates):
+            return None
+        return float(candidates[int(np.argmin(np.abs(candidates - time_sec)))])
+
+    def take(self, indices: np.ndarray) -> "WordTimestampStore":
+        """Returns a new store with the words at `indices`, in that order."""
+        indices = np.asarray(indices, dtype=np.int64)
+        texts = [self.text[self.offsets[i]:self.offsets[i + 1]] for i in indices]
+        offsets = np.zeros(len(texts) + 1, dtype=np.int32)
+        np.cumsum([len(text) for text in texts], out=offsets[1:])
+        return WordTimestampStore(self.starts[indices], self.ends[indices], "".join(texts), offsets,
+                                  self.probabilities[indices])
+
+    def slice(self, first: int, stop: int) -> "WordTimestampStore":
+        """Returns a new store with words `first` to `stop - 1` (contiguous, no per-word work)."""
+        stop = max(first, stop)
+        offsets = self.offsets[first:stop + 1]
+        return WordTimestampStore(self.starts[first:stop], self.ends[first:stop],
+                                  self.text[offsets[0]:offsets[-1]] if len(offsets) else "",
+                                  offsets - offsets[0] if len(offsets) else np.zeros(1),
+                                  self.probabilities[first:stop])
+
+    def shifted(self, offset_sec: float) -> "WordTimestampStore":
+        """Returns a copy with all times moved by `offset_sec`."""
+        return WordTimestampStore(self.starts + offset_sec, self.ends + offset_sec, self.text, self.offsets, self.probabilities)
+
+    def mapped(self, to_timeline: Callable[[np.ndarray, bool], np.ndarray]) -> "WordTimestampStore":
+        """
+        Returns a copy with times passed through `to_timeline(times, is_end)` (vectorized), e.g. from
+        the compacted speech timeline back to the original one (see `AudioProcessor.remap_segment_times`).
+        """
+        starts = to_timeline(self.starts.astype(np.float64), False)
+        ends = np.maximum(to_timeline(self.ends.astype(np.float64), True), starts)
+        return WordTimestampStore(starts, ends, self.text, self.offsets, self.probabilities)
+
+    def splice(self, start_sec: float, end_sec: float, other: "WordTimestampStore") -> "WordTimestampStore":
+        """Replaces the words in [start_sec, end_sec) with the words of `other` (e.g. after re-transcribing a range)."""
+        first, stop = self.index_range(start_sec, end_sec)
+        other_first, other_stop = other.index_range(start_sec, end_sec)
+        return WordTimestampStore.concatenate([self.slice(0, first), other.slice(other_first, other_stop),
+                                               self.slice(stop, len(self))])
+
+    def to_dict(self) -> Dict[str, List]:
+        """JSON-serializable form (times rounded to milliseconds), see `from_dict`."""
+        return {
+            "starts": np.round(self.starts, 3).tolist(),
+            "ends": np.round(self.ends, 3).tolist(),
+            "text": self.text,
+            "offsets": self.offsets.tolist(),
+            "probabilities": np.round(np.nan_to_num(self.probabilities, nan=-1.0), 3).tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, List]) -> "WordTimestampStore":
+        probabilities = np.asarray(data.get("probabilities", []), dtype=np.float32)
+        if len(probabilities) == len(data["starts"]):
+            probabilities[probabilities < 0] = np.nan
+        else:
+            probabilities = None
+        return cls(data["starts"], data["ends"], data["text"], data["offsets"], probabilities)
@@ -0,0 +1,170 @@
+# Persistent cache of decoded (preprocessed) audio
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Optional
+
+import numpy as np
+
+CACHE_FORMAT_VERSION = 1
+PCM_EXTENSION = ".pcm"
+
+class DecodedAudioCache:
+    """
+    Content-addressed, size-capped cache of decoded 16-bit mono PCM files.
+
+    Entries are keyed by a fast fingerprint of the source media (size, mtime and a hash of a few
+    sampled blocks) combined with the decode parameters, so re-transcribing the same media with a
+    different model or language skips ffmpeg entirely. The cache is evicted least-recently-used
+    first; a hit refreshes the entry's mtime.
+    """
+
+    SAMPLE_BLOCK_SIZE = 64 * 1024
+    SAMPLE_BLOCK_COUNT = 8
+
+    def __init__(self, cache_dir: str, max_size_mb: Optional[float] = 4096, logger: logging.Logger = None):
+        """
+        Initializes the cache.
+
+        Args:
+            cache_dir (str): Directory holding the cached PCM files. Created if missing.
+            max_size_mb (float | None): Total size cap in megabytes before LRU eviction kicks in;
+                                        None disables eviction (e.g. for a per-session store).
+            logger (logging.Logger, optional): Logger instance.
+        """
+        self.logger = logger if logger else logging.getLogger(self.__class__.__name__)
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_size_bytes = None if max_size_mb is None else int(max_size_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.logger.info(f"DecodedAudioCache initialized at {self.cache_dir} (上限 {max_size_mb} MB)")
+
+    def fingerprint(self, media_path: str, decode_params: dict = None) -> str:
+        """
+        Computes the cache key for a media file and decode parameters.
+
+        Reads at most SAMPLE_BLOCK_COUNT + 1 blocks of the file, so it stays fast for multi-GB media.
+
+        Args:
+            media_path (str): Path to the source media file.
+            decode_params (dict, optional): Parameters that change the decoded output
+                                            (sample rate, selected stream, filters, ...).
+
+        Returns:
+            str: Hex digest usable as a file name.
+        """
+        stat = os.stat(media_path)
+        hasher = hashlib.sha1()
+        hasher.update(f"v{CACHE_FORMAT_VERSION}|{stat.st_size}|{stat.st_mtime_ns}|".encode())
+        hasher.update(json.dumps(decode_params or {}, sort_keys=True).encode())
+
+        with open(media_path, "rb") as f:
+            if stat.st_size <= self.SAMPLE_BLOCK_SIZE * (self.SAMPLE_BLOCK_COUNT + 1):
+                hasher.update(f.read())
+            else:
+                last_block_start = stat.st_size - self.SAMPLE_BLOCK_SIZE
+                for i in range(self.SAMPLE_BLOCK_COUNT + 1):
+                    f.seek(last_block_start * i // self.SAMPLE_BLOCK_COUNT)
+                    hasher.update(f.read(self.SAMPLE_BLOCK_SIZE))
+        return hasher.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Looks up a cached PCM file.
+
+        Args:
+            key (str): Key from `fingerprint`.
+
+        Returns:
+            str | None: Path of the cached PCM file, or None on a miss.
+        """
+        entry_path = self._entry_path(key)
+        if not os.path.isfile(entry_path):
+            self.logger.debug(f"音频缓存未命中: {key}")
+            return None
+        try:
+            os.utime(entry_path, None) # Mark as most recently used
+        except OSError as e:
+            self.logger.warning(f"无法更新音频缓存条目时间戳 {entry_path}: {e}")
+        self.logger.info(f"音频缓存命中: {key}")
+        return entry_path
+
+    def reserve_path(self, key: str) -> str:
+        """Returns a temporary path to decode into before calling `commit`."""
+        # Thread ids repeat across processes (ASR worker pool), so the pid is part of the name
+        return f"{self._entry_path(key)}.{os.getpid()}.{threading.get_ident()}.partial"
+
+    def commit(self, key: str, partial_path: str) -> str:
+        """
+        Atomically moves a fully written PCM file into the cache and enforces the size cap.
+
+        Args:
+            key (str): Key from `fingerprint`.
+            partial_path (str): Path returned by `reserve_path` that now holds the decoded PCM.
+
+        Returns:
+            str: Final path of the cache entry.
+        """
+        entry_path = self._entry_path(key)
+        os.replace(partial_path, entry_path)
+        self.logger.info(f"音频已写入缓存: {entry_path} ({os.path.getsize(entry_path) / (1024 * 1024):.1f} MB)")
+        self._evict(keep_path=entry_path)
+        return entry_path
+
+    def store_array(self, key: str, pcm16: np.ndarray) -> Optional[str]:
+        """
+        Writes already decoded int16 samples as a cache entry (e.g. from a background thread).
+
+        Returns:
+            str | None: Final path of the cache entry, or None if writing failed.
+        """
+        partial_path = self.reserve_path(key)
+        try:
+            np.ascontiguousarray(pcm16, dtype=np.int16).tofile(partial_path)
+            return self.commit(key, partial_path)
+        except Exception as e:
+            self.logger.warning(f"写入音频缓存失败 ({key}): {e}", exc_info=True)
+            self.discard(partial_path)
+            return None
+
+    def discard(self, partial_path: str):
+        """Removes a partial file left behind by a failed decode."""
+        try:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+        except OSError as e:
+            self.logger.warning(f"无法删除未完成的音频缓存文件 {partial_path}: {e}")
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}{PCM_EXTENSION}")
+
+    def _evict(self, keep_path: str = None):
+        """Deletes least-recently-used entries until the cache fits in `max_size_bytes`."""
+        if self.max_size_bytes is None:
+            return
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith(PCM_EXTENSION):
+                    continue
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            total_size = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total_size <= self.max_size_bytes:
+                    break
+                if path == keep_path:
+                    continue
+                try:
+                    os.remove(path)
+                    total_size -= size
+                    self.logger.info(f"音频缓存超出上限，已淘汰: {os.path.basename(path)} ({size / (1024 * 1024):.1f} MB)")
+                except OSError as e:
+                    self.logger.warning(f"淘汰音频缓存条目失败 {path}: {e}")
@@ -0,0 +1,291 @@
+# Spectral-gating noise reduction implemented with NumPy only
+import logging
+from collections import deque
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+
+class SpectralGate:
+    """
+    Stationary-noise spectral gate (the technique used by `noisereduce`), vectorized with NumPy.
+
+    A per-frequency noise profile (mean and standard deviation of the magnitude in dB) is
+    estimated from the quietest STFT frames. Time-frequency bins that do not rise above
+    `mean + threshold_std * std` are attenuated by up to `reduction_db`, with a soft ramp of
+    `ramp_db` to avoid "musical noise". The STFT is computed block by block, so temporary
+    memory is bounded by `block_frames` regardless of the input length.
+    """
+
+    def __init__(self, sample_rate: int = 16000, n_fft: int = 512, reduction_db: float = 12.0,
+                 threshold_std: float = 1.5, noise_percentile: float = 10.0, ramp_db: float = 6.0,
+                 block_frames: int = 2048, logger: logging.Logger = None):
+        """
+        Args:
+            sample_rate (int): Sample rate of the input samples.
+            n_fft (int): FFT size; the hop size is n_fft / 4.
+            reduction_db (float): Maximum attenuation applied to noise bins, in dB.
+            threshold_std (float): Standard deviations above the noise mean a bin must reach to pass.
+            noise_percentile (float): Percentage of the quietest frames used for the noise profile.
+            ramp_db (float): Width of the soft transition between attenuated and passed bins, in dB.
+            block_frames (int): STFT frames processed per block (bounds temporary memory).
+            logger (logging.Logger, optional): Logger instance.
+        """
+        if n_fft % 4:
+            raise ValueError(f"n_fft 必须是4的倍数: {n_fft}")
+        self.logger = logger if logger else logging.getLogger(self.__class__.__name__)
+        self.sample_rate = sample_rate
+        self.n_fft = n_fft
+        self.hop = n_fft // 4
+        self.reduction_db = reduction_db
+        self.threshold_std = threshold_std
+        self.noise_percentile = noise_percentile
+        self.ramp_db = ramp_db
+        self.block_frames = max(1, int(block_frames))
+        # Periodic Hann: with 75% overlap the squared windows sum to exactly 1.5 (analysis + synthesis)
+        self._window = (0.5 - 0.5 * np.cos(2 * np.pi * np.arange(n_fft) / n_fft)).astype(np.float32)
+        self._ola_gain = np.float32(1.5)
+        self.noise_profile: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    def estimate_noise_profile(self, audio: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Estimates and stores the noise profile from the quietest frames of `audio`.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Per-bin (mean_db, std_db) of the noise magnitude.
+        """
+        mean_db, std_db, count = self._noise_statistics(audio)
+        self.noise_profile = (mean_db, std_db)
+        self.logger.info(f"降噪: 已从 {count} 个最安静的帧估计噪声谱 (平均 {float(mean_db.mean()):.1f} dB)")
+        return self.noise_profile
+
+    def _noise_statistics(self, audio: np.ndarray) -> Tuple[np.ndarray, np.ndarray, int]:
+        """Returns (mean_db, std_db, frame count) of the quietest frames of `audio` without storing them."""
+        padded = self._pad(audio)
+        num_frames = self._num_frames(padded)
+        frame_energy = np.empty(num_frames, dtype=np.float32)
+        for block_start in range(0, num_frames, self.block_frames):
+            mag_db = self._magnitude_db(self._spectrum(padded, block_start, min(self.block_frames, num_frames - block_start)))
+            frame_energy[block_start:block_start + len(mag_db)] = mag_db.mean(axis=1)
+
+        quiet_threshold = np.percentile(frame_energy, self.noise_percentile)
+        quiet_frames = np.flatnonzero(frame_energy <= quiet_threshold)
+        # Statistics are accumulated per block so only the selected frames' spectra are ever combined
+        count, total, total_sq = 0, 0.0, 0.0
+        for block_start in range(0, num_frames, self.block_frames):
+            in_block = quiet_frames[(quiet_frames >= block_start) & (quiet_frames < block_start + self.block_frames)] - block_start
+            if len(in_block) == 0:
+                continue
+            mag_db = self._magnitude_db(self._spectrum(padded, block_start, min(self.block_frames, num_frames - block_start)))[in_block]
+            count += len(mag_db)
+            total = total + mag_db.sum(axis=0, dtype=np.float64)
+            total_sq = total_sq + np.square(mag_db, dtype=np.float64).sum(axis=0)
+
+        mean_db = (total / count).astype(np.float32)
+        std_db = np.sqrt(np.maximum(total_sq / count - np.square(mean_db, dtype=np.float64), 0.0)).astype(np.float32)
+        return mean_db, std_db, count
+
+    def process(self, audio: np.ndarray) -> np.ndarray:
+        """
+        Applies the gate to mono float32 samples. Estimates the noise profile first if none is set.
+
+        Returns:
+            np.ndarray: Denoised float32 samples with the same length as `audio`.
+        """
+        if len(audio) < self.n_fft:
+            return audio
+        if self.noise_profile is None:
+            self.estimate_noise_profile(audio)
+
+        padded = self._pad(audio)
+        num_frames = self._num_frames(padded)
+        # Overlap-add in hop-sized rows: frame f covers rows f..f+3
+        output = np.zeros((len(padded) // self.hop, self.hop), dtype=np.float32)
+        for block_start in range(0, num_frames, self.block_frames):
+            block_len = min(self.block_frames, num_frames - block_start)
+            frames = self._gate_frames(self._spectrum(padded, block_start, block_len))
+            for k in range(4):
+                output[block_start + k:block_start + k + block_len] += frames[:, k, :]
+
+        head = self.n_fft - self.hop
+        output = output.reshape(-1)[head:head + len(audio)] / self._ola_gain
+        return output
+
+    def process_windows(self, windows: Iterator[Tuple[float, np.ndarray]],
+                        refresh_weight: float = 0.2) -> Iterator[Tuple[float, np.ndarray]]:
+        """
+        Applies the gate to streamed (window_start_sec, samples) windows with bounded memory.
+
+        The windows are treated as one continuous signal: only the samples a window adds after
+        the previous one enter a streaming STFT whose frame and overlap-add state is carried
+        across windows, so with the same noise profile each output window equals the matching
+        slice of `process()` on the whole signal (no padding artefacts at window edges). A window
+        is yielded once every STFT frame covering it is done, i.e. when the next window arrives
+        or the stream ends; memory stays at about one window plus the overlap.
+
+        Without a preset noise profile, it is estimated from the first window and then refreshed
+        from every following window with weight `refresh_weight` (0 keeps the first estimate),
+        so the profile follows slowly changing background noise on long recordings.
+
+        Args:
+            windows (Iterator[tuple[float, np.ndarray]]): Contiguous or overlapping windows in order.
+            refresh_weight (float): Weight of each new window's profile in the running profile.
+
+        Raises:
+            ValueError: If a window starts after the end of the previous one.
+        """
+        refresh_profile = self.noise_profile is None and refresh_weight > 0
+        pending = deque() # (window_start_sec, first sample, length) not yielded yet
+        received = 0
+        startup = [] # Input kept until there is enough to choose the padding like `process`
+        stream = None
+        for window_start_sec, samples in windows:
+            first_sample = int(round(window_start_sec * self.sample_rate))
+            if first_sample > received:
+                raise ValueError(f"音频窗口不连续: {window_start_sec:.3f}s 开始, 之前只收到 {received / self.sample_rate:.3f}s")
+            if self.noise_profile is None:
+                if len(samples) >= self.n_fft:
+                    self.estimate_noise_profile(samples)
+            elif refresh_profile and len(samples) >= self.n_fft:
+                self._refresh_noise_profile(samples, refresh_weight)
+            new_samples = np.asarray(samples[received - first_sample:], dtype=np.float32)
+            received += len(new_samples)
+            pending.append((window_start_sec, first_sample, len(samples)))
+
+            if stream is None:
+                startup.append(new_samples)
+                if received < self.n_fft + self.hop:
+                    continue
+                stream = _GateStream(self, np.concatenate(startup))
+                startup = None
+            else:
+                stream.feed(new_samples)
+            while pending and stream.is_final(pending[0][1] + pending[0][2]):
+                window_start_sec, first_sample, length = pending.popleft()
+                yield window_start_sec, stream.output(first_sample, length)
+            stream.trim(pending[0][1] if pending else received)
+
+        if stream is None:
+            # Shorter than a few frames: `process` on the whole (small) signal gives the same result
+            audio = np.concatenate(startup) if startup else np.zeros(0, dtype=np.float32)
+            if self.noise_profile is None and len(audio) >= self.n_fft:
+                self.estimate_noise_profile(audio)
+            processed = self.process(audio)
+            for window_start_sec, first_sample, length in pending:
+                yield window_start_sec, processed[first_sample:first_sample + length]
+            return
+        stream.finish()
+        for window_start_sec, first_sample, length in pending:
+            yield window_start_sec, stream.output(first_sample, length)
+
+    def _refresh_noise_profile(self, audio: np.ndarray, weight: float):
+        """Blends the profile of `audio` into the current noise profile with `weight`."""
+        previous_mean, previous_std = self.noise_profile
+        mean_db, std_db, _ = self._noise_statistics(audio)
+        self.noise_profile = ((1.0 - weight) * previous_mean + weight * mean_db,
+                              (1.0 - weight) * previous_std + weight * std_db)
+
+    def _gate_frames(self, spectrum: np.ndarray) -> np.ndarray:
+        """Gates STFT frames and returns the windowed time frames as (frames, 4, hop) for overlap-add."""
+        mean_db, std_db = self.noise_profile
+        threshold_db = mean_db + self.threshold_std * std_db
+        min_gain = np.float32(10 ** (-self.reduction_db / 20.0))
+        ramp = np.clip((self._magnitude_db(spectrum) - threshold_db) / self.ramp_db + 0.5, 0.0, 1.0)
+        gain = min_gain + (1.0 - min_gain) * ramp
+        frames = np.fft.irfft(spectrum * gain, n=self.n_fft, axis=1).astype(np.float32) * self._window
+        return frames.reshape(len(spectrum), 4, self.hop)
+
+    def _pad(self, audio: np.ndarray) -> np.ndarray:
+        # Every input sample must be covered by all 4 overlapping frames, and the padded length
+        # must be a whole number of hop rows
+        head = self.n_fft - self.hop
+        tail = head + (-(len(audio) + 2 * head) % self.hop)
+        mode = "reflect" if len(audio) > tail else "constant"
+        return np.pad(audio.astype(np.float32, copy=False), (head, tail), mode=mode)
+
+    def _num_frames(self, padded: np.ndarray) -> int:
+        return (len(padded) - self.n_fft) // self.hop + 1
+
+    def _spectrum(self, padded: np.ndarray, first_frame: int, num_frames: int) -> np.ndarray:
+        start = first_frame * self.hop
+        segment = padded[start:start + (num_frames - 1) * self.hop + self.n_fft]
+        frames = np.lib.stride_tricks.sliding_window_view(segment, self.n_fft)[::self.hop]
+        return np.fft.rfft(frames * self._window, axis=1).astype(np.complex64)
+
+    @staticmethod
+    def _magnitude_db(spectrum: np.ndarray) -> np.ndarray:
+        return 20.0 * np.log10(np.abs(spectrum) + 1e-10)
+
+
+class _GateStream:
+    """
+    Streaming STFT/overlap-add state of `SpectralGate.process_windows`.
+
+    Works on the same padded signal as `SpectralGate.process` (reflect padding of n_fft - hop
+    samples at the start, the same tail padding once the length is known), so frame f always
+    covers padded samples [f * hop, f * hop + n_fft) of the whole signal. Padded rows before
+    `next_frame` have received all four overlapping frames and are final.
+    """
+
+    def __init__(self, gate: SpectralGate, first_samples: np.ndarray):
+        self.gate = gate
+        self.head = gate.n_fft - gate.hop
+        self.padded = np.concatenate((first_samples[self.head:0:-1], first_samples)) # From padded index next_frame * hop
+        self.next_frame = 0
+        self.carry = np.zeros((3, gate.hop), dtype=np.float32) # Partial rows next_frame..next_frame + 2
+        self.output_start = 0 # Padded index of `final[0]`
+        self.final = np.zeros(0, dtype=np.float32)
+        self.received = len(first_samples)
+        self.last_samples = first_samples[-(gate.n_fft + gate.hop):].copy() # For the reflected tail
+        self._run_frames()
+
+    def feed(self, new_samples: np.ndarray):
+        if len(new_samples) == 0:
+            return
+        self.received += len(new_samples)
+        self.last_samples = np.concatenate((self.last_samples, new_samples))[-(self.gate.n_fft + self.gate.hop):]
+        self.padded = np.concatenate((self.padded, new_samples))
+        self._run_frames()
+
+    def finish(self):
+        """Appends the tail padding of `process` for the now known length and flushes all rows."""
+        hop = self.gate.hop
+        tail = self.head + (-(self.received + 2 * self.head) % hop)
+        tail_padding = np.pad(self.last_samples, (0, tail), mode="reflect")[len(self.last_samples):]
+        self.padded = np.concatenate((self.padded, tail_padding))
+        self._run_frames()
+        self._append_final(self.carry.reshape(-1))
+        self.carry = np.zeros((3, hop), dtype=np.float32)
+
+    def is_final(self, end_sample: int) -> bool:
+        """True if output samples before `end_sample` (input index) are final."""
+        return end_sample + self.head <= self.output_start + len(self.final)
+
+    def output(self, first_sample: int, length: int) -> np.ndarray:
+        start = first_sample + self.head - self.output_start
+        return self.final[start:start + length] / self.gate._ola_gain
+
+    def trim(self, first_needed_sample: int):
+        """Drops final output before `first_needed_sample` (input index)."""
+        drop = min(max(0, first_needed_sample + self.head - self.output_start), len(self.final))
+        if drop:
+            self.final = self.final[drop:]
+            self.output_start += drop
+
+    def _run_frames(self):
+        gate = self.gate
+        num_frames = (len(self.padded) - gate.n_fft) // gate.hop + 1 if len(self.padded) >= gate.n_fft else 0
+        for block_start in range(0, num_frames, gate.block_frames):
+            block_len = min(gate.block_frames, num_frames - block_start)
+            frames = gate._gate_frames(gate._spectrum(self.padded, block_start, block_len))
+            rows = np.zeros((block_len + 3, gate.hop), dtype=np.float32)
+            rows[:3] += self.carry
+            for k in range(4):
+                rows[k:k + block_len] += frames[:, k, :]
+            self._append_final(rows[:block_len].reshape(-1))
+            self.carry = rows[block_len:]
+        self.padded = self.padded[num_frames * gate.hop:]
+        self.next_frame += num_frames
+
+    def _append_final(self, samples: np.ndarray):
+        self.final = np.concatenate((self.final, samples)) if len(self.final) else samples.copy()
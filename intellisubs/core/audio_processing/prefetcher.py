@@ -0,0 +1,91 @@
+# Background audio pre-decoding for batch processing
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List
+
+class AudioPrefetcher:
+    """
+    Decodes upcoming files on a background thread while the current file is being transcribed.
+
+    A single producer thread walks `file_paths` in order and calls `prefetch_fn` for each file.
+    At most `max_ahead` files are decoded ahead of the consumer: a slot is freed every time the
+    consumer takes a result with `get`, which keeps memory bounded for long batches.
+    `prefetch_fn` receives a `cancel_event` that is set by `close`, so a running decode can stop early.
+    """
+
+    def __init__(self, prefetch_fn: Callable[..., Any], file_paths: List[str], max_ahead: int = 2,
+                 logger: logging.Logger = None):
+        """
+        Args:
+            prefetch_fn (Callable[..., Any]): Called as `prefetch_fn(file_path, cancel_event=...)`; decodes
+                                              one file and returns whatever the consumer needs.
+            file_paths (list[str]): Files in the order they will be consumed.
+            max_ahead (int): Maximum number of files decoded ahead of the consumer.
+            logger (logging.Logger, optional): Logger instance.
+        """
+        self.logger = logger if logger else logging.getLogger(self.__class__.__name__)
+        self.prefetch_fn = prefetch_fn
+        self.file_paths = list(file_paths)
+        self.max_ahead = max(1, int(max_ahead))
+        self._jobs = [(path, Future()) for path in self.file_paths]
+        self._futures: Dict[str, Future] = dict(self._jobs)
+        self._slots = threading.Semaphore(self.max_ahead)
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="AudioPrefetcher", daemon=True)
+
+    def start(self):
+        """Starts the background producer thread."""
+        self.logger.info(f"AudioPrefetcher: 开始预解码 {len(self.file_paths)} 个文件 (最多提前 {self.max_ahead} 个)。")
+        self._thread.start()
+
+    def get(self, file_path: str):
+        """
+        Waits for the prefetched result of `file_path` and frees a slot for the next file.
+
+        Returns:
+            Any: The value returned by `prefetch_fn`, or None if the file was not prefetched or
+                 prefetching failed (the caller then decodes the file itself and reports errors).
+        """
+        future = self._futures.pop(file_path, None)
+        if future is None:
+            return None
+        try:
+            return future.result()
+        except Exception as e:
+            self.logger.warning(f"AudioPrefetcher: 预解码失败，将在处理时重新解码 {file_path}: {e}")
+            return None
+        finally:
+            self._slots.release()
+
+    def close(self, timeout: float = 10.0):
+        """
+        Stops the producer thread and waits for it to exit; results that were not consumed are dropped.
+
+        Args:
+            timeout (float): Maximum time in seconds to wait for a running decode to be cancelled.
+        """
+        self._stop_event.set()
+        self._slots.release() # Unblock the producer if it is waiting for a slot
+        for _, future in self._jobs:
+            future.cancel()
+        self._futures.clear()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                self.logger.warning(f"AudioPrefetcher: 后台预解码线程在 {timeout}s 内未能退出。")
+
+    def _run(self):
+        for file_path, future in self._jobs:
+            self._slots.acquire()
+            if self._stop_event.is_set():
+                return
+            if not future.set_running_or_notify_cancel():
+                self._slots.release()
+                continue
+            try:
+                self.logger.debug(f"AudioPrefetcher: 正在预解码 {file_path}")
+                future.set_result(self.prefetch_fn(file_path, cancel_event=self._stop_event))
+            except Exception as e:
+                future.set_exception(e)
+        self.logger.debug("AudioPrefetcher: 所有文件已预解码。")
@@ -0,0 +1,78 @@
+# Batch planning helpers: probe-based validation, job ordering and ETA estimation
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+def plan_batch(file_paths: List[str], probe_fn: Callable[[str], Dict[str, Any]],
+               logger: logging.Logger = None) -> Tuple[List[Tuple[str, float]], List[Tuple[str, str]]]:
+    """
+    Probes every file of a batch and orders the readable ones longest-processing-time-first.
+
+    Processing time is roughly proportional to media duration, so starting with the longest
+    files keeps workers busy until the end instead of leaving one long file for the tail.
+    Files that cannot be probed are rejected before any decoding or ASR work is started.
+
+    Args:
+        file_paths (list[str]): Files in the order the user selected them.
+        probe_fn (Callable[[str], dict]): Returns media info with a "duration" key
+                                          (e.g. `AudioProcessor.probe_media`); raises on unreadable files.
+        logger (logging.Logger, optional): Logger instance.
+
+    Returns:
+        tuple[list[tuple[str, float]], list[tuple[str, str]]]:
+            ([(file_path, duration_sec)] in processing order, [(file_path, error_message)] rejected).
+    """
+    logger = logger if logger else logging.getLogger(__name__)
+    jobs: List[Tuple[str, float]] = []
+    rejected: List[Tuple[str, str]] = []
+    for file_path in file_paths:
+        try:
+            jobs.append((file_path, float(probe_fn(file_path).get("duration", 0.0))))
+        except Exception as e:
+            logger.warning(f"批量预检: 跳过无法读取的文件 {file_path}: {e}")
+            rejected.append((file_path, str(e)))
+
+    jobs.sort(key=lambda job: job[1], reverse=True) # Stable: equal durations keep the selection order
+    total_sec = sum(duration for _, duration in jobs)
+    logger.info(f"批量预检完成: {len(jobs)} 个文件可处理 (总时长 {format_duration(total_sec)}), {len(rejected)} 个文件被拒绝。")
+    return jobs, rejected
+
+
+class RealTimeFactorEstimator:
+    """
+    Tracks the measured real-time factor (processing seconds per media second) of a batch.
+
+    An exponential moving average is used so the estimate adapts when, for example, the
+    first file was slower because the model was still loading.
+    """
+
+    def __init__(self, smoothing: float = 0.5):
+        """
+        Args:
+            smoothing (float): Weight of the newest measurement in the moving average (0-1].
+        """
+        self.smoothing = smoothing
+        self.rtf: Optional[float] = None
+
+    def record(self, media_duration_sec: float, elapsed_sec: float):
+        """Adds the measurement of one finished file. Files with unknown duration are ignored."""
+        if media_duration_sec <= 0 or elapsed_sec < 0:
+            return
+        measured = elapsed_sec / media_duration_sec
+        self.rtf = measured if self.rtf is None else self.smoothing * measured + (1 - self.smoothing) * self.rtf
+
+    def eta_seconds(self, remaining_media_sec: float) -> Optional[float]:
+        """Returns the estimated processing time for the remaining media, or None before the first measurement."""
+        if self.rtf is None:
+            return None
+        return remaining_media_sec * self.rtf
+
+
+def format_duration(seconds: float) -> str:
+    """Formats seconds as "m:ss" or "h:mm:ss"."""
+    seconds = int(round(max(0.0, seconds)))
+    hours, remainder = divmod(seconds, 3600)
+    minutes, secs = divmod(remainder, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{secs:02d}"
+    return f"{minutes}:{secs:02d}"
@@ -0,0 +1,134 @@
+# Helpers for replacing the subtitle items of a time range (partial re-transcription) or of changed cues (draft refinement)
+from difflib import SequenceMatcher
+from typing import List, Tuple
+
+import pysrt
+
+
+def _item_seconds(item: pysrt.SubRipItem) -> Tuple[float, float]:
+    return item.start.ordinal / 1000.0, item.end.ordinal / 1000.0
+
+
+def expand_range_to_items(items: List[pysrt.SubRipItem], start_sec: float, end_sec: float) -> Tuple[float, float]:
+    """
+    Widens [start_sec, end_sec] so that every item overlapping it is covered completely.
+
+    Re-transcribing only part of a cue would leave half a sentence behind, so the range
+    always grows to the boundaries of the cues it touches.
+
+    Returns:
+        tuple[float, float]: The expanded (start_sec, end_sec).
+    """
+    for item in items:
+        item_start, item_end = _item_seconds(item)
+        if item_start < end_sec and item_end > start_sec:
+            start_sec = min(start_sec, item_start)
+            end_sec = max(end_sec, item_end)
+    return start_sec, end_sec
+
+
+def splice_subtitle_items(items: List[pysrt.SubRipItem], new_items: List[pysrt.SubRipItem],
+                          start_sec: float, end_sec: float) -> List[pysrt.SubRipItem]:
+    """
+    Replaces the items overlapping [start_sec, end_sec] with `new_items` and renumbers the result.
+
+    New items are clamped into the range so they never overlap the untouched neighbours.
+    Items that end up with no duration after clamping are dropped.
+
+    Args:
+        items (list[pysrt.SubRipItem]): Current subtitle items in time order.
+        new_items (list[pysrt.SubRipItem]): Items produced for the range (absolute timestamps).
+        start_sec (float): Range start in seconds (usually from `expand_range_to_items`).
+        end_sec (float): Range end in seconds.
+
+    Returns:
+        list[pysrt.SubRipItem]: New list with indices starting at 1; the input items are not modified.
+    """
+    range_start = pysrt.SubRipTime.from_ordinal(int(round(start_sec * 1000)))
+    range_end = pysrt.SubRipTime.from_ordinal(int(round(end_sec * 1000)))
+
+    before, after = [], []
+    for item in items:
+        item_start, item_end = _item_seconds(item)
+        if item_end <= start_sec:
+            before.append(item)
+        elif item_start >= end_sec:
+            after.append(item)
+
+    replacement = []
+    for item in new_items:
+        clamped_start = max(item.start, range_start)
+        clamped_end = min(item.end, range_end)
+        if clamped_end <= clamped_start:
+            continue
+        replacement.append((clamped_start, clamped_end, item.text))
+
+    spliced = [(item.start, item.end, item.text) for item in before] + replacement + \
+              [(item.start, item.end, item.text) for item in after]
+    return [
+        pysrt.SubRipItem(index=idx + 1, start=pysrt.SubRipTime.from_ordinal(start.ordinal),
+                         end=pysrt.SubRipTime.from_ordinal(end.ordinal), text=text)
+        for idx, (start, end, text) in enumerate(spliced)
+    ]
+
+
+def _item_key(item: pysrt.SubRipItem) -> Tuple[int, int, str]:
+    return item.start.ordinal, item.end.ordinal, item.text
+
+
+def merge_refined_items(base_items: List[pysrt.SubRipItem], current_items: List[pysrt.SubRipItem],
+                        refined_items: List[pysrt.SubRipItem]) -> Tuple[List[pysrt.SubRipItem], List[int], int]:
+    """
+    Applies the differences between a draft and its refined transcription to the current items.
+
+    `base_items` is the draft as it was produced, `current_items` the same file now (possibly
+    edited in the meantime) and `refined_items` the result of the refinement pass. Cues are
+    compared by (start, end, text); only runs of cues where draft and refined result differ are
+    replaced, and unchanged cues keep their item objects. A change is skipped if any cue it
+    replaces, or either neighbour, was edited, inserted or deleted since the draft (a three-way
+    merge), so manual corrections are never overwritten.
+
+    Args:
+        base_items (list[pysrt.SubRipItem]): Snapshot of the draft items.
+        current_items (list[pysrt.SubRipItem]): Current items of the file.
+        refined_items (list[pysrt.SubRipItem]): Items of the refinement pass.
+
+    Returns:
+        tuple[list[pysrt.SubRipItem], list[int], int]: (merged items renumbered from 1, positions of the
+            new items in the merged list, number of changes skipped because of edits).
+    """
+    base_keys = [_item_key(item) for item in base_items]
+    base_to_current = {}
+    current_matcher = SequenceMatcher(None, base_keys, [_item_key(item) for item in current_items], autojunk=False)
+    for block in current_matcher.get_matching_blocks():
+        for offset in range(block.size):
+            base_to_current[block.a + offset] = block.b + offset
+
+    replacements = []
+    skipped = 0
+    refined_matcher = SequenceMatcher(None, base_keys, [_item_key(item) for item in refined_items], autojunk=False)
+    for tag, i1, i2, j1, j2 in refined_matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        left = base_to_current.get(i1 - 1) if i1 > 0 else -1
+        right = base_to_current.get(i2) if i2 < len(base_keys) else len(current_items)
+        untouched = (left is not None and right is not None and right - left - 1 == i2 - i1 and
+                     all(base_to_current.get(i) == left + 1 + (i - i1) for i in range(i1, i2)))
+        if untouched:
+            replacements.append((left + 1, right, refined_items[j1:j2]))
+        else:
+            skipped += 1
+
+    merged, changed_positions = [], []
+    cursor = 0
+    for start, end, new_items in replacements:
+        merged.extend(current_items[cursor:start])
+        for item in new_items:
+            changed_positions.append(len(merged))
+            merged.append(pysrt.SubRipItem(index=0, start=pysrt.SubRipTime.from_ordinal(item.start.ordinal),
+                                           end=pysrt.SubRipTime.from_ordinal(item.end.ordinal), text=item.text))
+        cursor = end
+    merged.extend(current_items[cursor:])
+    for index, item in enumerate(merged, 1):
+        item.index = index
+    return merged, changed_positions, skipped
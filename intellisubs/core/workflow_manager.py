@@ -1,7 +1,15 @@
 # Core Workflow Manager for IntelliSubs
 
 from .asr_services.whisper_service import WhisperService
+from .asr_services.calibration import ASRTuningStore
+from .asr_services.model_store import LocalModelStore
+from .asr_services.result_cache import ASRResultCache
+from .asr_services.replay_service import ReplayASRService
+from .asr_services.rtf_stats import RTFStatsStore
+from .asr_services.word_store import WordTimestampStore
+from .asr_services.segment_utils import WindowedSegmentMerger, find_low_confidence_runs, merge_chunk_segments, shift_segments
 from .audio_processing.processor import AudioProcessor
+from .audio_processing.audio_cache import DecodedAudioCache
 from .text_processing.normalizer import ASRNormalizer
 from .text_processing.punctuator import Punctuator
 from .text_processing.segmenter import SubtitleSegmenter
@@ -10,14 +18,27 @@ from .subtitle_formats.srt_formatter import SRTFormatter
 from .subtitle_formats.lrc_formatter import LRCFormatter
 from .subtitle_formats.ass_formatter import ASSFormatter
 from .subtitle_formats.txt_formatter import TxtFormatter
+from .subtitle_splice import expand_range_to_items, splice_subtitle_items
+from .asr_process_pool import ASRProcessPool
 
 import os
 import tempfile
+import shutil
 import logging
 import asyncio
+import threading
+import time
+import itertools
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+import numpy as np
 from intellisubs.utils.logger_setup import mask_sensitive_data
+from intellisubs.utils.config_manager import get_user_cache_dir
 import pysrt
 
+# Config keys (prefixes) that change the raw ASR segments and are therefore part of the ASR result cache key
+ASR_RESULT_CONFIG_PREFIXES = ("vad_", "noise_reduction_", "asr_batch_size", "asr_parallel_chunks", "asr_chunk_",
+                              "asr_refine_", "audio_decode_mode", "audio_stream_", "language_detect_")
+
 class WorkflowManager:
     def __init__(self, config: dict = None, logger: logging.Logger = None):
         self.config = config if config else {}
@@ -26,16 +47,46 @@ class WorkflowManager:
         self.logger.info(f"WorkflowManager initialized with config: {masked_config_for_log}")
 
         self._active_language = self.config.get("language", "ja")
+        if self._active_language == "auto":
+            self._active_language = "ja" # Stages start in Japanese until the first file's language is detected
         self.logger.info(f"WorkflowManager: Initial active language set to '{self._active_language}'")
         self.available_llm_models = []
 
         self.audio_processor = AudioProcessor(logger=self.logger)
-        self.asr_service = WhisperService(
-            model_name=self.config.get("asr_model", "small"),
-            device=self.config.get("device", "cpu"),
-            logger=self.logger
-        )
-        
+        self.audio_cache = None
+        if self.config.get("audio_cache_enabled", True):
+            try:
+                self.audio_cache = DecodedAudioCache(
+                    cache_dir=self.config.get("audio_cache_dir") or get_user_cache_dir("audio"),
+                    max_size_mb=self.config.get("audio_cache_max_mb", 4096),
+                    logger=self.logger
+                )
+            except Exception as e:
+                self.logger.warning(f"无法初始化音频缓存，将不使用缓存: {e}", exc_info=True)
+        # Every decoded file is kept as raw PCM so follow-up operations (range re-transcription,
+        # waveform peaks, ...) can memory-map it instead of running ffmpeg again. Without the
+        # persistent cache, a per-session directory is used and removed on close.
+        self._session_audio_dir = None
+        self.audio_store = self.audio_cache
+        if self.audio_store is None:
+            self._session_audio_dir = tempfile.mkdtemp(prefix="IntelliSubs_audio_")
+            self.audio_store = DecodedAudioCache(self._session_audio_dir, max_size_mb=None, logger=self.logger)
+        # Raw ASR segments, so re-running a file with other text/timing settings skips Whisper
+        self.asr_result_cache = None
+        if self.config.get("asr_result_cache_enabled", True):
+            try:
+                self.asr_result_cache = ASRResultCache(
+                    cache_dir=self.config.get("asr_result_cache_dir") or get_user_cache_dir("asr_results"),
+                    max_size_mb=self.config.get("asr_result_cache_max_mb", 256),
+                    logger=self.logger
+                )
+            except Exception as e:
+                self.logger.warning(f"无法初始化ASR结果缓存，将不使用缓存: {e}", exc_info=True)
+        # PCM files for in-memory decodes are written off the critical path
+        self._pcm_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="AudioPCMWriter")
+        self.asr_service = self._create_asr_service()
+        self.rtf_stats = RTFStatsStore(logger=self.logger) if hasattr(self.asr_service, "decoding_preset") else None
+
         initial_custom_dict_path = self.config.get("custom_dict_path")
         self.normalizer = ASRNormalizer(custom_dictionary_path=initial_custom_dict_path, logger=self.logger)
         if hasattr(self.normalizer, 'set_language'):
@@ -54,6 +105,11 @@ class WorkflowManager:
             min_gap_sec=segmenter_min_gap
         )
         self.logger.info(f"SubtitleSegmenter initialized with min_duration={segmenter_min_duration}s, min_gap={segmenter_min_gap}s.")
+        # Stages of languages used earlier in this session, so switching languages (e.g. per file in
+        # "auto" mode) swaps in prebuilt instances instead of rebuilding the shared ones
+        self._language_stages = {}
+        self._detected_languages = {} # audio_video_path -> language detected in "auto" mode
+        self._word_timestamps = {} # audio_video_path -> WordTimestampStore of the last transcription
         
         self.llm_enhancer = None
         if self.config.get("llm_enabled", False):
@@ -69,7 +125,7 @@ class WorkflowManager:
                     api_key=api_key,
                     model_name=model_name,
                     base_url=cleaned_base_url,
-                    language=self.config.get("language", "ja"),
+                    language=self._active_language,
                     logger=self.logger,
                     # script_context is handled dynamically
                     user_override_system_prompt=self.config.get("llm_system_prompt"), # User override from global config
@@ -90,6 +146,41 @@ class WorkflowManager:
         }
         self.logger.info("Core components initialized based on config.")
 
+    def _create_asr_service(self):
+        """
+        Creates the ASR backend selected by `asr_backend`.
+
+        "whisper" (default) is faster-whisper; "replay" returns recorded (`asr_replay_path`) or
+        synthetic (`asr_replay_synthetic`) segments without a model, for benchmarking the text pipeline.
+        """
+        backend = self.config.get("asr_backend", "whisper")
+        if backend == "replay":
+            return ReplayASRService(
+                replay_path=self.config.get("asr_replay_path") or None,
+                synthetic=self.config.get("asr_replay_synthetic"),
+                logger=self.logger
+            )
+        if backend != "whisper":
+            raise ValueError(f"不支持的ASR后端: {backend}")
+        return WhisperService(
+            model_name=self.config.get("asr_model", "small"),
+            device=self.config.get("device", "cpu"),
+            compute_type=self.config.get("asr_compute_type", "auto"),
+            logger=self.logger,
+            model_pool_max_mb=self.config.get("asr_model_pool_max_mb", 4096),
+            cpu_threads=self.config.get("asr_cpu_threads", 0),
+            # Parallel chunks of one file are decoded concurrently by the same model
+            num_workers=max(self.config.get("asr_num_workers", 1), self.config.get("asr_parallel_chunks", 0)),
+            tuning_store=ASRTuningStore(logger=self.logger),
+            # The model is loaded by `preload_asr_model` (after the UI is up) or on first use
+            lazy_load=self.config.get("asr_lazy_load", True),
+            warm_up=self.config.get("asr_warm_up", True),
+            decoding_preset=self.config.get("asr_decoding_preset", "balanced"),
+            word_timestamps=self.config.get("asr_word_timestamps", False),
+            model_store=LocalModelStore(root=self.config.get("asr_model_store_dir") or None, logger=self.logger),
+            local_files_only=self.config.get("asr_offline", False)
+        )
+
     def set_language(self, language_code: str):
         """
         Sets the active language for the WorkflowManager and its components.
@@ -99,37 +190,7 @@ class WorkflowManager:
             return
 
         self.logger.info(f"WorkflowManager.set_language: Changing active language from '{self._active_language}' to '{language_code}'.")
-        self._active_language = language_code
-
-        if hasattr(self.punctuator, 'set_language'):
-            self.punctuator.set_language(language_code)
-            self.logger.debug(f"Punctuator language set to '{language_code}'.")
-        else:
-            self.logger.warning("Punctuator does not have set_language, re-initializing.")
-            self.punctuator = Punctuator(language=language_code, logger=self.logger)
-
-        if hasattr(self.normalizer, 'set_language'):
-            self.normalizer.set_language(language_code)
-            self.logger.debug(f"Normalizer language set to '{language_code}'.")
-        
-        # Re-initialize segmenter as its internal state might depend on language (e.g., punctuation rules)
-        # and it doesn't have a standalone set_language in the current snippet from process_audio_to_subtitle
-        # We'll keep its existing time parameters.
-        current_min_dur = self.segmenter.min_duration_sec
-        current_min_gap = self.segmenter.min_gap_sec
-        current_max_chars = self.segmenter.max_chars_per_line
-        current_max_duration = self.segmenter.max_duration_sec
-        self.logger.info(f"Re-initializing SubtitleSegmenter due to language change to '{language_code}'. "
-                         f"Keeping time params: min_dur={current_min_dur}, min_gap={current_min_gap}, "
-                         f"max_chars={current_max_chars}, max_dur={current_max_duration}")
-        self.segmenter = SubtitleSegmenter(
-            language=language_code,
-            logger=self.logger,
-            min_duration_sec=current_min_dur,
-            min_gap_sec=current_min_gap,
-            max_chars_per_line=current_max_chars,
-            max_duration_sec=current_max_duration
-        )
+        self._activate_language_stages(language_code)
 
         if self.llm_enhancer and hasattr(self.llm_enhancer, 'set_language'):
             self.llm_enhancer.set_language(language_code)
@@ -137,6 +198,44 @@ class WorkflowManager:
         
         self.logger.info(f"WorkflowManager active language and components updated to '{language_code}'.")
 
+    def _activate_language_stages(self, language_code: str):
+        """
+        Makes the normalizer, punctuator and segmenter of `language_code` the active ones.
+
+        The outgoing stages are kept per language and reused the next time that language is
+        active; stages for a new language are built once. Segmenter time parameters follow the
+        outgoing segmenter, so only a parameter change (not the language switch) rebuilds it.
+        """
+        previous_segmenter = self.segmenter
+        self._language_stages[self._active_language] = (self.normalizer, self.punctuator, self.segmenter)
+        stages = self._language_stages.get(language_code)
+        if stages is None:
+            self.logger.info(f"为语言 '{language_code}' 构建处理组件 (Normalizer/Punctuator/Segmenter)，后续将复用。")
+            normalizer = ASRNormalizer(language=language_code, custom_dictionary_path=self.normalizer.current_dictionary_path,
+                                       logger=self.logger)
+            punctuator = Punctuator(language=language_code, logger=self.logger)
+            segmenter = None
+        else:
+            normalizer, punctuator, segmenter = stages
+            self.logger.debug(f"复用语言 '{language_code}' 的已缓存处理组件。")
+
+        time_params = (previous_segmenter.min_duration_sec, previous_segmenter.min_gap_sec,
+                       previous_segmenter.max_chars_per_line, previous_segmenter.max_duration_sec)
+        if segmenter is None or (segmenter.min_duration_sec, segmenter.min_gap_sec,
+                                 segmenter.max_chars_per_line, segmenter.max_duration_sec) != time_params:
+            segmenter = SubtitleSegmenter(
+                language=language_code,
+                logger=self.logger,
+                min_duration_sec=time_params[0],
+                min_gap_sec=time_params[1],
+                max_chars_per_line=time_params[2],
+                max_duration_sec=time_params[3]
+            )
+
+        self.normalizer, self.punctuator, self.segmenter = normalizer, punctuator, segmenter
+        self._language_stages[language_code] = (normalizer, punctuator, segmenter)
+        self._active_language = language_code
+
     def set_custom_dictionary(self, dictionary_path: str, language_code: str = None): # language_code might be for future use or context
         """
         Sets the custom dictionary for the ASRNormalizer.
@@ -216,7 +315,11 @@ class WorkflowManager:
                                   processing_language: str = "ja",
                                   min_duration_sec: float = 1.0,
                                   min_gap_sec: float = 0.1,
-                                  llm_script_context: str = None  # New parameter
+                                  llm_script_context: str = None,  # New parameter
+                                  prefetched_audio: np.ndarray = None,
+                                  audio_stream=None,
+                                  progress_callback=None,
+                                  decoding_preset: str = None
                                   ) -> tuple[str, list]:
         """
         Full workflow: from audio/video input to structured subtitle data and a preview string.
@@ -229,10 +332,22 @@ class WorkflowManager:
                                          Should include 'api_key', 'model_name', 'base_url', 'system_prompt'.
             output_format (str): Desired preview output subtitle format ("srt", "lrc", "ass").
             current_custom_dict_path (str, optional): Path to the custom dictionary for this run.
-            processing_language (str): Language code for this run (e.g., "ja", "zh", "en").
+            processing_language (str): Language code for this run (e.g., "ja", "zh", "en"), or "auto" to detect
+                                       the language of this file from a short speech sample and use the
+                                       (cached) stages of that language.
             min_duration_sec (float): Minimum duration for a subtitle entry for this run.
             min_gap_sec (float): Minimum gap between subtitle entries for this run.
             llm_script_context (str, optional): Full text content of the imported script.
+            prefetched_audio (np.ndarray, optional): Samples already decoded by `prefetch_audio`.
+                                                     Skips decoding for this run when provided.
+            audio_stream (int | str, optional): Audio track to transcribe, as an audio stream index or
+                                                language tag (see `AudioProcessor.resolve_audio_stream`).
+            progress_callback (Callable[[float, float, dict], None], optional): Called from this thread for every
+                                                ASR segment as it is decoded, with (progress 0-1, live real-time factor,
+                                                segment on the original timeline). See `WhisperService.transcribe_stream`.
+            decoding_preset (str, optional): Decoding preset for this run (see `WhisperService.set_decoding_preset`);
+                                             defaults to `asr_decoding_preset`. "draft" runs also skip the
+                                             low-confidence refinement (`asr_refine_model`).
         Returns:
             tuple[str, list]: (preview_string, structured_subtitle_data)
         """
@@ -246,52 +361,19 @@ class WorkflowManager:
              self.logger.info(f"LLM参数: 模型={llm_params.get('model_name')}, BaseURL配置={bool(llm_params.get('base_url'))}, "
                               f"剧本上下文长度: {len(llm_script_context) if llm_script_context else 0}")
 
-        language_changed = processing_language != self._active_language
-        segmenter_needs_reinit = False
-
-        if language_changed:
-            self.logger.info(f"处理语言已更改，从 '{self._active_language}' 到 '{processing_language}'. 更新下游组件。")
-            if hasattr(self.punctuator, 'set_language'):
-                self.punctuator.set_language(processing_language)
-            else:
-                self.punctuator = Punctuator(language=processing_language, logger=self.logger)
-            
-            if hasattr(self.normalizer, 'set_language'):
-                self.normalizer.set_language(processing_language)
-            
-            segmenter_needs_reinit = True 
-            self._active_language = processing_language
-
-        if (not segmenter_needs_reinit and
-            (self.segmenter.min_duration_sec != min_duration_sec or
-             self.segmenter.min_gap_sec != min_gap_sec)):
-            self.logger.info(f"Segmenter 时间轴参数已更改。旧: min_dur={self.segmenter.min_duration_sec}, min_gap={self.segmenter.min_gap_sec}. "
-                             f"新: min_dur={min_duration_sec}, min_gap={min_gap_sec}.")
-            segmenter_needs_reinit = True
-
-        if segmenter_needs_reinit:
-            self.logger.info(f"重新初始化 SubtitleSegmenter。语言: {processing_language}, "
-                             f"min_dur: {min_duration_sec}, min_gap: {min_gap_sec}")
-            current_max_chars = self.segmenter.max_chars_per_line
-            current_max_duration = self.segmenter.max_duration_sec
-            self.segmenter = SubtitleSegmenter(
-                language=processing_language,
-                logger=self.logger,
-                min_duration_sec=min_duration_sec,
-                min_gap_sec=min_gap_sec,
-                max_chars_per_line=current_max_chars,
-                max_duration_sec=current_max_duration
-            )
-            if self.llm_enhancer and hasattr(self.llm_enhancer, 'set_language'):
-                 self.llm_enhancer.set_language(processing_language)
-
-        self.asr_service.update_model_and_device(model_name=asr_model, device=device)
+        decoding_preset = decoding_preset or self.config.get("asr_decoding_preset", "balanced")
+        auto_language = processing_language == "auto"
+        if auto_language:
+            # The stages are switched once the file's language is known (see `_apply_auto_language`)
+            processing_language = self._active_language
+            self._configure_processing_stages(processing_language, asr_model, device, min_duration_sec, min_gap_sec,
+                                              current_custom_dict_path or self.normalizer.current_dictionary_path,
+                                              decoding_preset=decoding_preset)
+        else:
+            self._configure_processing_stages(processing_language, asr_model, device,
+                                              min_duration_sec, min_gap_sec, current_custom_dict_path,
+                                              decoding_preset=decoding_preset)
 
-        if current_custom_dict_path != self.normalizer.current_dictionary_path:
-            self.logger.info(f"自定义词典路径已更改。旧: '{self.normalizer.current_dictionary_path}', 新: '{current_custom_dict_path}'. 正在更新Normalizer。")
-            self.normalizer.set_custom_dictionary_path(current_custom_dict_path)
-            self._current_normalizer_custom_dict_path = self.normalizer.current_dictionary_path
-        
         if llm_enabled and llm_params and llm_params.get("api_key"):
             current_api_key = llm_params.get("api_key")
             current_model_name = llm_params.get("model_name", "gpt-3.5-turbo")
@@ -333,175 +415,910 @@ class WorkflowManager:
         structured_subtitle_data = []
         preview_text = ""
 
+        asr_cache_key = self._asr_result_cache_key(audio_video_path, audio_stream, "auto" if auto_language else processing_language)
+        cached_result = self.asr_result_cache.get(asr_cache_key) if asr_cache_key else None
+
         with tempfile.TemporaryDirectory() as temp_dir:
-            base_name = os.path.splitext(os.path.basename(audio_video_path))[0]
-            processed_audio_path = os.path.join(temp_dir, f"{base_name}_processed.wav")
-            
-            try:
-                self.logger.info(f"正在预处理音频文件: {audio_video_path}")
-                self.audio_processor.preprocess_audio(audio_video_path, processed_audio_path)
-                self.logger.info(f"音频预处理完成，生成文件: {processed_audio_path}")
-            except Exception as e:
-                self.logger.error(f"音频预处理失败: {e}", exc_info=True)
-                return f"音频预处理失败: {e}", []
+            if cached_result is not None:
+                self.logger.info(f"使用缓存的ASR结果，跳过音频解码与转录: {audio_video_path}")
+            else:
+                try:
+                    if prefetched_audio is not None:
+                        self.logger.info(f"使用预解码的音频: {audio_video_path}")
+                        audio_input = prefetched_audio
+                    else:
+                        self.logger.info(f"正在预处理音频文件: {audio_video_path}")
+                        audio_input = self._prepare_audio_input(audio_video_path, temp_dir, audio_stream=audio_stream)
+                    audio_input = self._apply_audio_filters(audio_input)
+                except Exception as e:
+                    self.logger.error(f"音频预处理失败: {e}", exc_info=True)
+                    return f"音频预处理失败: {e}", []
 
             try:
-                self.logger.info(f"正在进行ASR转录 (语言: {processing_language})...")
-                transcription_result_tuple = self.asr_service.transcribe(processed_audio_path, language=processing_language)
+                asr_language = None if auto_language else processing_language
+                if cached_result is not None:
+                    transcription_result_tuple = cached_result
+                else:
+                    if auto_language:
+                        asr_language, audio_input = self._detect_input_language(audio_input)
+                    self.logger.info(f"正在进行ASR转录 (语言: {asr_language if asr_language else 'auto-detect'})...")
+                    media_duration_sec = None
+                    if progress_callback and not isinstance(audio_input, (np.ndarray, str)):
+                        media_duration_sec = self.audio_processor.probe_media(audio_video_path).get("duration") # Cached probe
+                    asr_started_at = time.perf_counter()
+                    transcription_result_tuple = self._transcribe_audio_input(audio_input, asr_language,
+                                                                              progress_callback=progress_callback,
+                                                                              media_duration_sec=media_duration_sec)
+                    self._record_asr_rtf(audio_video_path, audio_input, transcription_result_tuple[1],
+                                         time.perf_counter() - asr_started_at)
+                    segments, info = transcription_result_tuple
+                    if info is not None and decoding_preset != "draft":
+                        segments = self._refine_low_confidence_segments(segments, audio_video_path, audio_input,
+                                                                        asr_language or info.language, audio_stream)
+                        transcription_result_tuple = (segments, info)
+                    if asr_cache_key and transcription_result_tuple[1] is not None:
+                        self.asr_result_cache.put(asr_cache_key, *transcription_result_tuple)
                 asr_segments_list = transcription_result_tuple[0]
+                self._store_word_timestamps(audio_video_path, asr_segments_list)
+                if auto_language:
+                    self._apply_auto_language(audio_video_path, asr_language, transcription_result_tuple[1], asr_model, device,
+                                              min_duration_sec, min_gap_sec, current_custom_dict_path)
                 
                 if not asr_segments_list:
                     self.logger.warning("ASR未生成任何片段。")
                     return "ASR未生成任何片段。", []
 
-                # --- BEGIN ADDED CODE FOR ASR DUPLICATION FIX ---
-                fixed_asr_segments = []
-                self.logger.debug(f"ASR去重: 开始处理 {len(asr_segments_list)} 个原始片段。")
-                for seg_idx, asr_seg in enumerate(asr_segments_list):
-                    original_text = asr_seg.get("text", "")
-                    self.logger.debug(f"ASR去重: 片段 {seg_idx} 原始内容: '{original_text}'")
-                    text_to_process = original_text.strip()
-                    self.logger.debug(f"ASR去重: 片段 {seg_idx} strip后内容: '{text_to_process}'")
-                    corrected_text = text_to_process # Default to original stripped text
-                    found_fix = False
-
-                    # 1. Attempt to fix "A<delim>A" style duplication (e.g., "text.text", "text?text")
-                    possible_delimiters_for_fix = ["。", "？", "！", ".", "?", "!", " "]
-                    self.logger.debug(f"ASR去重: 片段 {seg_idx} 使用分隔符列表: {possible_delimiters_for_fix}")
-                    
-                    for delim_char in possible_delimiters_for_fix:
-                        self.logger.debug(f"ASR去重: 片段 {seg_idx} 尝试分隔符 '{delim_char}'")
-                        if delim_char and delim_char in text_to_process:
-                            parts = text_to_process.split(delim_char, 1)
-                            self.logger.debug(f"ASR去重: 片段 {seg_idx} 使用 '{delim_char}' 分割结果: {parts}")
-                            if len(parts) == 2:
-                                s1 = parts[0].strip()
-                                s2 = parts[1].strip()
-                                self.logger.debug(f"ASR去重: 片段 {seg_idx} s1='{s1}', s2='{s2}'")
-                                if s1 and s1 == s2:
-                                    corrected_text = s1 if delim_char == " " else s1 + delim_char
-                                    self.logger.info(f"ASR 文本修复 (模式 '{delim_char}'): 片段 {seg_idx} 从 '{original_text}' 修复为 '{corrected_text}'")
-                                    found_fix = True
-                                    break
-                            else:
-                                self.logger.debug(f"ASR去重: 片段 {seg_idx} 使用 '{delim_char}' 分割部分不足2。")
-                        else:
-                            self.logger.debug(f"ASR去重: 片段 {seg_idx} 分隔符 '{delim_char}' 不存在或为空。")
-                    
-                    if not found_fix:
-                        self.logger.debug(f"ASR去重: 片段 {seg_idx} 未通过分隔符模式修复。尝试对半模式。")
-                        text_len = len(text_to_process)
-                        if text_len > 2 and text_len % 2 == 0:
-                            mid_point = text_len // 2
-                            part1 = text_to_process[:mid_point] # .strip() is not needed here if text_to_process is already stripped
-                            part2 = text_to_process[mid_point:] # .strip() is not needed here
-                            self.logger.debug(f"ASR去重: 片段 {seg_idx} 对半模式: part1='{part1}', part2='{part2}'")
-                            if part1 == part2 and part1:
-                                corrected_text = part1
-                                self.logger.info(f"ASR 文本修复 (直接对半模式): 片段 {seg_idx} 从 '{original_text}' 修复为 '{corrected_text}'")
-                                # found_fix = True # Not strictly needed
-                            else:
-                                self.logger.debug(f"ASR去重: 片段 {seg_idx} 对半模式不匹配或part1为空。")
-                        else:
-                            self.logger.debug(f"ASR去重: 片段 {seg_idx} 文本长度 ({text_len}) 不适用于对半模式。")
-                    
-                    new_seg = asr_seg.copy()
-                    new_seg["text"] = corrected_text
-                    fixed_asr_segments.append(new_seg)
-                    self.logger.debug(f"ASR去重: 片段 {seg_idx} 最终修正文本: '{corrected_text}', 添加到修复列表。")
-
-                asr_segments_list = fixed_asr_segments
-                # --- END ADDED CODE FOR ASR DUPLICATION FIX ---
-
-                # --- BEGIN ADDED CODE FOR INTER-SEGMENT DUPLICATION FIX ---
-                if len(asr_segments_list) > 1:
-                    self.logger.debug(f"合并前，ASR片段数量: {len(asr_segments_list)}")
-                    merged_asr_segments = []
-                    
-                    # 第一个片段直接添加
-                    if asr_segments_list:
-                         merged_asr_segments.append(asr_segments_list[0])
-
-                    for i in range(1, len(asr_segments_list)):
-                        current_seg = asr_segments_list[i]
-                        prev_merged_seg = merged_asr_segments[-1]
-
-                        # 条件：文本相同，且时间上基本连续 (允许小的间隙，比如0.1秒)
-                        # 我们也需要考虑 prev_merged_seg['text'] 可能为空的情况
-                        if prev_merged_seg.get("text") and \
-                           current_seg.get("text") == prev_merged_seg.get("text") and \
-                           current_seg.get("start", 0) - prev_merged_seg.get("end", -1) <= 0.2: # 允许0.2秒的间隙
-                            
-                            self.logger.info(f"检测到连续的相同文本片段，将合并: '{current_seg.get('text')}' "
-                                             f"({prev_merged_seg.get('start'):.2f}-{prev_merged_seg.get('end'):.2f} "
-                                             f"和 {current_seg.get('start'):.2f}-{current_seg.get('end'):.2f})")
-                            # 扩展前一个片段的结束时间
-                            prev_merged_seg["end"] = max(prev_merged_seg.get("end",0), current_seg.get("end",0))
-                            self.logger.debug(f"合并后，前一片段更新为: {prev_merged_seg.get('start'):.2f}-{prev_merged_seg.get('end'):.2f}")
-                        else:
-                            merged_asr_segments.append(current_seg)
-                    
-                    if len(merged_asr_segments) < len(asr_segments_list):
-                        self.logger.info(f"跨片段合并完成。片段数从 {len(asr_segments_list)} 减少到 {len(merged_asr_segments)}。")
-                    asr_segments_list = merged_asr_segments
-                # --- END ADDED CODE FOR INTER-SEGMENT DUPLICATION FIX ---
-                
+                asr_segments_list = self._postprocess_asr_segments(asr_segments_list)
                 self.logger.info(f"ASR转录完成 (应用修复和合并后)，生成 {len(asr_segments_list)} 个片段。")
             except Exception as e:
                 self.logger.error(f"ASR转录失败: {e}", exc_info=True)
                 return f"ASR转录失败: {e}", []
 
-            self.logger.info("正在进行文本规范化...")
-            normalized_segments = self.normalizer.normalize_text_segments(asr_segments_list)
-            self.logger.info(f"文本规范化完成，生成 {len(normalized_segments)} 个片段。")
-
-            self.logger.info("正在添加标点符号...")
-            punctuated_segments = self.punctuator.add_punctuation(normalized_segments)
-            self.logger.info(f"标点符号添加完成，生成 {len(punctuated_segments)} 个片段。")
-
             # LLM enhancement is now decoupled from this initial processing workflow.
             # The self.llm_enhancer instance is prepared if llm_enabled was true,
-            # but the actual enhancement will be triggered войска UI action later.
+            # but the actual enhancement will be triggered by a UI action later.
             self.logger.info("LLM增强已解耦，不会在此阶段自动执行。")
 
-            self.logger.info("正在进行字幕分段...")
-            subtitle_lines = self.segmenter.segment_into_subtitle_lines(punctuated_segments)
-            if not subtitle_lines:
-                self.logger.warning("字幕分段未生成任何行。")
+            structured_subtitle_data = self._segments_to_subtitle_items(asr_segments_list)
+            if not structured_subtitle_data:
                 return "字幕分段未生成任何行。", []
-            self.logger.info(f"字幕分段完成，生成 {len(subtitle_lines)} 行字幕。")
-            
-            pysrt_items = []
-            if subtitle_lines and isinstance(subtitle_lines, list):
-                for idx, dict_item in enumerate(subtitle_lines):
-                    start_time_s = dict_item.get('start', 0.0)
-                    end_time_s = dict_item.get('end', 0.0)
-                    text_content = str(dict_item.get('text', ''))
-                    try:
-                        start_time_s = float(start_time_s)
-                        end_time_s = float(end_time_s)
-                    except (ValueError, TypeError):
-                        self.logger.error(f"WorkflowManager: Invalid time value for item {idx} during conversion: start='{start_time_s}', end='{end_time_s}'. Skipping item.")
-                        continue
-                    start_obj = pysrt.SubRipTime(seconds=start_time_s)
-                    end_obj = pysrt.SubRipTime(seconds=end_time_s)
-                    if start_obj > end_obj:
-                        self.logger.warning(f"WorkflowManager data conversion: item {idx} has start > end ({start_obj} > {end_obj}). Clamping end to start.")
-                        end_obj = pysrt.SubRipTime(seconds=start_time_s)
-                    pysrt_items.append(pysrt.SubRipItem(
-                        index=idx + 1, start=start_obj, end=end_obj, text=text_content
-                    ))
-                structured_subtitle_data = pysrt_items
-                self.logger.info(f"已将 {len(subtitle_lines)} 个字典条目转换为 {len(pysrt_items)} 个 SubRipItem 对象。")
-            else:
-                self.logger.warning(f"Subtitle lines from segmenter was empty or not a list: {subtitle_lines}")
-                structured_subtitle_data = []
 
         preview_text = self.export_subtitles(structured_subtitle_data, output_format)
         self.logger.info(f"已生成 {output_format.upper()} 格式的预览。")
 
         return preview_text, structured_subtitle_data
 
+    def retranscribe_range(self, audio_video_path: str, subtitle_items: list, start_sec: float, end_sec: float,
+                           asr_model: str, device: str,
+                           processing_language: str = "ja",
+                           min_duration_sec: float = 1.0,
+                           min_gap_sec: float = 0.1,
+                           current_custom_dict_path: str = None,
+                           audio_stream=None) -> list:
+        """
+        Re-runs ASR and the text pipeline for one time range of an already processed file.
+
+        The range is widened to whole cues, only that slice of the processed PCM is transcribed
+        (via `get_processed_audio`, so ffmpeg does not run again for files of this session), and
+        the new cues replace the old ones in `subtitle_items`.
+
+        Args:
+            audio_video_path (str): Path to the original audio/video file.
+            subtitle_items (list[pysrt.SubRipItem]): Current subtitle items of the file.
+            start_sec (float): Start of the range to redo, in seconds.
+            end_sec (float): End of the range to redo, in seconds.
+            asr_model, device, processing_language, min_duration_sec, min_gap_sec, current_custom_dict_path,
+            audio_stream: Same as for `process_audio_to_subtitle`.
+
+        Returns:
+            list[pysrt.SubRipItem]: The spliced and renumbered subtitle items.
+        """
+        if end_sec <= start_sec:
+            raise ValueError(f"无效的时间区间: {start_sec:.3f}s - {end_sec:.3f}s")
+        range_start, range_end = expand_range_to_items(subtitle_items, max(0.0, start_sec), end_sec)
+        auto_language = processing_language == "auto"
+        if auto_language:
+            # Reuse the language detected when the file was processed; otherwise detect it from the range
+            processing_language = self._detected_languages.get(audio_video_path, self._active_language)
+            auto_language = audio_video_path not in self._detected_languages
+        self.logger.info(f"区间重识别: {audio_video_path} [{range_start:.3f}s - {range_end:.3f}s] "
+                         f"(请求区间 {start_sec:.3f}s - {end_sec:.3f}s), 语言: {processing_language}, ASR模型: {asr_model}")
+
+        self._configure_processing_stages(processing_language, asr_model, device,
+                                          min_duration_sec, min_gap_sec, current_custom_dict_path,
+                                          decoding_preset=self.config.get("asr_decoding_preset", "balanced"))
+
+        pcm = self.get_processed_audio(audio_video_path, audio_stream=audio_stream)
+        range_audio = self._apply_audio_filters(self.audio_processor.read_pcm_range(pcm, range_start, range_end))
+        asr_language = self._detect_sample_language(range_audio) if auto_language else processing_language
+        segments, info = self._transcribe_array(range_audio, asr_language)
+        segments = shift_segments(segments, range_start)
+        if audio_video_path in self._word_timestamps:
+            self._word_timestamps[audio_video_path] = self._word_timestamps[audio_video_path].splice(
+                range_start, range_end, WordTimestampStore.concatenate(seg.get("words") for seg in segments))
+        if auto_language:
+            self._apply_auto_language(audio_video_path, asr_language, info, asr_model, device,
+                                      min_duration_sec, min_gap_sec, current_custom_dict_path)
+
+        new_items = []
+        if segments:
+            new_items = self._segments_to_subtitle_items(self._postprocess_asr_segments(segments))
+        else:
+            self.logger.warning("区间重识别: ASR未生成任何片段，该区间的字幕将被清空。")
+
+        spliced_items = splice_subtitle_items(subtitle_items, new_items, range_start, range_end)
+        self.logger.info(f"区间重识别完成: 生成 {len(new_items)} 行新字幕，总计 {len(spliced_items)} 行。")
+        return spliced_items
+
+    def _configure_processing_stages(self, processing_language: str, asr_model: str, device: str,
+                                     min_duration_sec: float, min_gap_sec: float, current_custom_dict_path: str = None,
+                                     decoding_preset: str = None):
+        """
+        Brings the ASR service, normalizer, punctuator and segmenter in line with the settings of a run.
+
+        The decoding preset is only changed when `decoding_preset` is given.
+        """
+        if processing_language != self._active_language:
+            self.logger.info(f"处理语言已更改，从 '{self._active_language}' 到 '{processing_language}'. 切换下游组件。")
+            self._activate_language_stages(processing_language)
+            if self.llm_enhancer and hasattr(self.llm_enhancer, 'set_language'):
+                self.llm_enhancer.set_language(processing_language)
+
+        if (self.segmenter.min_duration_sec != min_duration_sec or
+            self.segmenter.min_gap_sec != min_gap_sec):
+            self.logger.info(f"Segmenter 时间轴参数已更改。旧: min_dur={self.segmenter.min_duration_sec}, min_gap={self.segmenter.min_gap_sec}. "
+                             f"新: min_dur={min_duration_sec}, min_gap={min_gap_sec}.")
+            self.logger.info(f"重新初始化 SubtitleSegmenter。语言: {processing_language}, "
+                             f"min_dur: {min_duration_sec}, min_gap: {min_gap_sec}")
+            current_max_chars = self.segmenter.max_chars_per_line
+            current_max_duration = self.segmenter.max_duration_sec
+            self.segmenter = SubtitleSegmenter(
+                language=processing_language,
+                logger=self.logger,
+                min_duration_sec=min_duration_sec,
+                min_gap_sec=min_gap_sec,
+                max_chars_per_line=current_max_chars,
+                max_duration_sec=current_max_duration
+            )
+
+        self.asr_service.update_model_and_device(model_name=asr_model, device=device)
+        if decoding_preset and hasattr(self.asr_service, "set_decoding_preset"):
+            self.asr_service.set_decoding_preset(decoding_preset)
+
+        if current_custom_dict_path != self.normalizer.current_dictionary_path:
+            self.logger.info(f"自定义词典路径已更改。旧: '{self.normalizer.current_dictionary_path}', 新: '{current_custom_dict_path}'. 正在更新Normalizer。")
+            self.normalizer.set_custom_dictionary_path(current_custom_dict_path)
+            self._current_normalizer_custom_dict_path = self.normalizer.current_dictionary_path
+
+    def get_word_timestamps(self, audio_video_path: str):
+        """
+        Returns the word timings of the last transcription of a file, for splitting or re-timing
+        cues at word precision without another ASR pass.
+
+        Returns:
+            WordTimestampStore | None: None if the file was not transcribed with `asr_word_timestamps`.
+        """
+        return self._word_timestamps.get(audio_video_path)
+
+    def _store_word_timestamps(self, audio_video_path: str, segments: list):
+        """Joins the per-segment words of a transcription into one compact store for the file."""
+        if not any(seg.get("words") is not None for seg in segments):
+            self._word_timestamps.pop(audio_video_path, None)
+            return
+        store = WordTimestampStore.concatenate(seg.get("words") for seg in segments)
+        self._word_timestamps[audio_video_path] = store
+        self.logger.info(f"单词时间戳: {len(store)} 个单词 ({store.nbytes / 1024:.0f} KB)")
+
+    def _record_asr_rtf(self, audio_video_path: str, audio_input, info, elapsed_sec: float):
+        """
+        Adds a finished transcription to the per-preset RTF statistics (see `RTFStatsStore`).
+
+        The RTF is measured against the whole input, so time saved by VAD, batching or parallel
+        chunks shows up in it. Failed transcriptions (no info) are not recorded.
+        """
+        if self.rtf_stats is None or info is None:
+            return
+        if isinstance(audio_input, np.ndarray):
+            audio_sec = len(audio_input) / self.audio_processor.target_sample_rate
+        elif isinstance(audio_input, str):
+            audio_sec = getattr(info, "duration", 0) or 0
+        else:
+            audio_sec = self.audio_processor.probe_media(audio_video_path).get("duration") or 0 # Cached probe
+        signature = self.asr_service.cache_signature() # Has the resolved compute type
+        self.rtf_stats.record(signature["model"], signature["device"], signature["compute_type"],
+                              signature["decoding_preset"], audio_sec, elapsed_sec)
+
+    def _refine_low_confidence_segments(self, segments: list, audio_video_path: str, audio_input, language: str,
+                                        audio_stream=None) -> list:
+        """
+        Re-decodes only the low-confidence segments of a transcription with the larger `asr_refine_model`.
+
+        Runs of flagged segments (see `find_low_confidence_runs`) are cut from the audio with
+        `asr_refine_padding_sec` of context on each side, decoded with the refine model taken from
+        the ASR service's model pool, and the new segments replace the run. Usually only a small
+        share of a file is flagged, so this costs little more than the first pass. A run whose
+        re-decode fails keeps its original segments.
+
+        Args:
+            segments (list[dict]): ASR segments on the original timeline, with confidence fields.
+            audio_video_path (str): Source file, to read the processed PCM if `audio_input` is not in memory.
+            audio_input: What was transcribed (see `_prepare_audio_input`); samples are sliced from it directly.
+            language (str): Language to decode the runs in.
+            audio_stream (int | str, optional): Audio track, as passed to `process_audio_to_subtitle`.
+
+        Returns:
+            list[dict]: Segments with the refined runs replaced.
+        """
+        refine_model = self.config.get("asr_refine_model", "")
+        if not refine_model or not segments or not hasattr(self.asr_service, "model_pool"):
+            return segments
+        runs = find_low_confidence_runs(
+            segments,
+            min_avg_logprob=self.config.get("asr_refine_min_avg_logprob", -0.8),
+            max_no_speech_prob=self.config.get("asr_refine_max_no_speech_prob", 0.6),
+            max_compression_ratio=self.config.get("asr_refine_max_compression_ratio", 2.4)
+        )
+        if not runs:
+            self.logger.info("低置信度精修: 没有需要重新识别的片段。")
+            return segments
+        self.logger.info(f"低置信度精修: {sum(end - start for start, end in runs)}/{len(segments)} 个片段 "
+                         f"({len(runs)} 段) 将使用 {refine_model} 重新识别。")
+
+        sr = self.audio_processor.target_sample_rate
+        pcm = None if isinstance(audio_input, np.ndarray) else self.get_processed_audio(audio_video_path, audio_stream=audio_stream)
+
+        def read_range(start_sec: float, end_sec: float) -> np.ndarray:
+            if pcm is None:
+                return audio_input[int(start_sec * sr):int(end_sec * sr)] # Already filtered
+            return self._apply_audio_filters(self.audio_processor.read_pcm_range(pcm, start_sec, end_sec))
+
+        padding_sec = self.config.get("asr_refine_padding_sec", 0.2)
+        started_at = time.perf_counter()
+        refined = []
+        cursor = 0
+        for run_start, run_end in runs:
+            refined.extend(segments[cursor:run_start])
+            cursor = run_end
+            region_start, region_end = segments[run_start]["start"], segments[run_end - 1]["end"]
+            offset = max(0.0, region_start - padding_sec)
+            new_segments, info = self.asr_service.transcribe(read_range(offset, region_end + padding_sec),
+                                                             language=language, model_name=refine_model)
+            if info is None:
+                self.logger.warning(f"低置信度精修失败，保留原片段: {region_start:.2f}s - {region_end:.2f}s")
+                refined.extend(segments[run_start:run_end])
+                continue
+            for seg in shift_segments(new_segments, offset):
+                # Text decoded from the padding belongs to the neighbouring segments
+                if not region_start <= (seg["start"] + seg["end"]) / 2.0 <= region_end:
+                    continue
+                seg["start"] = max(seg["start"], region_start)
+                seg["end"] = min(max(seg["end"], seg["start"]), region_end)
+                refined.append(seg)
+        refined.extend(segments[cursor:])
+        # The current model stays loaded; drop the refine model again if both do not fit the pool budget
+        self.asr_service.release_unused_models()
+        self.logger.info(f"低置信度精修完成，用时 {time.perf_counter() - started_at:.1f}s，"
+                         f"片段数 {len(segments)} -> {len(refined)}。")
+        return refined
+
+    def _asr_result_cache_key(self, audio_video_path: str, audio_stream, language: str):
+        """
+        Builds the ASR result cache key for a file, or None if the cache is off or the file cannot be fingerprinted.
+
+        The key combines the decoded-audio fingerprint (source content and selected stream) with the
+        ASR service's `cache_signature`, the requested language and the config that shapes the raw
+        segments (`ASR_RESULT_CONFIG_PREFIXES`). Text and timing settings are deliberately not part of it.
+        """
+        if self.asr_result_cache is None:
+            return None
+        try:
+            stream_index = self.audio_processor.resolve_audio_stream(audio_video_path, audio_stream)
+            audio_key = self.audio_store.fingerprint(audio_video_path, self.audio_processor.get_decode_params(stream_index))
+        except Exception as e:
+            self.logger.warning(f"无法计算ASR结果缓存键，本次不使用缓存: {e}")
+            return None
+        params = {
+            "language": language,
+            "asr": self.asr_service.cache_signature(),
+            "pipeline": {key: value for key, value in self.config.items() if key.startswith(ASR_RESULT_CONFIG_PREFIXES)},
+        }
+        return self.asr_result_cache.make_key(audio_key, params)
+
+    def _detect_input_language(self, audio_input):
+        """
+        Detects the language of a prepared ASR input from a short speech sample ("auto" mode).
+
+        Streamed windows are peeked (the first window is put back in front of the iterator). The
+        legacy "file" mode has no samples in memory, so its language is left to the ASR pass.
+
+        Returns:
+            tuple[str | None, Any]: (language code, or None to let ASR detect it; the ASR input to use).
+        """
+        if isinstance(audio_input, str):
+            return None, audio_input
+        if isinstance(audio_input, np.ndarray):
+            return self._detect_sample_language(audio_input), audio_input
+        first_window = next(audio_input, None)
+        if first_window is None:
+            return None, iter(())
+        return self._detect_sample_language(first_window[1]), itertools.chain([first_window], audio_input)
+
+    def _detect_sample_language(self, audio: np.ndarray):
+        """
+        Runs the ASR service's language detector on up to 30 s of speech from the start of `audio`.
+
+        Only the first `language_detect_scan_sec` seconds are scanned for speech, so the cost does
+        not grow with the file. Returns None if nothing could be detected.
+        """
+        sr = self.audio_processor.target_sample_rate
+        head = np.asarray(audio[:int(sr * self.config.get("language_detect_scan_sec", 120.0))], dtype=np.float32)
+        if len(head) < sr // 2:
+            return None
+        speech_regions = self.audio_processor.detect_speech_regions(
+            head,
+            min_silence_sec=self.config.get("vad_min_silence_sec", 0.6),
+            padding_sec=self.config.get("vad_padding_sec", 0.25)
+        )
+        sample = self.audio_processor.collect_speech_audio(head, speech_regions) if speech_regions else head
+        try:
+            language, probability = self.asr_service.detect_language(sample[:sr * 30])
+        except Exception as e:
+            self.logger.warning(f"语言检测失败，将由ASR自动检测: {e}")
+            return None
+        if language:
+            self.logger.info(f"检测到语言: '{language}' (概率: {probability:.2f})")
+        return language
+
+    def _apply_auto_language(self, audio_video_path: str, detected_language: str, info, asr_model: str, device: str,
+                             min_duration_sec: float, min_gap_sec: float, current_custom_dict_path: str = None):
+        """
+        Switches to the stages of the language found for a file in "auto" mode.
+
+        Falls back to the language reported by the ASR pass when the detector was not run. A
+        dictionary selected for "auto" applies to every language; otherwise the dictionary
+        configured for the detected language (`custom_dictionary_path_<lang>`) is used.
+        """
+        language = detected_language or getattr(info, "language", None)
+        if not language:
+            self.logger.warning(f"无法确定 {audio_video_path} 的语言，沿用 '{self._active_language}' 的处理组件。")
+            return
+        self._detected_languages[audio_video_path] = language
+        self._configure_processing_stages(language, asr_model, device, min_duration_sec, min_gap_sec,
+                                          current_custom_dict_path or self.config.get(f"custom_dictionary_path_{language}") or None)
+
+    def _postprocess_asr_segments(self, asr_segments_list: list) -> list:
+        """Fixes ASR text repeated within a segment and merges consecutive segments with identical text."""
+        # --- BEGIN ADDED CODE FOR ASR DUPLICATION FIX ---
+        fixed_asr_segments = []
+        self.logger.debug(f"ASR去重: 开始处理 {len(asr_segments_list)} 个原始片段。")
+        for seg_idx, asr_seg in enumerate(asr_segments_list):
+            original_text = asr_seg.get("text", "")
+            self.logger.debug(f"ASR去重: 片段 {seg_idx} 原始内容: '{original_text}'")
+            text_to_process = original_text.strip()
+            self.logger.debug(f"ASR去重: 片段 {seg_idx} strip后内容: '{text_to_process}'")
+            corrected_text = text_to_process # Default to original stripped text
+            found_fix = False
+
+            # 1. Attempt to fix "A<delim>A" style duplication (e.g., "text.text", "text?text")
+            possible_delimiters_for_fix = ["。", "？", "！", ".", "?", "!", " "]
+            self.logger.debug(f"ASR去重: 片段 {seg_idx} 使用分隔符列表: {possible_delimiters_for_fix}")
+            
+            for delim_char in possible_delimiters_for_fix:
+                self.logger.debug(f"ASR去重: 片段 {seg_idx} 尝试分隔符 '{delim_char}'")
+                if delim_char and delim_char in text_to_process:
+                    parts = text_to_process.split(delim_char, 1)
+                    self.logger.debug(f"ASR去重: 片段 {seg_idx} 使用 '{delim_char}' 分割结果: {parts}")
+                    if len(parts) == 2:
+                        s1 = parts[0].strip()
+                        s2 = parts[1].strip()
+                        self.logger.debug(f"ASR去重: 片段 {seg_idx} s1='{s1}', s2='{s2}'")
+                        if s1 and s1 == s2:
+                            corrected_text = s1 if delim_char == " " else s1 + delim_char
+                            self.logger.info(f"ASR 文本修复 (模式 '{delim_char}'): 片段 {seg_idx} 从 '{original_text}' 修复为 '{corrected_text}'")
+                            found_fix = True
+                            break
+                    else:
+                        self.logger.debug(f"ASR去重: 片段 {seg_idx} 使用 '{delim_char}' 分割部分不足2。")
+                else:
+                    self.logger.debug(f"ASR去重: 片段 {seg_idx} 分隔符 '{delim_char}' 不存在或为空。")
+            
+            if not found_fix:
+                self.logger.debug(f"ASR去重: 片段 {seg_idx} 未通过分隔符模式修复。尝试对半模式。")
+                text_len = len(text_to_process)
+                if text_len > 2 and text_len % 2 == 0:
+                    mid_point = text_len // 2
+                    part1 = text_to_process[:mid_point] # .strip() is not needed here if text_to_process is already stripped
+                    part2 = text_to_process[mid_point:] # .strip() is not needed here
+                    self.logger.debug(f"ASR去重: 片段 {seg_idx} 对半模式: part1='{part1}', part2='{part2}'")
+                    if part1 == part2 and part1:
+                        corrected_text = part1
+                        self.logger.info(f"ASR 文本修复 (直接对半模式): 片段 {seg_idx} 从 '{original_text}' 修复为 '{corrected_text}'")
+                        # found_fix = True # Not strictly needed
+                    else:
+                        self.logger.debug(f"ASR去重: 片段 {seg_idx} 对半模式不匹配或part1为空。")
+                else:
+                    self.logger.debug(f"ASR去重: 片段 {seg_idx} 文本长度 ({text_len}) 不适用于对半模式。")
+            
+            new_seg = asr_seg.copy()
+            new_seg["text"] = corrected_text
+            fixed_asr_segments.append(new_seg)
+            self.logger.debug(f"ASR去重: 片段 {seg_idx} 最终修正文本: '{corrected_text}', 添加到修复列表。")
+
+        asr_segments_list = fixed_asr_segments
+        # --- END ADDED CODE FOR ASR DUPLICATION FIX ---
+
+        # --- BEGIN ADDED CODE FOR INTER-SEGMENT DUPLICATION FIX ---
+        if len(asr_segments_list) > 1:
+            self.logger.debug(f"合并前，ASR片段数量: {len(asr_segments_list)}")
+            merged_asr_segments = []
+            
+            # 第一个片段直接添加
+            if asr_segments_list:
+                 merged_asr_segments.append(asr_segments_list[0])
+
+            for i in range(1, len(asr_segments_list)):
+                current_seg = asr_segments_list[i]
+                prev_merged_seg = merged_asr_segments[-1]
+
+                # 条件：文本相同，且时间上基本连续 (允许小的间隙，比如0.1秒)
+                # 我们也需要考虑 prev_merged_seg['text'] 可能为空的情况
+                if prev_merged_seg.get("text") and \
+                   current_seg.get("text") == prev_merged_seg.get("text") and \
+                   current_seg.get("start", 0) - prev_merged_seg.get("end", -1) <= 0.2: # 允许0.2秒的间隙
+                    
+                    self.logger.info(f"检测到连续的相同文本片段，将合并: '{current_seg.get('text')}' "
+                                     f"({prev_merged_seg.get('start'):.2f}-{prev_merged_seg.get('end'):.2f} "
+                                     f"和 {current_seg.get('start'):.2f}-{current_seg.get('end'):.2f})")
+                    # 扩展前一个片段的结束时间
+                    prev_merged_seg["end"] = max(prev_merged_seg.get("end",0), current_seg.get("end",0))
+                    self.logger.debug(f"合并后，前一片段更新为: {prev_merged_seg.get('start'):.2f}-{prev_merged_seg.get('end'):.2f}")
+                else:
+                    merged_asr_segments.append(current_seg)
+            
+            if len(merged_asr_segments) < len(asr_segments_list):
+                self.logger.info(f"跨片段合并完成。片段数从 {len(asr_segments_list)} 减少到 {len(merged_asr_segments)}。")
+            asr_segments_list = merged_asr_segments
+        # --- END ADDED CODE FOR INTER-SEGMENT DUPLICATION FIX ---
+        return asr_segments_list
+
+    def _segments_to_subtitle_items(self, asr_segments_list: list) -> list:
+        """
+        Runs the text pipeline (normalizer -> punctuator -> segmenter) on ASR segments.
+
+        Returns:
+            list[pysrt.SubRipItem]: Subtitle items numbered from 1; empty if nothing was produced.
+        """
+        self.logger.info("正在进行文本规范化...")
+        normalized_segments = self.normalizer.normalize_text_segments(asr_segments_list)
+        self.logger.info(f"文本规范化完成，生成 {len(normalized_segments)} 个片段。")
+
+        self.logger.info("正在添加标点符号...")
+        punctuated_segments = self.punctuator.add_punctuation(normalized_segments)
+        self.logger.info(f"标点符号添加完成，生成 {len(punctuated_segments)} 个片段。")
+
+        self.logger.info("正在进行字幕分段...")
+        subtitle_lines = self.segmenter.segment_into_subtitle_lines(punctuated_segments)
+        if not subtitle_lines:
+            self.logger.warning("字幕分段未生成任何行。")
+            return []
+        self.logger.info(f"字幕分段完成，生成 {len(subtitle_lines)} 行字幕。")
+        
+        pysrt_items = []
+        structured_subtitle_data = []
+        if subtitle_lines and isinstance(subtitle_lines, list):
+            for idx, dict_item in enumerate(subtitle_lines):
+                start_time_s = dict_item.get('start', 0.0)
+                end_time_s = dict_item.get('end', 0.0)
+                text_content = str(dict_item.get('text', ''))
+                try:
+                    start_time_s = float(start_time_s)
+                    end_time_s = float(end_time_s)
+                except (ValueError, TypeError):
+                    self.logger.error(f"WorkflowManager: Invalid time value for item {idx} during conversion: start='{start_time_s}', end='{end_time_s}'. Skipping item.")
+                    continue
+                start_obj = pysrt.SubRipTime(seconds=start_time_s)
+                end_obj = pysrt.SubRipTime(seconds=end_time_s)
+                if start_obj > end_obj:
+                    self.logger.warning(f"WorkflowManager data conversion: item {idx} has start > end ({start_obj} > {end_obj}). Clamping end to start.")
+                    end_obj = pysrt.SubRipTime(seconds=start_time_s)
+                pysrt_items.append(pysrt.SubRipItem(
+                    index=idx + 1, start=start_obj, end=end_obj, text=text_content
+                ))
+            structured_subtitle_data = pysrt_items
+            self.logger.info(f"已将 {len(subtitle_lines)} 个字典条目转换为 {len(pysrt_items)} 个 SubRipItem 对象。")
+        else:
+            self.logger.warning(f"Subtitle lines from segmenter was empty or not a list: {subtitle_lines}")
+            structured_subtitle_data = []
+        return structured_subtitle_data
+
+    def _prepare_audio_input(self, audio_video_path: str, temp_dir: str, audio_stream=None):
+        """
+        Prepares the ASR input for a file according to the configured `audio_decode_mode`.
+
+        "memory" (default) decodes with a single ffmpeg process straight into a float32 array.
+        "stream" returns a lazy generator of fixed-size PCM windows for bounded memory.
+        "file" keeps the legacy path of writing a standard WAV into `temp_dir`.
+        In "memory" and "stream" modes a hit in `audio_store` (the decoded-audio cache or the session
+        store) skips ffmpeg; on a miss the decode still goes to memory / the pipe and the store entry
+        is filled from the same samples. Only the selected `audio_stream` is decoded; it is part of the key.
+
+        Returns:
+            np.ndarray | str | Iterator: Decoded samples, the path of the preprocessed WAV file,
+                                         or an iterator of (window_start_sec, samples) tuples.
+        """
+        decode_mode = self.config.get("audio_decode_mode", "memory")
+        stream_index = self.audio_processor.resolve_audio_stream(audio_video_path, audio_stream)
+        cache_key, cached_pcm_path = self._lookup_cached_pcm(audio_video_path, stream_index) if decode_mode in ("memory", "stream") else (None, None)
+        if decode_mode == "stream":
+            chunk_sec = self.config.get("audio_stream_chunk_sec", 30.0)
+            overlap_sec = self.config.get("audio_stream_overlap_sec", 1.0)
+            if cached_pcm_path:
+                return self.audio_processor.iter_pcm_file_chunks(cached_pcm_path, chunk_sec=chunk_sec, overlap_sec=overlap_sec)
+            if cache_key:
+                return self._iter_chunks_into_store(audio_video_path, cache_key, chunk_sec, overlap_sec, stream_index)
+            return self.audio_processor.iter_audio_chunks(audio_video_path, chunk_sec=chunk_sec, overlap_sec=overlap_sec, audio_stream=stream_index)
+        if decode_mode == "memory":
+            if cached_pcm_path:
+                return self.audio_processor.load_pcm_file(cached_pcm_path)
+            return self._decode_to_memory(audio_video_path, cache_key, audio_stream=stream_index)
+
+        base_name = os.path.splitext(os.path.basename(audio_video_path))[0]
+        processed_audio_path = os.path.join(temp_dir, f"{base_name}_processed.wav")
+        self.audio_processor.preprocess_audio(audio_video_path, processed_audio_path, audio_stream=stream_index)
+        self.logger.info(f"音频预处理完成，生成文件: {processed_audio_path}")
+        return processed_audio_path
+
+    def _apply_audio_filters(self, audio_input):
+        """
+        Applies the optional sample-level filters (currently noise reduction) to a prepared ASR input.
+
+        Filters run after the decoded-audio cache, so the cache keeps the unfiltered PCM and
+        changing filter settings never invalidates it.
+        """
+        if not self.config.get("noise_reduction_enabled", False):
+            return audio_input
+        if isinstance(audio_input, str):
+            self.logger.warning("降噪仅支持 memory/stream 解码模式，\"file\" 模式下已跳过。")
+            return audio_input
+        return self.audio_processor.apply_noise_reduction(
+            audio_input,
+            reduction_db=self.config.get("noise_reduction_db", 12.0),
+            threshold_std=self.config.get("noise_reduction_threshold_std", 1.5),
+            noise_percentile=self.config.get("noise_reduction_profile_percentile", 10.0)
+        )
+
+    def prefetch_audio(self, audio_video_path: str, cancel_event: threading.Event = None, audio_stream=None):
+        """
+        Decodes a file ahead of time so a later `process_audio_to_subtitle` call skips ffmpeg.
+
+        Safe to call from a background thread. In "memory" mode the decoded samples are returned
+        for `process_audio_to_subtitle(prefetched_audio=...)` (None on a cache hit, the cached PCM
+        is loaded at processing time). In "stream" mode the PCM is decoded into the processed-audio
+        store so nothing is held in memory. Setting `cancel_event` kills a running ffmpeg.
+
+        Returns:
+            np.ndarray | None: Decoded samples to pass back in, or None if nothing needs to be held.
+        """
+        decode_mode = self.config.get("audio_decode_mode", "memory")
+        if decode_mode not in ("memory", "stream"):
+            return None
+        stream_index = self.audio_processor.resolve_audio_stream(audio_video_path, audio_stream)
+        cache_key, cached_pcm_path = self._lookup_cached_pcm(audio_video_path, stream_index)
+        if cached_pcm_path:
+            return None
+        if decode_mode == "memory":
+            return self._decode_to_memory(audio_video_path, cache_key, cancel_event=cancel_event, audio_stream=stream_index)
+        self._decode_into_store(audio_video_path, cache_key, stream_index, cancel_event=cancel_event)
+        return None
+
+    def _lookup_cached_pcm(self, audio_video_path: str, stream_index: int = None):
+        """
+        Looks up the processed-audio store (the decoded-audio cache, or the session store when
+        the cache is disabled) for a file without decoding anything.
+
+        Returns:
+            tuple[str, str | None]: (store key, PCM path). The path is None on a miss.
+        """
+        cache_key = self.audio_store.fingerprint(audio_video_path, self.audio_processor.get_decode_params(stream_index))
+        cached_pcm_path = self.audio_store.get(cache_key)
+        if cached_pcm_path:
+            self.logger.info(f"使用已缓存的解码音频，跳过ffmpeg: {audio_video_path}")
+        return cache_key, cached_pcm_path
+
+    def _decode_to_memory(self, audio_video_path: str, cache_key: str = None, cancel_event: threading.Event = None,
+                          audio_stream: int = None) -> np.ndarray:
+        """Decodes a file into memory and, if `cache_key` is given, writes its store entry in the background."""
+        pcm16 = self.audio_processor.decode_audio_to_pcm16(audio_video_path, cancel_event=cancel_event, audio_stream=audio_stream)
+        if cache_key:
+            self._pcm_writer.submit(self.audio_store.store_array, cache_key, pcm16)
+        audio_array = self.audio_processor.pcm16_to_float(pcm16)
+        self.logger.info(f"音频已在内存中解码完成 ({len(audio_array)} 个采样点)。")
+        return audio_array
+
+    def _iter_chunks_into_store(self, audio_video_path: str, cache_key: str, chunk_sec: float, overlap_sec: float,
+                                audio_stream: int = None):
+        """
+        Streams windows from the ffmpeg pipe while teeing the raw PCM into a store entry.
+
+        The entry is committed only if the stream is consumed to the end without errors.
+        """
+        partial_path = self.audio_store.reserve_path(cache_key)
+        completed = False
+        try:
+            with open(partial_path, "wb") as pcm_sink:
+                yield from self.audio_processor.iter_audio_chunks(
+                    audio_video_path, chunk_sec=chunk_sec, overlap_sec=overlap_sec, pcm_sink=pcm_sink, audio_stream=audio_stream
+                )
+            completed = True
+        finally:
+            if completed:
+                self.audio_store.commit(cache_key, partial_path)
+            else:
+                self.audio_store.discard(partial_path)
+
+    def _decode_into_store(self, audio_video_path: str, cache_key: str, stream_index: int = None,
+                           cancel_event: threading.Event = None) -> str:
+        """Decodes a file straight into a processed-audio store entry and returns its path."""
+        partial_path = self.audio_store.reserve_path(cache_key)
+        try:
+            self.audio_processor.decode_audio_to_pcm_file(audio_video_path, partial_path, cancel_event=cancel_event,
+                                                          audio_stream=stream_index)
+            return self.audio_store.commit(cache_key, partial_path)
+        except Exception:
+            self.audio_store.discard(partial_path)
+            raise
+
+    def get_processed_audio(self, audio_video_path: str, audio_stream=None) -> np.ndarray:
+        """
+        Returns the decoded 16 kHz PCM of a file as a read-only `np.memmap`, decoding it only if needed.
+
+        Files already processed in this session (or found in the decoded-audio cache) are mapped
+        without running ffmpeg, so arbitrary time ranges can be sliced cheaply with
+        `AudioProcessor.read_pcm_range`.
+
+        Args:
+            audio_video_path (str): Path of the original media file.
+            audio_stream (int | str, optional): Audio track, as passed to `process_audio_to_subtitle`.
+
+        Returns:
+            np.memmap: int16 mono samples at `AudioProcessor.target_sample_rate`.
+        """
+        self._pcm_writer.submit(lambda: None).result() # Wait for background writes of earlier decodes
+        stream_index = self.audio_processor.resolve_audio_stream(audio_video_path, audio_stream)
+        cache_key, pcm_path = self._lookup_cached_pcm(audio_video_path, stream_index)
+        if not pcm_path:
+            self.logger.info(f"处理后的音频不存在，正在解码: {audio_video_path}")
+            pcm_path = self._decode_into_store(audio_video_path, cache_key, stream_index)
+        return self.audio_processor.open_pcm_memmap(pcm_path)
+
+    def _transcribe_audio_input(self, audio_input, language: str, progress_callback=None, media_duration_sec: float = None):
+        """
+        Runs ASR on the output of `_prepare_audio_input`.
+
+        Args:
+            progress_callback (Callable, optional): Per-segment progress callback (see `process_audio_to_subtitle`).
+            media_duration_sec (float, optional): Total duration, needed for progress of streamed windows.
+
+        Returns:
+            tuple[list[dict], Any]: (segments on the original timeline, transcription info).
+        """
+        if isinstance(audio_input, np.ndarray):
+            return self._transcribe_array(audio_input, language, progress_callback=progress_callback)
+        if isinstance(audio_input, str):
+            return self.asr_service.transcribe(audio_input, language=language, progress_callback=progress_callback)
+        return self._transcribe_windows(audio_input, language, progress_callback=progress_callback,
+                                        media_duration_sec=media_duration_sec)
+
+    def _transcribe_array(self, audio: np.ndarray, language: str, progress_callback=None):
+        """
+        Transcribes in-memory samples, optionally passing only VAD speech regions to the ASR service.
+
+        With `vad_enabled`, silence and low-energy stretches are cut out before ASR (saving decode
+        time and avoiding hallucinated text in silence) and the resulting segment timestamps are
+        remapped back onto the original timeline. With `asr_batch_size` > 0 the audio is cut into
+        clips instead and decoded with `_transcribe_batched`; with `asr_parallel_chunks` > 1 long
+        audio is split into chunks that are decoded concurrently (`_transcribe_chunks`).
+        """
+        if self.config.get("asr_batch_size", 0) > 0 and hasattr(self.asr_service, "transcribe_batched"):
+            return self._transcribe_batched(audio, language, progress_callback=progress_callback)
+        if self.config.get("asr_parallel_chunks", 0) > 1:
+            chunks = self.audio_processor.plan_clips(
+                audio, [(0.0, len(audio) / self.audio_processor.target_sample_rate)],
+                max_clip_sec=self.config.get("asr_chunk_sec", 300.0),
+                search_sec=min(30.0, self.config.get("asr_chunk_sec", 300.0) / 4.0)
+            )
+            if len(chunks) > 1:
+                return self._transcribe_chunks(audio, chunks, language, progress_callback=progress_callback)
+        return self._transcribe_speech(audio, language, progress_callback=progress_callback)
+
+    def _transcribe_speech(self, audio: np.ndarray, language: str, progress_callback=None):
+        """Transcribes samples in one pass, cutting out non-speech first when `vad_enabled`."""
+        if not self.config.get("vad_enabled", False):
+            return self._transcribe_or_raise(audio, language, progress_callback=progress_callback)
+
+        speech_regions = self.audio_processor.detect_speech_regions(
+            audio,
+            min_silence_sec=self.config.get("vad_min_silence_sec", 0.6),
+            padding_sec=self.config.get("vad_padding_sec", 0.25)
+        )
+        if not speech_regions:
+            self.logger.info("VAD未检测到语音，跳过ASR。")
+            return [], None
+
+        speech_callback = None
+        if progress_callback:
+            def speech_callback(progress, rtf, segment):
+                progress_callback(progress, rtf, self.audio_processor.remap_segment_times([segment], speech_regions)[0])
+
+        speech_audio = self.audio_processor.collect_speech_audio(audio, speech_regions)
+        segments, info = self._transcribe_or_raise(speech_audio, language, progress_callback=speech_callback)
+        return self.audio_processor.remap_segment_times(segments, speech_regions), info
+
+    def _transcribe_chunks(self, audio: np.ndarray, chunks: list, language: str, progress_callback=None):
+        """
+        Transcribes long in-memory audio as chunks decoded concurrently and joins the results.
+
+        The chunks come from `AudioProcessor.plan_clips`, so every cut lies at the quietest frame
+        near the `asr_chunk_sec` boundary. Each chunk is decoded with `asr_chunk_padding_sec` of
+        neighbouring audio so words at the cut are not clipped, and the repeated text this causes
+        at the seams is removed by `merge_chunk_segments`. If the language is auto-detected, the
+        first chunk is decoded alone and its language is pinned for the others. Up to
+        `asr_parallel_chunks` chunks run at a time; the Whisper model is loaded with at least as
+        many workers (see `__init__`), so the decodes really overlap.
+        """
+        sr = self.audio_processor.target_sample_rate
+        padding_sec = self.config.get("asr_chunk_padding_sec", 0.5)
+        total_sec = len(audio) / sr
+        started_at = time.perf_counter()
+        done_sec = [0.0] * len(chunks)
+        progress_lock = threading.Lock()
+
+        def transcribe_chunk(chunk_index: int, chunk_language: str):
+            chunk_start, chunk_end = chunks[chunk_index]
+            offset = max(0.0, chunk_start - padding_sec)
+            chunk_audio = audio[int(offset * sr):int(min(total_sec, chunk_end + padding_sec) * sr)]
+            chunk_callback = None
+            if progress_callback:
+                def chunk_callback(progress, rtf, segment):
+                    absolute_segment = shift_segments([segment], offset)[0]
+                    with progress_lock:
+                        done_sec[chunk_index] = max(done_sec[chunk_index],
+                                                    min(absolute_segment["end"], chunk_end) - chunk_start)
+                        processed_sec = sum(done_sec)
+                    elapsed = time.perf_counter() - started_at
+                    progress_callback(min(1.0, processed_sec / total_sec) if total_sec else progress,
+                                      elapsed / processed_sec if processed_sec > 0 else rtf, absolute_segment)
+            segments, info = self._transcribe_speech(chunk_audio, chunk_language, progress_callback=chunk_callback)
+            return shift_segments(segments, offset), info
+
+        self.logger.info(f"并行分块ASR: {total_sec:.1f}s 音频切分为 {len(chunks)} 块 (并行 {self.config.get('asr_parallel_chunks', 0)})。")
+        results = [None] * len(chunks)
+        first_info = None
+        pending = list(range(len(chunks)))
+        if not language:
+            results[0] = transcribe_chunk(0, None)
+            first_info = results[0][1]
+            language = first_info.language if first_info is not None else None
+            pending = pending[1:]
+        with ThreadPoolExecutor(max_workers=self.config.get("asr_parallel_chunks", 0),
+                                thread_name_prefix="ASRChunk") as executor:
+            futures = {executor.submit(transcribe_chunk, chunk_index, language): chunk_index for chunk_index in pending}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+        if first_info is None:
+            first_info = next((info for _, info in results if info is not None), None)
+
+        merged_segments = merge_chunk_segments(
+            [(chunk_start, segments) for (chunk_start, _), (segments, _) in zip(chunks, results)],
+            seam_window_sec=max(2.0, 2 * padding_sec), logger=self.logger
+        )
+        self.logger.info(f"并行分块ASR完成，耗时 {time.perf_counter() - started_at:.1f}s，合并后共 {len(merged_segments)} 个片段。")
+        return merged_segments, first_info
+
+    def _transcribe_batched(self, audio: np.ndarray, language: str, progress_callback=None):
+        """
+        Transcribes in-memory samples with the batched inference pipeline.
+
+        Speech regions (the whole audio when `vad_enabled` is off) are packed into clips of at most
+        30 seconds, cut at quiet points, and `asr_batch_size` clips are decoded at a time. Clips
+        keep their position in the file, so no timestamp remapping is needed.
+        """
+        if len(audio) == 0:
+            return [], None
+        if self.config.get("vad_enabled", False):
+            speech_regions = self.audio_processor.detect_speech_regions(
+                audio,
+                min_silence_sec=self.config.get("vad_min_silence_sec", 0.6),
+                padding_sec=self.config.get("vad_padding_sec", 0.25)
+            )
+            if not speech_regions:
+                self.logger.info("VAD未检测到语音，跳过ASR。")
+                return [], None
+        else:
+            speech_regions = [(0.0, len(audio) / self.audio_processor.target_sample_rate)]
+
+        clips = self.audio_processor.plan_clips(audio, speech_regions)
+        segments, info = self.asr_service.transcribe_batched(audio, clips, language=language,
+                                                             batch_size=self.config.get("asr_batch_size", 0),
+                                                             progress_callback=progress_callback)
+        if info is None and not segments and len(audio) > 0:
+            raise RuntimeError("ASR服务转录失败 (未返回结果)，详情见日志。")
+        return segments, info
+
+    def _transcribe_or_raise(self, audio: np.ndarray, language: str, progress_callback=None):
+        """
+        Calls the ASR service on non-empty samples and turns its `([], None)` error result into an exception.
+
+        `WhisperService.transcribe` logs and swallows decoding errors; without this check a failed
+        stream window would be merged as if it were silent and the user would never see an error.
+        """
+        segments, info = self.asr_service.transcribe(audio, language=language, progress_callback=progress_callback)
+        if info is None and not segments and len(audio) > 0:
+            raise RuntimeError("ASR服务转录失败 (未返回结果)，详情见日志。")
+        return segments, info
+
+    def _transcribe_windows(self, windows, language: str, progress_callback=None, media_duration_sec: float = None):
+        """
+        Transcribes streamed PCM windows one by one and merges them into a single timeline.
+
+        If the language is auto-detected, the language found in the first window is pinned for
+        the remaining windows so that every window is decoded consistently. Progress is reported
+        on the whole-file timeline when `media_duration_sec` is known.
+        """
+        merger = WindowedSegmentMerger(overlap_sec=self.config.get("audio_stream_overlap_sec", 1.0), logger=self.logger)
+        first_info = None
+        window_language = language
+        started_at = time.perf_counter()
+        for window_index, (window_start_sec, window_samples) in enumerate(windows):
+            self.logger.debug(f"流式ASR: 窗口 {window_index} @ {window_start_sec:.2f}s ({len(window_samples)} 个采样点)")
+            window_callback = None
+            if progress_callback:
+                def window_callback(progress, rtf, segment, offset=window_start_sec):
+                    absolute_segment = shift_segments([segment], offset)[0]
+                    absolute_end = absolute_segment["end"]
+                    if media_duration_sec:
+                        progress = min(1.0, absolute_end / media_duration_sec)
+                    rtf = (time.perf_counter() - started_at) / absolute_end if absolute_end > 0 else rtf
+                    progress_callback(progress, rtf, absolute_segment)
+            window_segments, info = self._transcribe_array(window_samples, window_language, progress_callback=window_callback)
+            if info is not None and first_info is None:
+                first_info = info
+                if not window_language:
+                    window_language = info.language
+            merger.add_window(window_start_sec, shift_segments(window_segments, window_start_sec))
+        merged_segments = merger.flush()
+        self.logger.info(f"流式ASR完成，合并后共 {len(merged_segments)} 个片段。")
+        return merged_segments, first_info
+
+    def preload_asr_model(self):
+        """
+        Starts loading the configured Whisper model in the background (see `WhisperService.start_background_load`).
+
+        Processing does not need to wait for the returned future: the ASR calls block until the
+        model is ready and load it themselves if no preload was started.
+
+        Returns:
+            concurrent.futures.Future: Resolves when the model is loaded and warmed up (at once for
+                                       backends without a model).
+        """
+        if not hasattr(self.asr_service, "start_background_load"):
+            ready = Future()
+            ready.set_result(None)
+            return ready
+        return self.asr_service.start_background_load()
+
+    def create_asr_process_pool(self, num_workers: int) -> ASRProcessPool:
+        """
+        Starts a pool of ASR worker processes configured like this manager (see `ASRProcessPool`).
+
+        The calibrated compute type of the configured model is resolved here, while the CPU threads
+        are split evenly across the workers.
+        """
+        tuned_settings = None
+        if getattr(self.asr_service, "tuning_store", None):
+            tuned_settings = self.asr_service.tuning_store.get(self.config.get("asr_model", "small"), self.config.get("device", "cpu"))
+        return ASRProcessPool(self.config, num_workers, tuned_settings=tuned_settings, logger=self.logger)
+
     def export_subtitles(self, structured_data: list, target_format: str) -> str:
         formatter = self.formatters.get(target_format.lower())
         if not formatter:
@@ -570,6 +1387,11 @@ class WorkflowManager:
                 self.logger.error(f"WorkflowManager: Error closing LLM Enhancer HTTP client: {e}", exc_info=True)
         else:
             self.logger.info("WorkflowManager: No LLM Enhancer client to close or close_http_client method not found.")
+        self._pcm_writer.shutdown(wait=True) # Let pending PCM writes finish so no partial files are left
+        if hasattr(self.asr_service, "model_pool"):
+            self.asr_service.model_pool.clear()
+        if self._session_audio_dir:
+            shutil.rmtree(self._session_audio_dir, ignore_errors=True)
         self.logger.info("WorkflowManager: Resources closed.")
 
     def close_resources_sync(self):
@@ -7,6 +7,8 @@ from intellisubs.core.workflow_manager import WorkflowManager
 from intellisubs.utils.config_manager import ConfigManager
 from intellisubs.utils.logger_setup import setup_logging, mask_sensitive_data # Import the masking function
 
+ASR_PRELOAD_POLL_MS = 200 # How often the main loop checks the background model load
+
 class IntelliSubsApp(ctk.CTk):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -56,8 +58,30 @@ class IntelliSubsApp(ctk.CTk):
         self.bind("<Control-q>", lambda event: self.quit_app())
         self.protocol("WM_DELETE_WINDOW", self.quit_app) # Handle window close button
 
+        # Load the Whisper model once the window is drawn instead of blocking startup
+        self.after_idle(self.start_asr_model_preload)
+
         self.logger.info("IntelliSubsApp initialized.")
 
+    def start_asr_model_preload(self):
+        """Starts the background Whisper model load and reports its outcome in the status bar."""
+        future = self.workflow_manager.preload_asr_model()
+        if future.done() and future.exception() is None:
+            return # Already loaded, or a backend without a model
+        self.show_status_message("正在后台加载ASR模型...")
+        self._poll_asr_model_preload(future)
+
+    def _poll_asr_model_preload(self, future):
+        """Checks the preload future from the Tk main loop (Tk must not be called from the loader thread)."""
+        if not future.done():
+            self.after(ASR_PRELOAD_POLL_MS, self._poll_asr_model_preload, future)
+            return
+        error = future.exception()
+        if error:
+            self.show_status_message(f"ASR模型加载失败: {error}", error=True)
+        else:
+            self.show_status_message("ASR模型已就绪。", success=True, duration_ms=3000)
+
     def show_status_message(self, message: str, error: bool = False, warning: bool = False, success: bool = False, duration_ms: int = None):
         """
         Updates the main application status label.
@@ -4,6 +4,7 @@ import json
 from tkinter import filedialog, messagebox
 import os
 import threading # For running processing in a separate thread
+import time # For measuring the batch real-time factor
 import logging # For the test __main__ logger
 import asyncio # For _async_run_llm_test
 import pysrt # For SubRipItem and SubRipTime objects
@@ -18,6 +19,9 @@ from .main_window_components.combined_file_status_panel import CombinedFileStatu
 from ...utils.config_manager import ConfigManager
 from ...utils.logger_setup import setup_logging
 from ...core.workflow_manager import WorkflowManager
+from ...core.audio_processing.prefetcher import AudioPrefetcher
+from ...core.batch_scheduler import plan_batch, RealTimeFactorEstimator, format_duration
+from ...core.subtitle_splice import merge_refined_items
 from ...core.text_processing.llm_enhancer import LLMEnhancer # Added import
 
 
@@ -140,6 +144,8 @@ class MainWindow(ctk.CTkFrame):
             self.logger.info(f"Adding {len(files_to_add_to_ui)} new files to UI: {files_to_add_to_ui}")
             for f_path_add in files_to_add_to_ui:
                 self.combined_file_status_panel.add_file(f_path_add)
+            # Probe the new files in the background to fill their audio track menus
+            threading.Thread(target=self._probe_audio_streams_in_thread, args=(list(files_to_add_to_ui),), daemon=True).start()
         else:
             self.logger.info("No new files to add to UI.")
 
@@ -181,6 +187,16 @@ class MainWindow(ctk.CTkFrame):
         self.update_export_all_button_state()
         # TopControlsPanel is responsible for updating its own start button state.
 
+    def _probe_audio_streams_in_thread(self, file_paths: list):
+        """Reads the audio streams of newly added files and offers them in the per-file track menu."""
+        for file_path in file_paths:
+            try:
+                audio_streams = self.workflow_manager.audio_processor.probe_media(file_path)["audio_streams"]
+            except Exception as e:
+                self.logger.warning(f"无法读取音轨信息 {os.path.basename(file_path)}: {e}")
+                continue
+            self.app.after(0, lambda p=file_path, streams=audio_streams: self.combined_file_status_panel.set_audio_stream_options(p, streams))
+
     def update_export_all_button_state(self):
         """ Centralized logic to update the 'Export All' button state via ResultsPanel. """
         output_dir = self.top_controls_panel.get_output_directory()
@@ -255,6 +271,7 @@ class MainWindow(ctk.CTkFrame):
         processing_thread.start()
 
     def _run_processing_in_thread(self):
+        prefetcher = None
         try:
             ui_settings = self.settings_panel.get_settings()
             output_dir_to_use = self.top_controls_panel.get_output_directory()
@@ -307,54 +324,133 @@ class MainWindow(ctk.CTkFrame):
             lang_code_for_dict_key = ui_settings['language'] # lang code for custom dict
             current_dict_path = ui_settings.get(f"custom_dictionary_path_{lang_code_for_dict_key}", "")
 
-            for index, file_path in enumerate(self.selected_file_paths):
-                base_filename = os.path.basename(file_path)
-                status_prefix = f"处理中 ({index + 1}/{len(self.selected_file_paths)}): {base_filename}"
-                self.logger.info(f"{status_prefix} ASR: {ui_settings['asr_model']}, LLM: {ui_settings['llm_enabled']}")
+            # Probe every file up front: unreadable files are rejected before any decoding/ASR,
+            # the rest is processed longest-first and the durations drive the ETA in the status line
+            self.app.after(0, lambda: self.app.status_label.configure(text=f"状态: 正在读取 {len(self.selected_file_paths)} 个文件的媒体信息..."))
+            batch_jobs, rejected_files = plan_batch(self.selected_file_paths, self.workflow_manager.audio_processor.probe_media, logger=self.logger)
+            for rejected_path, reject_reason in rejected_files:
+                error_count += 1
+                self.app.after(0, lambda p=rejected_path, err=reject_reason:
+                               self.combined_file_status_panel.update_file_status(p, CombinedFileStatusPanel.STATUS_ERROR, error_message=err, processing_done=True))
+            ordered_file_paths = [job_path for job_path, _ in batch_jobs]
+            audio_stream_by_file = {job_path: self.combined_file_status_panel.get_audio_stream(job_path) for job_path in ordered_file_paths}
+            remaining_media_sec = sum(duration for _, duration in batch_jobs)
+            rtf_estimator = RealTimeFactorEstimator()
+
+            # Two-tier mode: a fast draft of every file first, then the configured model refines them
+            draft_model = self.config.get("asr_draft_model", "")
+            two_tier = bool(draft_model) and draft_model != ui_settings["asr_model"]
+
+            process_workers = self.config.get("asr_process_workers", 0)
+            use_process_pool = process_workers > 1 and len(batch_jobs) > 1
+            if use_process_pool and (two_tier or ui_settings["llm_enabled"]):
+                # Workers return one final result per file: no drafts to refine, no LLM client in the workers
+                unsupported = "、".join(name for name, enabled in (("两阶段草稿/精修", two_tier), ("LLM增强", ui_settings["llm_enabled"])) if enabled)
+                self.logger.warning(f"{unsupported} 不支持多进程ASR，本批次改为单进程处理 (asr_process_workers={process_workers} 未生效)。")
+                self.app.after(0, lambda text=unsupported: self.app.status_label.configure(text=f"状态: {text} 已启用，改为单进程处理..."))
+                use_process_pool = False
+            elif use_process_pool and self.config.get("prefetch_max_files", 2):
+                self.logger.info("多进程ASR: 各工作进程并行解码各自的文件，不使用音频预取 (prefetch_max_files)。")
+
+            if use_process_pool:
+                # Folder-scale batches: several files at once in worker processes, results arrive as they finish
+                pool_processed, pool_errors = self._run_batch_in_process_pool(
+                    batch_jobs, process_workers, audio_stream_by_file,
+                    common_process_kwargs={
+                        "asr_model": ui_settings["asr_model"],
+                        "device": ui_settings["device"],
+                        "llm_enabled": False,
+                        "output_format": "srt",
+                        "current_custom_dict_path": current_dict_path,
+                        "processing_language": ui_settings["language"],
+                        "min_duration_sec": self.config.get("min_duration_sec", 1.0),
+                        "min_gap_sec": self.config.get("min_gap_sec", 0.1),
+                    }
+                )
+                processed_count += pool_processed
+                error_count += pool_errors
+            else:
+                # Decode upcoming files in the background while the current one is in ASR
+                # (the legacy "file" decode mode writes temporary WAVs and has nothing to prefetch)
+                prefetch_max_files = self.config.get("prefetch_max_files", 2)
+                decode_mode = self.config.get("audio_decode_mode", "memory")
+                if prefetch_max_files and decode_mode in ("memory", "stream") and len(ordered_file_paths) > 1:
+                    prefetcher = AudioPrefetcher(lambda p, cancel_event=None: self.workflow_manager.prefetch_audio(
+                                                     p, cancel_event=cancel_event, audio_stream=audio_stream_by_file.get(p)),
+                                                 ordered_file_paths,
+                                                 max_ahead=prefetch_max_files, logger=self.logger)
+                    prefetcher.start()
+
+                draft_items_by_file = {}
+
+                for index, (file_path, media_duration_sec) in enumerate(batch_jobs):
+                    base_filename = os.path.basename(file_path)
+                    status_prefix = f"{'草稿' if two_tier else '处理中'} ({index + 1}/{len(batch_jobs)}): {base_filename}"
+                    eta_sec = rtf_estimator.eta_seconds(remaining_media_sec)
+                    status_suffix = f" | 预计剩余 {format_duration(eta_sec)} (RTF {rtf_estimator.rtf:.2f})" if eta_sec is not None else ""
+                    self.logger.info(f"{status_prefix} ASR: {ui_settings['asr_model']}, LLM: {ui_settings['llm_enabled']}")
                 
-                self.app.after(0, lambda p=file_path: self.combined_file_status_panel.update_file_status(p, CombinedFileStatusPanel.STATUS_PROCESSING_ASR))
-                self.app.after(0, lambda sp=status_prefix: self.app.status_label.configure(text=f"状态: {sp}"))
-
-                try:
-                    llm_params = None
-                    if ui_settings["llm_enabled"]:
-                        llm_params = {
-                            "api_key": ui_settings["llm_api_key"],
-                            "base_url": self.config.get("llm_base_url"), # Use from self.config (now updated)
-                            "model_name": ui_settings["llm_model_name"],
-                            "system_prompt": ui_settings.get("llm_system_prompt", ""),
-                            "script_context": self.config.get("llm_script_context", "") # Use from self.config (now updated)
-                        }
-
-                    preview_text, structured_subtitle_data = self.workflow_manager.process_audio_to_subtitle(
-                        audio_video_path=file_path,
-                        asr_model=ui_settings["asr_model"],
-                        device=ui_settings["device"],
-                        llm_enabled=ui_settings["llm_enabled"],
-                        llm_params=llm_params, # llm_params now includes script_context from self.config
-                        output_format="srt",
-                        current_custom_dict_path=current_dict_path,
-                        processing_language=ui_settings["language"],
-                        min_duration_sec=self.config.get("min_duration_sec", 1.0),
-                        min_gap_sec=self.config.get("min_gap_sec", 0.1),
-                        # llm_script_context can be removed if WorkflowManager reliably uses it from llm_params
-                        llm_script_context=self.config.get("llm_script_context", "") 
-                    )
+                    self.app.after(0, lambda p=file_path: self.combined_file_status_panel.update_file_status(p, CombinedFileStatusPanel.STATUS_PROCESSING_ASR))
+                    self.app.after(0, lambda sp=status_prefix + status_suffix: self.app.status_label.configure(text=f"状态: {sp}"))
+                    file_started_at = time.monotonic()
+
+                    try:
+                        llm_params = None
+                        if ui_settings["llm_enabled"]:
+                            llm_params = {
+                                "api_key": ui_settings["llm_api_key"],
+                                "base_url": self.config.get("llm_base_url"), # Use from self.config (now updated)
+                                "model_name": ui_settings["llm_model_name"],
+                                "system_prompt": ui_settings.get("llm_system_prompt", ""),
+                                "script_context": self.config.get("llm_script_context", "") # Use from self.config (now updated)
+                            }
+
+                        preview_text, structured_subtitle_data = self.workflow_manager.process_audio_to_subtitle(
+                            audio_video_path=file_path,
+                            asr_model=draft_model if two_tier else ui_settings["asr_model"],
+                            device=ui_settings["device"],
+                            llm_enabled=ui_settings["llm_enabled"],
+                            llm_params=llm_params, # llm_params now includes script_context from self.config
+                            output_format="srt",
+                            current_custom_dict_path=current_dict_path,
+                            processing_language=ui_settings["language"],
+                            min_duration_sec=self.config.get("min_duration_sec", 1.0),
+                            min_gap_sec=self.config.get("min_gap_sec", 0.1),
+                            # llm_script_context can be removed if WorkflowManager reliably uses it from llm_params
+                            llm_script_context=self.config.get("llm_script_context", ""),
+                            prefetched_audio=prefetcher.get(file_path) if prefetcher else None,
+                            audio_stream=audio_stream_by_file.get(file_path),
+                            progress_callback=self._make_transcription_progress_callback(status_prefix),
+                            decoding_preset=self.config.get("asr_draft_preset", "draft") if two_tier else None
+                        )
                     
-                    self.generated_subtitle_data_map[file_path] = structured_subtitle_data
-                    # Call the new handler for successful processing
-                    self.app.after(0, lambda p=file_path, s_data=structured_subtitle_data:
-                                   self.handle_processing_success_for_combined_panel(p, s_data))
+                        self.generated_subtitle_data_map[file_path] = structured_subtitle_data
+                        if two_tier:
+                            draft_items_by_file[file_path] = list(structured_subtitle_data) # Snapshot; the editor changes the map's list
+                            self.app.after(0, lambda p=file_path: self.handle_draft_ready_for_combined_panel(p))
+                            if len(draft_items_by_file) == 1 and structured_subtitle_data:
+                                # Show the first draft right away instead of after the whole batch
+                                self.app.after(0, lambda p=file_path: self.results_panel_handler.set_main_preview_content(p))
+                        else:
+                            # Call the new handler for successful processing
+                            self.app.after(0, lambda p=file_path, s_data=structured_subtitle_data:
+                                           self.handle_processing_success_for_combined_panel(p, s_data))
                     
-                    processed_count += 1
-                    self.logger.info(f"文件 {base_filename} 处理成功。")
-
-                except Exception as e_file:
-                    error_count += 1
-                    self.logger.error(f"处理文件 {base_filename} 时发生错误: {e_file}", exc_info=True)
-                    # Update CombinedFileStatusPanel with error
-                    self.app.after(0, lambda p=file_path, err=str(e_file):
-                                   self.combined_file_status_panel.update_file_status(p, CombinedFileStatusPanel.STATUS_ERROR, error_message=err, processing_done=True))
+                        processed_count += 1
+                        file_elapsed_sec = time.monotonic() - file_started_at
+                        rtf_estimator.record(media_duration_sec, file_elapsed_sec)
+                        self.logger.info(f"文件 {base_filename} 处理成功 (耗时 {file_elapsed_sec:.1f}s, 媒体时长 {media_duration_sec:.1f}s)。")
+
+                    except Exception as e_file:
+                        error_count += 1
+                        self.logger.error(f"处理文件 {base_filename} 时发生错误: {e_file}", exc_info=True)
+                        # Update CombinedFileStatusPanel with error
+                        self.app.after(0, lambda p=file_path, err=str(e_file):
+                                       self.combined_file_status_panel.update_file_status(p, CombinedFileStatusPanel.STATUS_ERROR, error_message=err, processing_done=True))
+                    remaining_media_sec -= media_duration_sec
+
+                if two_tier and draft_items_by_file:
+                    self._refine_drafts_in_thread(draft_items_by_file, ui_settings, current_dict_path, audio_stream_by_file)
             
             final_status_msg = f"批量处理完成: {processed_count} 个成功, {error_count} 个失败。"
             self.logger.info(final_status_msg)
@@ -369,7 +465,9 @@ class MainWindow(ctk.CTkFrame):
                             first_successful_path = fp_candidate
                             break
                     
-                    if first_successful_path:
+                    if two_tier and first_successful_path and self.results_panel_handler.current_previewing_file in self.generated_subtitle_data_map:
+                        pass # A draft is already shown; rebuilding the editor would drop unapplied edits
+                    elif first_successful_path:
                         self.app.after(0, lambda path=first_successful_path: self.results_panel_handler.set_main_preview_content(path))
                     elif error_count == len(self.selected_file_paths): # All failed
                          self.app.after(0, lambda: self.results_panel_handler.set_main_preview_content(None))
@@ -389,6 +487,8 @@ class MainWindow(ctk.CTkFrame):
             self.app.after(0, lambda: self.app.status_label.configure(text="状态: 批量处理失败"))
             self.app.after(0, lambda: self.results_panel_handler.set_main_preview_content(None)) # Clear editor
         finally:
+            if prefetcher:
+                prefetcher.close()
             self.app.after(0, lambda: self.top_controls_panel.set_ui_for_processing(is_processing=False))
             self.app.after(0, self.top_controls_panel.update_start_button_state_based_on_files)
             
@@ -397,6 +497,136 @@ class MainWindow(ctk.CTkFrame):
                  self.app.after(0, lambda: self.app.status_label.configure(text=f"状态: 操作结束。"))
 
 
+    def _refine_drafts_in_thread(self, draft_items_by_file: dict, ui_settings: dict, current_dict_path: str,
+                                 audio_stream_by_file: dict):
+        """
+        Second tier of the draft-then-refine mode: re-processes every drafted file with the configured model.
+
+        Runs on the processing thread after all drafts are shown; each result is merged into the
+        draft on the UI thread by `_apply_refined_subtitles`. A failed refinement keeps the draft.
+        """
+        for index, (file_path, draft_items) in enumerate(draft_items_by_file.items()):
+            status_prefix = f"精修中 ({index + 1}/{len(draft_items_by_file)}): {os.path.basename(file_path)}"
+            self.app.after(0, lambda sp=status_prefix: self.app.status_label.configure(text=f"状态: {sp}"))
+            try:
+                _, refined_items = self.workflow_manager.process_audio_to_subtitle(
+                    audio_video_path=file_path,
+                    asr_model=ui_settings["asr_model"],
+                    device=ui_settings["device"],
+                    llm_enabled=False,
+                    output_format="srt",
+                    current_custom_dict_path=current_dict_path,
+                    processing_language=ui_settings["language"],
+                    min_duration_sec=self.config.get("min_duration_sec", 1.0),
+                    min_gap_sec=self.config.get("min_gap_sec", 0.1),
+                    audio_stream=audio_stream_by_file.get(file_path),
+                    progress_callback=self._make_transcription_progress_callback(status_prefix)
+                )
+            except Exception as e:
+                self.logger.error(f"精修 {os.path.basename(file_path)} 失败，保留草稿: {e}", exc_info=True)
+                refined_items = None
+            self.app.after(0, lambda p=file_path, base=draft_items, refined=refined_items:
+                           self._apply_refined_subtitles(p, base, refined))
+
+    def _apply_refined_subtitles(self, file_path: str, draft_items: list, refined_items: list):
+        """
+        Merges the refined subtitles of a file into its draft (UI thread).
+
+        Only the cues that differ between draft and refined result are replaced (see
+        `merge_refined_items`); cues edited in the meantime are kept. While the file has
+        unapplied edits in the editor, the refined result is discarded.
+        """
+        current_items = self.generated_subtitle_data_map.get(file_path)
+        if current_items is None: # File was removed from the list
+            return
+        base_filename = os.path.basename(file_path)
+        if not refined_items:
+            self.handle_processing_success_for_combined_panel(file_path, current_items)
+            return
+        if self.results_panel_handler.current_previewing_file == file_path and self.results_panel_handler.preview_edited:
+            self.logger.warning(f"{base_filename} 有未应用的编辑，精修结果未合并。")
+            self.app.status_label.configure(text=f"状态: {base_filename} 有未应用的编辑，已保留草稿。")
+            self.handle_processing_success_for_combined_panel(file_path, current_items)
+            return
+
+        merged_items, changed_positions, skipped_changes = merge_refined_items(draft_items, current_items, refined_items)
+        self.generated_subtitle_data_map[file_path] = merged_items
+        self.results_panel_handler.refresh_changed_items(file_path, changed_positions)
+        self.handle_processing_success_for_combined_panel(file_path, merged_items)
+        self.logger.info(f"{base_filename} 精修结果已合并: 更新 {len(changed_positions)} 行, 共 {len(merged_items)} 行"
+                         f"{f', 因手动编辑跳过 {skipped_changes} 处' if skipped_changes else ''}。")
+
+    def _run_batch_in_process_pool(self, batch_jobs: list, num_workers: int, audio_stream_by_file: dict,
+                                   common_process_kwargs: dict) -> tuple:
+        """
+        Processes a planned batch in ASR worker processes and updates the UI as each file finishes.
+
+        Returns:
+            tuple[int, int]: (processed_count, error_count)
+        """
+        processed_count = 0
+        error_count = 0
+        duration_by_file = dict(batch_jobs)
+        total_media_sec = sum(duration_by_file.values())
+        done_media_sec = 0.0
+        started_at = time.monotonic()
+
+        for file_path, _ in batch_jobs:
+            self.app.after(0, lambda p=file_path: self.combined_file_status_panel.update_file_status(p, CombinedFileStatusPanel.STATUS_PROCESSING_ASR))
+        self.app.after(0, lambda: self.app.status_label.configure(text=f"状态: 正在启动 {num_workers} 个ASR工作进程..."))
+
+        pool = self.workflow_manager.create_asr_process_pool(num_workers)
+        try:
+            jobs = [(file_path, dict(common_process_kwargs, audio_stream=audio_stream_by_file.get(file_path)))
+                    for file_path, _ in batch_jobs]
+            for finished_index, (file_path, result, error) in enumerate(pool.process_batch(jobs), 1):
+                base_filename = os.path.basename(file_path)
+                if error is not None:
+                    error_count += 1
+                    self.app.after(0, lambda p=file_path, err=str(error):
+                                   self.combined_file_status_panel.update_file_status(p, CombinedFileStatusPanel.STATUS_ERROR, error_message=err, processing_done=True))
+                else:
+                    _, structured_subtitle_data, file_elapsed_sec = result
+                    self.generated_subtitle_data_map[file_path] = structured_subtitle_data
+                    self.app.after(0, lambda p=file_path, s_data=structured_subtitle_data:
+                                   self.handle_processing_success_for_combined_panel(p, s_data))
+                    processed_count += 1
+                    self.logger.info(f"文件 {base_filename} 处理成功 (工作进程耗时 {file_elapsed_sec:.1f}s, 媒体时长 {duration_by_file[file_path]:.1f}s)。")
+
+                done_media_sec += duration_by_file[file_path]
+                status_text = f"状态: 并行处理中 ({finished_index}/{len(batch_jobs)}, {num_workers} 个进程): {base_filename} 完成"
+                elapsed_sec = time.monotonic() - started_at
+                if done_media_sec > 0 and total_media_sec > done_media_sec:
+                    eta_sec = (total_media_sec - done_media_sec) * elapsed_sec / done_media_sec
+                    status_text += f" | 预计剩余 {format_duration(eta_sec)}"
+                self.app.after(0, lambda text=status_text: self.app.status_label.configure(text=text))
+        finally:
+            pool.shutdown()
+        return processed_count, error_count
+
+    def _make_transcription_progress_callback(self, status_prefix: str, min_interval_sec: float = 0.25):
+        """
+        Returns a progress callback for `WorkflowManager.process_audio_to_subtitle` that shows the
+        transcription progress, live real-time factor and latest subtitle text in the status line.
+
+        The callback runs on the processing thread; updates are throttled to one per `min_interval_sec`
+        and handed to the Tk main loop via `after`.
+        """
+        last_update = [0.0]
+
+        def on_progress(progress, rtf, segment):
+            now = time.monotonic()
+            if now - last_update[0] < min_interval_sec and progress < 1.0:
+                return
+            last_update[0] = now
+            latest_text = segment.get("text", "")
+            if len(latest_text) > 30:
+                latest_text = latest_text[:30] + "…"
+            status_text = f"状态: {status_prefix} | 转录 {progress:.0%} (RTF {rtf:.2f}) | {latest_text}"
+            self.app.after(0, lambda text=status_text: self.app.status_label.configure(text=text))
+
+        return on_progress
+
     def handle_file_removed_from_panel(self, file_path_removed: str):
         """Callback when a file is removed from the CombinedFileStatusPanel."""
         if file_path_removed in self.selected_file_paths:
@@ -431,6 +661,15 @@ class MainWindow(ctk.CTkFrame):
             )
         self.update_export_all_button_state() # Update export buttons as results come in
 
+    def handle_draft_ready_for_combined_panel(self, file_path):
+        """Marks a file as drafted (two-tier mode): its draft can be previewed while the refinement is pending."""
+        self.combined_file_status_panel.update_file_status(file_path, CombinedFileStatusPanel.STATUS_DRAFT_DONE)
+        self.combined_file_status_panel.set_preview_button_callback(
+            file_path,
+            lambda p=file_path: self.results_panel_handler.set_main_preview_content(p)
+        )
+        self.update_export_all_button_state()
+
     # --- Config Update Callback for SettingsPanel ---
     def update_config_from_panel(self, *args):
         """
@@ -943,6 +1182,61 @@ class MainWindow(ctk.CTkFrame):
         )
         processing_thread.start()
 
+    def request_range_retranscription(self, file_path: str, start_sec: float, end_sec: float):
+        """Re-runs ASR for a time range of an already processed file (from the editor's range controls)."""
+        subtitle_items = self.generated_subtitle_data_map.get(file_path)
+        if not subtitle_items:
+            self.logger.warning(f"区间重识别: {file_path} 没有可替换的字幕数据。")
+            return
+
+        self.logger.info(f"区间重识别请求: {file_path} [{start_sec:.3f}s - {end_sec:.3f}s]")
+        self.app.status_label.configure(text=f"状态: 正在重识别 {os.path.basename(file_path)} 的区间...")
+        threading.Thread(
+            target=self._run_range_retranscription_in_thread,
+            args=(file_path, list(subtitle_items), start_sec, end_sec, self.settings_panel.get_settings()),
+            daemon=True
+        ).start()
+
+    def _run_range_retranscription_in_thread(self, file_path: str, subtitle_items: list, start_sec: float, end_sec: float,
+                                             ui_settings: dict):
+        language = ui_settings["language"]
+        try:
+            try: min_duration_sec = float(ui_settings.get("min_duration_sec", 1.0))
+            except ValueError: min_duration_sec = 1.0
+            try: min_gap_sec = float(ui_settings.get("min_gap_sec", 0.1))
+            except ValueError: min_gap_sec = 0.1
+
+            spliced_items = self.workflow_manager.retranscribe_range(
+                audio_video_path=file_path,
+                subtitle_items=subtitle_items,
+                start_sec=start_sec,
+                end_sec=end_sec,
+                asr_model=ui_settings["asr_model"],
+                device=ui_settings["device"],
+                processing_language=language,
+                min_duration_sec=min_duration_sec,
+                min_gap_sec=min_gap_sec,
+                current_custom_dict_path=ui_settings.get(f"custom_dictionary_path_{language}", ""),
+                audio_stream=self.combined_file_status_panel.get_audio_stream(file_path)
+            )
+            self.app.after(0, self.process_range_retranscription_result, file_path, spliced_items, None)
+        except Exception as e:
+            self.logger.error(f"区间重识别失败 {file_path}: {e}", exc_info=True)
+            self.app.after(0, self.process_range_retranscription_result, file_path, None, str(e))
+
+    def process_range_retranscription_result(self, file_path: str, spliced_items: list | None, error_message: str | None):
+        """Stores the spliced subtitle items and refreshes the editor. Must be called from the main thread."""
+        base_filename = os.path.basename(file_path)
+        if error_message is not None:
+            self.app.status_label.configure(text=f"状态: {base_filename} 区间重识别失败。")
+            messagebox.showerror("区间重识别失败", f"{base_filename}: {error_message}")
+        else:
+            self.generated_subtitle_data_map[file_path] = spliced_items
+            self.app.status_label.configure(text=f"状态: {base_filename} 区间重识别完成。")
+        if self.results_panel_handler.current_previewing_file == file_path:
+            self.results_panel_handler.set_main_preview_content(file_path)
+        self.update_export_all_button_state()
+
 
     def _handle_llm_enhancement_timeout(self, file_path: str):
         if file_path in self._llm_enhancement_after_ids:
@@ -1019,7 +1313,9 @@ class MainWindow(ctk.CTkFrame):
                 processing_language=self.config["language"],
                 min_duration_sec=self.config["min_duration_sec"],
                 min_gap_sec=self.config["min_gap_sec"],
-                llm_script_context=self.config["llm_script_context"] # Use from temp config
+                llm_script_context=self.config["llm_script_context"], # Use from temp config
+                audio_stream=self.combined_file_status_panel.get_audio_stream(file_path_to_process),
+                progress_callback=self._make_transcription_progress_callback(os.path.basename(file_path_to_process))
             )
             
             self.config.update(original_config_backup) # Restore original config values
@@ -5,17 +5,19 @@ class CombinedFileStatusPanel(ctk.CTkScrollableFrame):
     STATUS_PENDING = "待处理"
     STATUS_PROCESSING_ASR = "ASR处理中..."
     STATUS_ASR_DONE = "ASR完成" # Ready for LLM
+    STATUS_DRAFT_DONE = "草稿完成，精修中..." # Two-tier mode: draft can be previewed, the configured model still runs
     STATUS_PROCESSING_LLM = "LLM增强中..."
     STATUS_LLM_DONE = "增强完成"
     STATUS_ERROR = "错误"
     STATUS_LLM_FAILED = "LLM增强失败"
+    AUDIO_STREAM_DEFAULT = "默认音轨"
 
     def __init__(self, master, logger, app_ref, on_file_removed_callback=None, **kwargs): # Added app_ref
         super().__init__(master, **kwargs)
         self.logger = logger
         self.app_ref = app_ref # Store app_ref to access global config and request LLM
         self.on_file_removed_callback = on_file_removed_callback
-        # {file_path: {row_frame, name_label, status_label, generate_asr_button, preview_button, llm_enhance_button, remove_button}}
+        # {file_path: {row_frame, name_label, status_label, audio_stream_menu, audio_stream_choices, generate_asr_button, preview_button, llm_enhance_button, remove_button}}
         self.file_entries = {}
         self._current_color_index = 0
         self.rainbow_colors = [
@@ -43,13 +45,14 @@ class CombinedFileStatusPanel(ctk.CTkScrollableFrame):
         row_frame = ctk.CTkFrame(self, fg_color=bg_color)
         row_frame.pack(fill="x", pady=(2,0), padx=2)
 
-        # Configure columns: 0: filename (w3), 1: status (w2), 2: gen_asr_btn, 3: preview_btn, 4: llm_btn, 5: remove_btn (all w0)
+        # Configure columns: 0: filename (w3), 1: status (w2), 2: audio_stream_menu, 3: gen_asr_btn, 4: llm_btn, 5: preview_btn, 6: remove_btn (all w0)
         row_frame.grid_columnconfigure(0, weight=3) # Filename
         row_frame.grid_columnconfigure(1, weight=2) # Status
-        row_frame.grid_columnconfigure(2, weight=0) # Generate ASR button
-        row_frame.grid_columnconfigure(3, weight=0) # Preview button
+        row_frame.grid_columnconfigure(2, weight=0) # Audio stream selection
+        row_frame.grid_columnconfigure(3, weight=0) # Generate ASR button
         row_frame.grid_columnconfigure(4, weight=0) # LLM Enhance button
-        row_frame.grid_columnconfigure(5, weight=0) # Remove button
+        row_frame.grid_columnconfigure(5, weight=0) # Preview button
+        row_frame.grid_columnconfigure(6, weight=0) # Remove button
 
         name_label = ctk.CTkLabel(row_frame, text=base_name, anchor="w")
         name_label.grid(row=0, column=0, padx=5, pady=2, sticky="ew")
@@ -57,27 +60,34 @@ class CombinedFileStatusPanel(ctk.CTkScrollableFrame):
         status_label = ctk.CTkLabel(row_frame, text=self.STATUS_PENDING, anchor="w")
         status_label.grid(row=0, column=1, padx=5, pady=2, sticky="ew")
 
+        # Audio track selection; stays disabled until the file has been probed and has several audio streams
+        audio_stream_menu = ctk.CTkOptionMenu(row_frame, values=[self.AUDIO_STREAM_DEFAULT], width=130, state="disabled")
+        audio_stream_menu.set(self.AUDIO_STREAM_DEFAULT)
+        audio_stream_menu.grid(row=0, column=2, padx=2, pady=2, sticky="e")
+
         generate_asr_button = ctk.CTkButton(row_frame, text="生成ASR", width=80, state="normal",
                                              command=lambda p=file_path: self._request_single_file_asr(p))
-        generate_asr_button.grid(row=0, column=2, padx=(5,2), pady=2, sticky="e") # New button
+        generate_asr_button.grid(row=0, column=3, padx=(5,2), pady=2, sticky="e") # New button
 
-        # LLM Enhance button will now be at column 3
+        # LLM Enhance button will now be at column 4
         llm_enhance_button = ctk.CTkButton(row_frame, text="LLM增强", width=80, state="disabled",
                                            command=lambda p=file_path: self._request_llm_enhancement(p))
-        llm_enhance_button.grid(row=0, column=3, padx=2, pady=2, sticky="e")
+        llm_enhance_button.grid(row=0, column=4, padx=2, pady=2, sticky="e")
 
-        # Preview button will now be at column 4
+        # Preview button will now be at column 5
         preview_button = ctk.CTkButton(row_frame, text="预览", width=60, state="disabled")
-        preview_button.grid(row=0, column=4, padx=2, pady=2, sticky="e")
+        preview_button.grid(row=0, column=5, padx=2, pady=2, sticky="e")
         
         remove_button = ctk.CTkButton(row_frame, text="X", width=25, fg_color="#D9534F", hover_color="#C9302C",
                                       command=lambda p=file_path: self._remove_file_entry(p))
-        remove_button.grid(row=0, column=5, padx=(2,5), pady=2, sticky="e") # Adjusted column
+        remove_button.grid(row=0, column=6, padx=(2,5), pady=2, sticky="e") # Adjusted column
 
         self.file_entries[file_path] = {
             "row_frame": row_frame,
             "name_label": name_label,
             "status_label": status_label,
+            "audio_stream_menu": audio_stream_menu,
+            "audio_stream_choices": {self.AUDIO_STREAM_DEFAULT: None}, # Menu label -> audio stream index
             "generate_asr_button": generate_asr_button, # Added button
             "preview_button": preview_button,
             "llm_enhance_button": llm_enhance_button,
@@ -131,6 +141,12 @@ class CombinedFileStatusPanel(ctk.CTkScrollableFrame):
             else:
                 llm_enhance_button_state = "disabled"
             remove_button_state = "normal"
+        elif status == self.STATUS_DRAFT_DONE:
+            status_text_color = "#5BC0DE"
+            generate_asr_button_state = "disabled" # The refinement pass of this file is still pending
+            preview_button_state = "normal"
+            llm_enhance_button_state = "disabled" # Enhance the refined subtitles, not the draft
+            remove_button_state = "disabled"
         elif status == self.STATUS_PROCESSING_ASR:
             status_text_color = "orange"
             generate_asr_button_state = "disabled" # Disabled during ASR processing
@@ -161,6 +177,30 @@ class CombinedFileStatusPanel(ctk.CTkScrollableFrame):
         
         self.logger.info(f"Updated status for {os.path.basename(file_path)} to {display_status}. ASR Btn: {generate_asr_button_state}({generate_asr_button_text}), Preview Btn: {preview_button_state}, LLM Btn: {llm_enhance_button_state}, Remove Btn: {remove_button_state}")
 
+    def set_audio_stream_options(self, file_path, audio_streams: list):
+        """
+        Fills the per-file audio track menu from `AudioProcessor.probe_media` stream info.
+
+        The menu is only enabled when there is an actual choice (more than one audio stream).
+        """
+        if file_path not in self.file_entries:
+            return
+        entry = self.file_entries[file_path]
+        choices = {self.AUDIO_STREAM_DEFAULT: None}
+        for stream in audio_streams:
+            label = f"#{stream['audio_index']} {stream.get('language') or '未知'} ({stream.get('codec', '?')}, {stream.get('channels', 0)}ch)"
+            choices[label] = stream["audio_index"]
+        entry["audio_stream_choices"] = choices
+        entry["audio_stream_menu"].configure(values=list(choices.keys()), state="normal" if len(audio_streams) > 1 else "disabled")
+        entry["audio_stream_menu"].set(self.AUDIO_STREAM_DEFAULT)
+
+    def get_audio_stream(self, file_path):
+        """Returns the audio stream index selected for a file, or None for ffmpeg's default track."""
+        entry = self.file_entries.get(file_path)
+        if not entry:
+            return None
+        return entry["audio_stream_choices"].get(entry["audio_stream_menu"].get())
+
     def set_preview_button_callback(self, file_path, callback):
         if file_path not in self.file_entries:
             self.logger.error(f"Cannot set preview callback for {file_path}, not found.")
@@ -75,6 +75,18 @@ class ResultsPanel(ctk.CTkFrame):
         self.export_all_button = ctk.CTkButton(self.export_controls_frame, text="导出所有成功", command=self.export_all_successful, state="disabled", fg_color="#449D44", text_color_disabled="black")
         self.export_all_button.grid(row=0, column=4, padx=(5,0), pady=5, sticky="e")
 
+        # Partial re-transcription of a time range (row 1)
+        self.range_controls_frame = ctk.CTkFrame(self.export_controls_frame, fg_color="transparent")
+        self.range_controls_frame.grid(row=1, column=0, columnspan=5, padx=0, pady=(0,5), sticky="w")
+        ctk.CTkLabel(self.range_controls_frame, text="区间:").grid(row=0, column=0, padx=(0,3), pady=0, sticky="w")
+        self.range_start_entry = ctk.CTkEntry(self.range_controls_frame, width=100, placeholder_text="00:00:00,000")
+        self.range_start_entry.grid(row=0, column=1, padx=3, pady=0)
+        ctk.CTkLabel(self.range_controls_frame, text="-").grid(row=0, column=2, padx=0, pady=0)
+        self.range_end_entry = ctk.CTkEntry(self.range_controls_frame, width=100, placeholder_text="00:00:20,000")
+        self.range_end_entry.grid(row=0, column=3, padx=3, pady=0)
+        self.retranscribe_range_button = ctk.CTkButton(self.range_controls_frame, text="重识别区间", command=self.request_range_retranscription, state="disabled", fg_color="#31B0D5", text_color_disabled="black")
+        self.retranscribe_range_button.grid(row=0, column=4, padx=(5,0), pady=0, sticky="w")
+
     def set_generated_data(self, data_map):
         self.generated_subtitle_data_map = data_map
 
@@ -139,6 +151,7 @@ class ResultsPanel(ctk.CTkFrame):
         if structured_data:
             self.export_button.configure(state="normal", fg_color="#449D44") # text_color_disabled still applies if state becomes disabled
             self.insert_item_button.configure(state="normal", fg_color="#449D44")
+            self.retranscribe_range_button.configure(state="normal", fg_color="#31B0D5")
             
             for index, item in enumerate(structured_data): # Assuming structured_data is a list of SubRipItem-like objects
                 item_frame = ctk.CTkFrame(self.subtitle_editor_scrollable_frame)
@@ -184,6 +197,7 @@ class ResultsPanel(ctk.CTkFrame):
         else:
             self.export_button.configure(state="disabled", fg_color="#449D44", text_color_disabled="black")
             self.insert_item_button.configure(state="disabled", fg_color="#449D44", text_color_disabled="black")
+            self.retranscribe_range_button.configure(state="disabled", fg_color="#31B0D5", text_color_disabled="black")
             if not file_path:
                   placeholder_text = "请先选择一个文件并成功生成字幕以进行预览和编辑。"
             else:
@@ -194,6 +208,28 @@ class ResultsPanel(ctk.CTkFrame):
 
         self.logger.debug(f"Populated subtitle editor for {file_path} with {len(structured_data) if structured_data else 0} items.")
 
+    def refresh_changed_items(self, file_path, changed_indices):
+        """
+        Updates the editor rows of changed items after the data of a file was replaced in the background.
+
+        Only the given rows are rewritten when the number of items is unchanged, so the scroll
+        position and the other rows stay as they are; otherwise the editor is rebuilt.
+        """
+        if file_path != self.current_previewing_file:
+            return
+        structured_data = self.generated_subtitle_data_map.get(file_path) or []
+        if len(structured_data) != len(self.subtitle_entry_widgets):
+            self.set_main_preview_content(file_path)
+            return
+        for index in changed_indices:
+            item = structured_data[index]
+            widgets = self.subtitle_entry_widgets[index]
+            for entry, value in ((widgets['start_entry'], str(item.start)), (widgets['end_entry'], str(item.end))):
+                entry.delete(0, "end")
+                entry.insert(0, value)
+            widgets['text_entry_var'].set(item.text.replace('\n', ' \\n ') if item.text else "")
+        self.logger.debug(f"Refreshed {len(changed_indices)} changed subtitle rows for {file_path}.")
+
     def _delete_subtitle_item(self, item_list_index):
         self.logger.info(f"Attempting to delete subtitle item at list index: {item_list_index}")
         if not self.current_previewing_file:
@@ -320,6 +356,40 @@ class ResultsPanel(ctk.CTkFrame):
             self.logger.warning(f"Invalid time string format: '{time_str}'. Error: {e}")
             return None
 
+    def _parse_range_time(self, time_str):
+        """Parses a range boundary given either as HH:MM:SS,mmm or as plain seconds. Returns seconds or None."""
+        time_str = time_str.strip()
+        try:
+            return max(0.0, float(time_str))
+        except ValueError:
+            pass
+        parsed_time = self._parse_srt_time_string(time_str)
+        return parsed_time.ordinal / 1000.0 if parsed_time is not None else None
+
+    def request_range_retranscription(self):
+        if not self.current_previewing_file or not self.generated_subtitle_data_map.get(self.current_previewing_file):
+            messagebox.showwarning("无数据", "请先选择一个已成功生成字幕的文件。")
+            return
+        if self.preview_edited:
+            messagebox.showwarning("未应用的更改", "请先应用或撤销当前的编辑，再重识别区间。")
+            return
+
+        start_str = self.range_start_entry.get()
+        end_str = self.range_end_entry.get()
+        start_sec = self._parse_range_time(start_str)
+        end_sec = self._parse_range_time(end_str)
+        if start_sec is None or end_sec is None:
+            messagebox.showerror("时间格式错误", f"区间 '{start_str}' - '{end_str}' 格式无效。\n请使用 HH:MM:SS,mmm 或秒数 (例如 83.5)。")
+            return
+        if start_sec >= end_sec:
+            messagebox.showwarning("时间逻辑错误", "区间的开始时间必须早于结束时间。")
+            return
+
+        # Delegate to MainWindow, which knows the current ASR settings and runs the work off the UI thread
+        if hasattr(self.master, 'request_range_retranscription'):
+            self.retranscribe_range_button.configure(state="disabled", text_color_disabled="black")
+            self.master.request_range_retranscription(self.current_previewing_file, start_sec, end_sec)
+
     def apply_preview_changes(self):
         self.logger.info("Apply preview changes button clicked in ResultsPanel.")
         if not self.current_previewing_file:
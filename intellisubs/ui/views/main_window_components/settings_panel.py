@@ -55,7 +55,7 @@ class SettingsPanel(ctk.CTkFrame):
         self.language_label.grid(row=2, column=0, padx=(10,5), pady=5, sticky="w")
         
         self.language_var = ctk.StringVar(value=self.config.get("language", "ja")) # Stores the code e.g. "ja"
-        self.language_map = {"ja": "日本語 (Japanese)", "zh": "中文 (Chinese)", "en": "English"} # TODO: Externalize this
+        self.language_map = {"ja": "日本語 (Japanese)", "zh": "中文 (Chinese)", "en": "English", "auto": "自动检测 (Auto)"} # TODO: Externalize this
         self.language_display_options = list(self.language_map.values())
         
         current_lang_code = self.language_var.get()
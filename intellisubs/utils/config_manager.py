@@ -1,11 +1,38 @@
 # Configuration Management Utility
 import json
 import os
+import sys
 import logging
 
 DEFAULT_CONFIG_FILENAME = "config.json"
 DEFAULT_APP_DATA_SUBDIR = "IntelliSubs" # Subdirectory in user's app data folder
 
+def get_user_cache_dir(*subdirs: str) -> str:
+    """
+    Returns (and creates) a directory under the per-user IntelliSubs cache folder.
+
+    Windows: %LOCALAPPDATA%/IntelliSubs/cache (or %APPDATA%), macOS: ~/Library/Caches/IntelliSubs,
+    other platforms: $XDG_CACHE_HOME/IntelliSubs or ~/.cache/IntelliSubs. Large regenerable data
+    (decoded audio, etc.) therefore never ends up in the project directory.
+
+    Args:
+        *subdirs (str): Optional path components below the cache folder (e.g., "audio").
+
+    Returns:
+        str: Absolute path of the directory.
+    """
+    app_data = os.getenv('LOCALAPPDATA') or os.getenv('APPDATA')
+    if app_data:
+        base_dir = os.path.join(app_data, DEFAULT_APP_DATA_SUBDIR, "cache")
+    elif sys.platform == "darwin":
+        base_dir = os.path.join(os.path.expanduser("~"), "Library", "Caches", DEFAULT_APP_DATA_SUBDIR)
+    else:
+        xdg_cache_home = os.getenv('XDG_CACHE_HOME') or os.path.join(os.path.expanduser("~"), ".cache")
+        base_dir = os.path.join(xdg_cache_home, DEFAULT_APP_DATA_SUBDIR)
+    target_dir = os.path.join(base_dir, *subdirs)
+    os.makedirs(target_dir, exist_ok=True)
+    return target_dir
+
 class ConfigManager:
     def __init__(self, config_file_path: str = None, use_app_data_dir: bool = False, # Changed default for use_app_data_dir
                  project_root_dir: str = None, logger: logging.Logger = None):
@@ -67,9 +94,50 @@ class ConfigManager:
     def get_default_settings(self) -> dict:
         """Returns the default application settings."""
         return {
+            "asr_backend": "whisper", # "whisper" (faster-whisper) or "replay" (recorded/synthetic segments, for benchmarking without a model)
+            "asr_replay_path": "", # "replay" backend: JSON with recorded segments (empty: synthetic segments)
+            "asr_replay_synthetic": {}, # "replay" backend: overrides for the synthetic stream (count, language, text_chars_mean, text_chars_std, sec_per_char, gap_mean_sec, seed)
             "asr_model": "small", # "tiny", "base", "small", "medium", "large-v2", etc.
             "asr_device": "cpu",  # "cpu" or "cuda" (or "mps" for Mac if supported by backend)
-            "asr_compute_type": "float32", # for faster-whisper: "float16", "int8", "int8_float16"
+            "asr_compute_type": "auto", # "auto": calibrated settings (python -m intellisubs.core.asr_services.calibration), else float32; or "float16", "int8", "int8_float32", ...
+            "asr_cpu_threads": 0, # CTranslate2 threads when asr_compute_type is explicit (0: library default)
+            "asr_num_workers": 1, # Concurrent transcriptions per loaded model when asr_compute_type is explicit
+            "asr_process_workers": 0, # >1: batches are transcribed in this many worker processes, CPU threads split between them (not combined with asr_draft_model or LLM enhancement, which fall back to one process; no prefetching)
+            "asr_batch_size": 0, # >0: decode up to this many 30 s clips of a file at once with faster-whisper's batched pipeline (memory/stream modes)
+            "asr_parallel_chunks": 0, # >1: long files (memory/stream modes) are split at quiet points and this many chunks are decoded concurrently
+            "asr_chunk_sec": 300.0, # Target chunk length for asr_parallel_chunks
+            "asr_chunk_padding_sec": 0.5, # Neighbouring audio decoded with each chunk; repeated text at the seams is removed
+            "asr_decoding_preset": "balanced", # "draft" (greedy, several times faster, for rough cuts), "balanced" or "final" (wider beam search); RTF per preset: python -m intellisubs.core.asr_services.rtf_stats
+            "asr_word_timestamps": False, # Keep word-level timings (compact arrays, ~2 MB per hour of speech) for word-precise cue splitting; off by default since alignment adds decode time
+            "asr_draft_model": "", # Two-tier mode (e.g. "base"): every file is drafted with this model first, then the configured model refines the drafts and only changed cues are updated; empty: off
+            "asr_draft_preset": "draft", # Decoding preset of the draft pass
+            "asr_refine_model": "", # Larger model (e.g. "medium") that re-decodes only low-confidence segments; empty: off. Keep asr_model_pool_max_mb large enough for both models
+            "asr_refine_min_avg_logprob": -0.8, # Segments with a lower average token log-probability are refined
+            "asr_refine_max_no_speech_prob": 0.6, # ...or with a higher no-speech probability (likely hallucinated text)
+            "asr_refine_max_compression_ratio": 2.4, # ...or with more repetitive text (gzip compression ratio)
+            "asr_refine_padding_sec": 0.2, # Audio context decoded on each side of a refined run
+            "asr_model_pool_max_mb": 4096, # Keep recently used Whisper models loaded up to this estimated RAM budget (0: only the current one)
+            "asr_model_store_dir": "", # Imported models (scripts/download_models.py import ...); empty: per-user cache dir (e.g. ~/.cache/IntelliSubs/models)
+            "asr_offline": False, # Never download models at runtime: only imported models and the local Hugging Face cache are used
+            "asr_lazy_load": True, # Load the Whisper model in the background after the window is shown instead of at startup
+            "asr_warm_up": True, # Run a short dummy inference after loading a model so the first file is not slowed down
+            "asr_result_cache_enabled": True, # Reuse raw ASR segments when only text/timing settings changed
+            "asr_result_cache_dir": "", # Empty: per-user cache dir (e.g. ~/.cache/IntelliSubs/asr_results)
+            "asr_result_cache_max_mb": 256, # Size cap of the ASR result cache (LRU eviction)
+            "audio_decode_mode": "memory", # "memory": single ffmpeg pipe into NumPy, "stream": bounded-memory windows, "file": temp WAV files
+            "audio_stream_chunk_sec": 30.0, # Window length for "stream" decode mode
+            "audio_stream_overlap_sec": 1.0, # Overlap between consecutive windows in "stream" mode
+            "audio_cache_enabled": True, # Keep decoded PCM across runs, keyed by a content fingerprint
+            "audio_cache_dir": "", # Empty: per-user cache dir (e.g. ~/.cache/IntelliSubs/audio)
+            "audio_cache_max_mb": 4096, # LRU size cap for the decoded-audio cache
+            "vad_enabled": False, # Opt-in energy/zero-crossing VAD: only speech regions are sent to ASR
+            "vad_min_silence_sec": 0.6, # Gaps shorter than this stay inside a speech region
+            "vad_padding_sec": 0.25, # Padding kept around each speech region
+            "prefetch_max_files": 2, # Batch mode: files decoded in the background ahead of ASR (0 disables)
+            "noise_reduction_enabled": False, # Spectral-gating noise reduction before ASR (memory/stream modes)
+            "noise_reduction_db": 12.0, # Maximum attenuation of noise-only bins
+            "noise_reduction_threshold_std": 1.5, # Bins must exceed the noise profile by this many std to pass
+            "noise_reduction_profile_percentile": 10.0, # Quietest frames (percent) used for the noise profile
             
             "llm_enabled": False,
             "llm_provider": "openai", # or "local_gpt", "custom_api"
@@ -114,7 +182,8 @@ class ConfigManager:
 
             "output_directory": "output", # Relative to where user runs from, or allow absolute
             "default_export_format": "srt",
-            "language": "ja", # Default processing language
+            "language": "ja", # Default processing language; "auto" detects it per file
+            "language_detect_scan_sec": 120.0, # "auto" language: seconds from the start of a file searched for a speech sample
 
             "ui_theme": "System", # "System", "Light", "Dark"
             "ui_scaling": "100%", # e.g., "80%", "100%", "120%"
@@ -0,0 +1,59 @@
+# Benchmark: sequential vs. batched faster-whisper inference on one file
+# Usage: python scripts/benchmark_batched_asr.py <media_file> [--model small] [--batch-sizes 4 8 16]
+import argparse
+import logging
+import os
+import sys
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..")) # Assumes script is in 'scripts/'
+sys.path.insert(0, PROJECT_ROOT)
+
+from intellisubs.core.asr_services.whisper_service import WhisperService
+from intellisubs.core.audio_processing.processor import AudioProcessor
+
+
+def run_benchmark(media_path: str, model_name: str, device: str, compute_type: str, language: str,
+                  batch_sizes: list, max_seconds: float = None):
+    logger = logging.getLogger("BatchedASRBenchmark")
+    audio_processor = AudioProcessor(logger=logger)
+    audio = audio_processor.decode_audio_to_array(media_path)
+    if max_seconds:
+        audio = audio[:int(max_seconds * audio_processor.target_sample_rate)]
+    audio_sec = len(audio) / audio_processor.target_sample_rate
+    clips = audio_processor.plan_clips(audio, [(0.0, audio_sec)])
+    print(f"Audio: {audio_sec:.1f}s, {len(clips)} clips (model={model_name}, device={device}, compute_type={compute_type})")
+
+    service = WhisperService(model_name=model_name, device=device, compute_type=compute_type, logger=logger)
+    service.transcribe(audio[:audio_processor.target_sample_rate], language=language) # Warm-up
+
+    results = []
+    start = time.perf_counter()
+    segments, _ = service.transcribe(audio, language=language)
+    results.append(("sequential", time.perf_counter() - start, len(segments)))
+
+    for batch_size in batch_sizes:
+        start = time.perf_counter()
+        segments, _ = service.transcribe_batched(audio, clips, language=language, batch_size=batch_size)
+        results.append((f"batched (batch_size={batch_size})", time.perf_counter() - start, len(segments)))
+
+    baseline_sec = results[0][1]
+    print(f"{'mode':<26}{'time (s)':>10}{'RTF':>8}{'x realtime':>12}{'speedup':>9}{'segments':>10}")
+    for mode, elapsed, segment_count in results:
+        print(f"{mode:<26}{elapsed:>10.1f}{elapsed / audio_sec:>8.3f}{audio_sec / elapsed:>12.1f}"
+              f"{baseline_sec / elapsed:>9.2f}{segment_count:>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare sequential and batched faster-whisper throughput on one file.")
+    parser.add_argument("media", help="Audio/video file to transcribe")
+    parser.add_argument("--model", default="small", help="Whisper model (default: small)")
+    parser.add_argument("--device", default="cpu", help="Device (default: cpu)")
+    parser.add_argument("--compute-type", default="int8", help="Compute type (default: int8)")
+    parser.add_argument("--language", default=None, help="Language code (default: auto-detect)")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[4, 8, 16], help="Batch sizes to try (default: 4 8 16)")
+    parser.add_argument("--max-seconds", type=float, default=None, help="Only use the first N seconds of the file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(levelname)s - %(message)s")
+    run_benchmark(args.media, args.model, args.device, args.compute_type, args.language, args.batch_sizes, args.max_seconds)
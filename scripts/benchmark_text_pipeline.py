@@ -0,0 +1,72 @@
+# Benchmark: text stages (normalizer, punctuator, segmenter, pysrt conversion, formatters) on replayed/synthetic ASR output
+# Usage: python scripts/benchmark_text_pipeline.py [--count 100000] [--language ja] [--replay segments.json] [--profile]
+import argparse
+import cProfile
+import logging
+import os
+import pstats
+import sys
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..")) # Assumes script is in 'scripts/'
+sys.path.insert(0, PROJECT_ROOT)
+
+from intellisubs.core.workflow_manager import WorkflowManager
+
+
+def timed(results: list, name: str, func, *args, item_count: int = None):
+    start = time.perf_counter()
+    output = func(*args)
+    elapsed = time.perf_counter() - start
+    if item_count is None:
+        item_count = len(output[0] if isinstance(output, tuple) else output)
+    results.append((name, elapsed, item_count))
+    return output
+
+
+def run_benchmark(count: int, language: str, replay_path: str = None, seed: int = 0):
+    config = {
+        "asr_backend": "replay",
+        "asr_replay_path": replay_path or "",
+        "asr_replay_synthetic": {"count": count, "language": language, "seed": seed},
+        "language": language,
+        "audio_cache_enabled": False,
+        "asr_result_cache_enabled": False,
+        "llm_enabled": False,
+    }
+    manager = WorkflowManager(config=config, logger=logging.getLogger("TextPipelineBenchmark"))
+    results = []
+    try:
+        segments, _ = timed(results, "replay ASR", manager.asr_service.transcribe, None, language)
+        segments = timed(results, "ASR post-processing", manager._postprocess_asr_segments, segments)
+        normalized = timed(results, "normalizer", manager.normalizer.normalize_text_segments, segments)
+        punctuated = timed(results, "punctuator", manager.punctuator.add_punctuation, normalized)
+        timed(results, "segmenter", manager.segmenter.segment_into_subtitle_lines, punctuated)
+        items = timed(results, "text stages + pysrt", manager._segments_to_subtitle_items, segments)
+        for target_format in manager.formatters:
+            timed(results, f"format {target_format}", manager.export_subtitles, items, target_format, item_count=len(items))
+    finally:
+        manager.close_resources_sync()
+
+    print(f"{'stage':<24}{'time (s)':>10}{'items':>10}{'items/s':>12}")
+    for name, elapsed, item_count in results:
+        rate = item_count / elapsed if elapsed > 0 else float("inf")
+        print(f"{name:<24}{elapsed:>10.3f}{item_count:>10}{rate:>12.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the text pipeline on recorded or synthetic ASR segments, without a model.")
+    parser.add_argument("--count", type=int, default=100000, help="Number of synthetic segments (default: 100000)")
+    parser.add_argument("--language", default="ja", help="Language of the segments and stages (default: ja)")
+    parser.add_argument("--replay", default=None, help="JSON file with recorded segments instead of synthetic ones")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for synthetic segments (default: 0)")
+    parser.add_argument("--profile", action="store_true", help="Also print the top functions by cumulative time")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR, format="%(asctime)s - %(levelname)s - %(message)s")
+    if args.profile:
+        profiler = cProfile.Profile()
+        profiler.runcall(run_benchmark, args.count, args.language, args.replay, args.seed)
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+    else:
+        run_benchmark(args.count, args.language, args.replay, args.seed)
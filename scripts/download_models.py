@@ -1,74 +1,136 @@
-# Script to Download ASR Models (e.g., for faster-whisper)
-# This script helps in pre-downloading models to a known location
-# or to populate the cache, especially for CI/CD or bundled distributions.
-
-# import os
-# from faster_whisper import WhisperModel # Requires faster-whisper to be installed
-
-# Define models to download and their parameters
-# Example: (model_name, device, compute_type)
-MODELS_TO_DOWNLOAD = [
-    ("tiny", "cpu", "int8"),     # Smallest, good for quick tests
-    ("base", "cpu", "int8"),
-    ("small", "cpu", "int8"),    # Often a good default
-    ("medium", "cpu", "int8"),
-    # Add GPU versions if you plan to test/bundle them specifically
-    # ("small", "cuda", "float16"),
-    # ("medium", "cuda", "float16"),
-]
-
-# You might want to specify a custom download location for Hugging Face Hub models
-# by setting environment variables like HF_HOME or TRANSFORMERS_CACHE before running this.
-# os.environ["HF_HOME"] = os.path.join(os.getcwd(), ".hf_cache") # Example local cache
-
-
-def download_model(model_name: str, device: str = "cpu", compute_type: str = "int8"):
-    """
-    Downloads (or loads from cache if already present) a faster-whisper model.
-    """
-    print(f"Attempting to load/download model: {model_name} (device={device}, compute_type={compute_type})...")
+# Manage the local ASR model store: download, import offline bundles, quantize, verify, pre-warm
+# Models in the store (default: ~/.cache/IntelliSubs/models, config "asr_model_store_dir") are loaded by
+# name ("asr_model": "small") without network access, which is what air-gapped installations need.
+#
+# Usage:
+#   python scripts/download_models.py download small medium         # connected machine: fetch from the Hugging Face Hub
+#   python scripts/download_models.py export small small.tar.gz     # ... and bundle it with its checksums
+#   python scripts/download_models.py import small.tar.gz --quantize int8 --warm-up
+#   python scripts/download_models.py import /media/faster-whisper-medium --checksums SHA256SUMS
+#   python scripts/download_models.py verify
+#   python scripts/download_models.py list
+import argparse
+import logging
+import os
+import sys
+import tempfile
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..")) # Assumes script is in 'scripts/'
+sys.path.insert(0, PROJECT_ROOT)
+
+from intellisubs.core.asr_services.model_store import QUANTIZATIONS, LocalModelStore, read_checksum_file
+
+
+def download_models(store: LocalModelStore, names: list, quantization: str = None, overwrite: bool = False) -> list:
+    """Downloads faster-whisper models from the Hugging Face Hub into the store (needs network access); returns the stored names."""
+    from faster_whisper.utils import download_model
+
+    stored_names = []
+    os.makedirs(store.root, exist_ok=True)
+    for name in names:
+        with tempfile.TemporaryDirectory(prefix=".download-", dir=store.root) as download_dir:
+            print(f"Downloading {name} ...")
+            download_model(name, output_dir=download_dir)
+            model_dir = store.import_model(download_dir, name=name.rsplit("/", 1)[-1].replace("faster-whisper-", ""),
+                                           quantization=quantization, overwrite=overwrite)
+            stored_names.append(os.path.basename(model_dir))
+    return stored_names
+
+
+def warm_up_models(store: LocalModelStore, names: list, device: str, compute_type: str) -> int:
+    failed = 0
+    for name in names:
+        try:
+            elapsed = store.warm_up(name, device=device, compute_type=compute_type)
+            print(f"{name}: loaded and ran a dummy inference in {elapsed:.1f}s ({device}/{compute_type})")
+        except Exception as e:
+            print(f"{name}: warm-up failed: {e}")
+            failed += 1
+    return failed
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Download, import, quantize, verify and pre-warm faster-whisper models for offline use.")
+    parser.add_argument("--store", default=None, help="Model store directory (default: per-user cache dir, see asr_model_store_dir)")
+    parser.add_argument("--device", default="cpu", help="Device for --warm-up / warm-up (default: cpu)")
+    parser.add_argument("--compute-type", default="default", help="Compute type for --warm-up / warm-up (default: the stored weights' type)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    download_parser = commands.add_parser("download", help="Fetch models from the Hugging Face Hub into the store")
+    download_parser.add_argument("names", nargs="+", help="Model sizes (tiny, base, small, medium, large-v3, ...) or Hub IDs")
+
+    import_parser = commands.add_parser("import", help="Import a model directory or archive (.zip/.tar[.gz|.bz2|.xz]) without network access")
+    import_parser.add_argument("source", help="Model directory or archive")
+    import_parser.add_argument("--name", default=None, help="Name to use as asr_model (default: from the bundle or the directory name)")
+    import_parser.add_argument("--checksums", default=None, help="sha256sum-style file to verify against (default: the bundle's own)")
+
+    for command_parser in (download_parser, import_parser):
+        command_parser.add_argument("--quantize", choices=QUANTIZATIONS, default=None, help="Store the weights quantized")
+        command_parser.add_argument("--overwrite", action="store_true", help="Replace a model of the same name")
+        command_parser.add_argument("--warm-up", action="store_true", help="Load each model and run a dummy inference afterwards")
+
+    quantize_parser = commands.add_parser("quantize", help="Quantize stored models in place")
+    quantize_parser.add_argument("names", nargs="+")
+    quantize_parser.add_argument("--quantization", choices=QUANTIZATIONS, default="int8")
+
+    verify_parser = commands.add_parser("verify", help="Check stored models against their recorded checksums")
+    verify_parser.add_argument("names", nargs="*", help="Models to check (default: all)")
+
+    warm_up_parser = commands.add_parser("warm-up", help="Load stored models and run a dummy inference")
+    warm_up_parser.add_argument("names", nargs="*", help="Models to warm up (default: all)")
+
+    export_parser = commands.add_parser("export", help="Write a stored model with its checksums to a .tar.gz bundle")
+    export_parser.add_argument("name")
+    export_parser.add_argument("archive")
+
+    commands.add_parser("list", help="Show the stored models")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    store = LocalModelStore(root=args.store, logger=logging.getLogger("ModelStore"))
+
     try:
-        # The mere act of initializing WhisperModel with a name will trigger download
-        # if the model is not found in the cache.
-        # model = WhisperModel(model_name, device=device, compute_type=compute_type)
-        # del model # Release memory if any was loaded
-        # For now, as we can't run faster-whisper directly, simulate:
-        if model_name: # Check if model_name is not empty
-            print(f"Simulated: WhisperModel('{model_name}', device='{device}', compute_type='{compute_type}')")
-            print(f"Model {model_name} is now available (or was already cached).")
+        if args.command == "download":
+            names = download_models(store, args.names, quantization=args.quantize, overwrite=args.overwrite)
+        elif args.command == "import":
+            checksums = read_checksum_file(args.checksums) if args.checksums else None
+            model_dir = store.import_model(args.source, name=args.name, checksums=checksums,
+                                           quantization=args.quantize, overwrite=args.overwrite)
+            names = [os.path.basename(model_dir)]
+        elif args.command == "quantize":
+            for name in args.names:
+                store.quantize(name, args.quantization)
+            return 0
+        elif args.command == "verify":
+            failed = 0
+            for name in args.names or [manifest["name"] for manifest in store.list_models()]:
+                problems = store.verify(name)
+                print(f"{name}: {'OK' if not problems else ', '.join(problems)}")
+                failed += bool(problems)
+            return 1 if failed else 0
+        elif args.command == "warm-up":
+            names = args.names or [manifest["name"] for manifest in store.list_models()]
+            return 1 if warm_up_models(store, names, args.device, args.compute_type) else 0
+        elif args.command == "export":
+            store.export_model(args.name, args.archive)
+            return 0
         else:
-            print(f"Skipping download for empty model name.")
+            manifests = store.list_models()
+            if not manifests:
+                print(f"No models in {store.root}")
+            for manifest in manifests:
+                size_mb = sum(entry["size"] for entry in manifest["files"].values()) / (1024 * 1024)
+                print(f"{manifest['name']:<20}{manifest.get('quantization') or 'original':<10}{size_mb:>10.0f} MB  "
+                      f"imported {manifest['imported_at']}  checksums: {manifest.get('checksums_verified') or 'not verified'}")
+            return 0
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        return 1
+
+    if args.warm_up:
+        return 1 if warm_up_models(store, names, args.device, args.compute_type) else 0
+    return 0
 
-    except Exception as e:
-        print(f"Error downloading/loading model {model_name} with device {device}, compute_type {compute_type}: {e}")
-        print("Please ensure 'faster-whisper' and its dependencies (like PyTorch/CTranslate2) are correctly installed.")
-        print("If using CUDA, ensure CUDA toolkit and compatible drivers are installed.")
 
 if __name__ == "__main__":
-    print("--- IntelliSubs ASR Model Downloader ---")
-    
-    # Check if faster-whisper is importable, if not, guide user
-    try:
-        import faster_whisper
-        print(f"Found faster-whisper version: {faster_whisper.__version__}")
-    except ImportError:
-        print("Error: 'faster-whisper' library not found.")
-        print("Please install it first, e.g., by running: pip install faster-whisper")
-        print("This script cannot download models without it.")
-        exit(1) # Exit if library not found.
-
-    for model_spec in MODELS_TO_DOWNLOAD:
-        if len(model_spec) == 3:
-            name, dev, ctype = model_spec
-            download_model(name, device=dev, compute_type=ctype)
-        elif len(model_spec) == 1: # Simplified spec if only name is given
-             download_model(model_spec[0])
-        else:
-            print(f"Skipping invalid model specification: {model_spec}")
-        print("-" * 30)
-
-    print("All specified models have been processed (downloaded or loaded from cache).")
-    print("Models are typically cached by Hugging Face Transformers/faster-whisper in:")
-    print("  - Linux/macOS: ~/.cache/huggingface/hub")
-    print("  - Windows: C:\\Users\\<YourUser>\\.cache\\huggingface\\hub")
-    print("  (Or in HF_HOME if that environment variable is set).")
\ No newline at end of file
+    raise SystemExit(main())
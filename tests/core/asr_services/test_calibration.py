@@ -0,0 +1,51 @@
+# Unit tests for the ASR runtime-settings calibration
+import os
+import tempfile
+import time
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+from intellisubs.core.asr_services.calibration import ASRCalibrator, ASRTuningStore, char_error_rate
+
+# Simulated per-call latency and transcript of each compute type
+FAKE_BEHAVIOUR = {
+    "float32": (0.04, "こんにちは世界"),
+    "int8_float32": (0.01, "こんにちは世界"),
+    "int8": (0.002, "こんばんは"), # Fastest, but too inaccurate
+}
+
+class FakeModel:
+    def __init__(self, model_name, device, compute_type, cpu_threads, num_workers):
+        self.delay, self.text = FAKE_BEHAVIOUR[compute_type]
+
+    def transcribe(self, audio, beam_size, language):
+        time.sleep(self.delay)
+        return [SimpleNamespace(text=self.text)], None
+
+class TestCalibration(unittest.TestCase):
+
+    def test_picks_fastest_configuration_within_tolerance(self):
+        calibrator = ASRCalibrator("small", language="ja", tolerance=0.05, model_factory=FakeModel)
+        best, results = calibrator.run(np.zeros(16000 * 2, dtype=np.float32), thread_counts=[2], worker_counts=[1])
+
+        self.assertEqual(len(results), 3)
+        self.assertEqual(best["compute_type"], "int8_float32")
+        self.assertEqual(best["error_rate"], 0.0)
+
+    def test_char_error_rate(self):
+        self.assertEqual(char_error_rate("abcd", "abcd"), 0.0)
+        self.assertEqual(char_error_rate("abcd", "abxd"), 0.25)
+        self.assertEqual(char_error_rate("a b", "ab"), 0.0) # Whitespace is ignored
+
+    def test_tuning_store_round_trip(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "tuning.json")
+            ASRTuningStore(path).put("small", "cpu", {"compute_type": "int8", "cpu_threads": 4, "num_workers": 2})
+            store = ASRTuningStore(path)
+            self.assertEqual(store.get("small", "cpu")["cpu_threads"], 4)
+            self.assertIsNone(store.get("medium", "cpu"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+# Unit tests for the Whisper model pool
+import unittest
+
+from intellisubs.core.asr_services.model_pool import WhisperModelPool, estimate_model_memory_mb
+
+class TestWhisperModelPool(unittest.TestCase):
+
+    def setUp(self):
+        self.loaded = []
+
+        def fake_loader(model_name, device, compute_type):
+            self.loaded.append(model_name)
+            return object()
+
+        sizes = {"small": 500, "medium": 1500, "large-v3": 3000}
+        self.pool = WhisperModelPool(loader=fake_loader, max_memory_mb=2500,
+                                     estimate_fn=lambda model_name, compute_type: sizes[model_name])
+
+    def test_reuses_resident_models_and_evicts_lru(self):
+        small = self.pool.acquire("small", "cpu", "int8")
+        self.pool.acquire("medium", "cpu", "int8")
+        self.assertIs(self.pool.acquire("small", "cpu", "int8"), small) # Switching back does not reload
+        self.assertEqual(self.loaded, ["small", "medium"])
+
+        self.pool.acquire("small", "cpu", "float32") # Different compute type is a different model; 2500 MB still fits
+        self.pool.acquire("small", "cuda", "int8") # Evicts the least recently used ("medium")
+        self.assertEqual(self.pool.resident_keys(), [("small", "cpu", "int8", ""), ("small", "cpu", "float32", ""), ("small", "cuda", "int8", "")])
+
+        self.pool.acquire("large-v3", "cpu", "int8") # Exceeds the budget on its own: everything else is evicted
+        self.assertEqual(self.pool.resident_keys(), [("large-v3", "cpu", "int8", "")])
+
+    def test_pinned_model_is_kept_and_extra_model_trimmed(self):
+        self.pool.max_memory_mb = 0
+        self.pool.acquire("small", "cpu", "int8")
+        self.pool.pin("small", "cpu", "int8")
+        self.pool.acquire("medium", "cpu", "int8") # e.g. a refinement model: the pinned model is not evicted
+        self.assertEqual(self.pool.resident_keys(), [("small", "cpu", "int8", ""), ("medium", "cpu", "int8", "")])
+        self.pool.trim()
+        self.assertEqual(self.pool.resident_keys(), [("small", "cpu", "int8", "")])
+        self.pool.acquire("medium", "cpu", "int8")
+        self.assertEqual(self.loaded, ["small", "medium", "medium"])
+
+        self.pool.unpin("small", "cpu", "int8")
+        self.pool.acquire("large-v3", "cpu", "int8")
+        self.assertEqual(self.pool.resident_keys(), [("large-v3", "cpu", "int8", "")])
+
+    def test_estimate_depends_on_compute_type(self):
+        self.assertAlmostEqual(estimate_model_memory_mb("small", "float32"), 4 * estimate_model_memory_mb("small", "int8"))
+        self.assertAlmostEqual(estimate_model_memory_mb("small.en", "float16"), estimate_model_memory_mb("small", "float16"))
+
+if __name__ == '__main__':
+    unittest.main()
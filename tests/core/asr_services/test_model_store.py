@@ -0,0 +1,166 @@
+# Unit tests for the local model store (offline import, checksums, int8 re-quantization)
+import hashlib
+import os
+import struct
+import tarfile
+import tempfile
+import unittest
+
+import numpy as np
+
+from intellisubs.core.asr_services.model_store import LocalModelStore, quantize_ct2_model
+from intellisubs.core.asr_services.whisper_service import WhisperService
+
+try:
+    from ctranslate2.specs import whisper_spec
+except ImportError:
+    whisper_spec = None
+
+def _write_string(f, value):
+    f.write(struct.pack("<H", len(value) + 1) + value.encode("utf-8") + b"\0")
+
+def _write_model(model_dir, weight, bias):
+    """Writes a minimal CTranslate2 (binary version 6) model.bin with one linear layer and an alias."""
+    os.makedirs(model_dir)
+    with open(os.path.join(model_dir, "model.bin"), "wb") as f:
+        f.write(struct.pack("<I", 6))
+        _write_string(f, "WhisperSpec")
+        f.write(struct.pack("<II", 3, 2))
+        for name, value, type_id in (("decoder/projection/weight", weight, 4), ("decoder/projection/bias", bias, 4)):
+            _write_string(f, name)
+            f.write(struct.pack("<B", value.ndim) + struct.pack(f"<{value.ndim}I", *value.shape) + struct.pack("<B", type_id))
+            f.write(struct.pack("<I", value.nbytes) + value.tobytes())
+        f.write(struct.pack("<I", 1))
+        _write_string(f, "decoder/embeddings/weight")
+        _write_string(f, "decoder/projection/weight")
+    with open(os.path.join(model_dir, "config.json"), "w", encoding="utf-8") as f:
+        f.write("{}")
+
+def _tiny_whisper_spec(width=8, vocabulary_size=60):
+    """Builds a one-layer float16 WhisperSpec with random weights (same seed on every call)."""
+    rng = np.random.default_rng(0)
+    random = lambda *shape: rng.standard_normal(shape).astype(np.float16)
+    spec = whisper_spec.WhisperSpec(1, 2, 1, 2)
+
+    def layer_norm(layer):
+        layer.gamma, layer.beta = np.ones(width, np.float16), np.zeros(width, np.float16)
+
+    encoder, decoder = spec.encoder, spec.decoder
+    encoder.conv1.weight, encoder.conv1.bias = random(width, 80, 3), random(width)
+    encoder.conv2.weight, encoder.conv2.bias = random(width, width, 3), random(width)
+    encoder.position_encodings.encodings = random(1500, width)
+    decoder.embeddings.weight = random(vocabulary_size, width)
+    decoder.projection.weight = decoder.embeddings.weight.copy()
+    decoder.position_encodings.encodings = random(448, width)
+    for attention_layers, layer in [(("self_attention",), layer) for layer in encoder.layer] + \
+                                   [(("self_attention", "attention"), layer) for layer in decoder.layer]:
+        for attention_name in attention_layers:
+            attention = getattr(layer, attention_name)
+            layer_norm(attention.layer_norm)
+            out_sizes = [3 * width, width] if attention_name == "self_attention" else [width, 2 * width, width]
+            for linear, out_size in zip(attention.linear, out_sizes):
+                linear.weight, linear.bias = random(out_size, width), random(out_size)
+        layer_norm(layer.ffn.layer_norm)
+        layer.ffn.linear_0.weight, layer.ffn.linear_0.bias = random(16, width), random(16)
+        layer.ffn.linear_1.weight, layer.ffn.linear_1.bias = random(width, 16), random(width)
+    layer_norm(encoder.layer_norm)
+    layer_norm(decoder.layer_norm)
+    spec.register_vocabulary([f"token{i}" for i in range(vocabulary_size)])
+    spec.validate()
+    return spec
+
+def _read_variables(model_path):
+    variables = {}
+    with open(model_path, "rb") as f:
+        f.read(4)
+        f.read(struct.unpack("<H", f.read(2))[0])
+        f.read(4)
+        for _ in range(struct.unpack("<I", f.read(4))[0]):
+            name = f.read(struct.unpack("<H", f.read(2))[0])[:-1].decode("utf-8")
+            rank = struct.unpack("<B", f.read(1))[0]
+            shape = struct.unpack(f"<{rank}I", f.read(4 * rank))
+            type_id = struct.unpack("<B", f.read(1))[0]
+            data = f.read(struct.unpack("<I", f.read(4))[0])
+            variables[name] = (type_id, shape, data)
+        aliases = struct.unpack("<I", f.read(4))[0]
+    return variables, aliases
+
+class TestLocalModelStore(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.weight = np.array([[0.5, -1.0, 0.25], [0.0, 0.0, 0.0]], dtype=np.float16)
+        self.bundle_dir = os.path.join(self.temp_dir.name, "bundle", "faster-whisper-tiny")
+        _write_model(self.bundle_dir, self.weight, np.array([0.1, 0.2], dtype=np.float16))
+        with open(os.path.join(self.bundle_dir, "SHA256SUMS"), "w", encoding="utf-8") as f:
+            for name in ("model.bin", "config.json"):
+                with open(os.path.join(self.bundle_dir, name), "rb") as model_file:
+                    f.write(f"{hashlib.sha256(model_file.read()).hexdigest()}  {name}\n")
+        self.store = LocalModelStore(root=os.path.join(self.temp_dir.name, "store"))
+
+    def test_import_archive_verifies_and_quantizes(self):
+        archive_path = os.path.join(self.temp_dir.name, "tiny.tar.gz")
+        with tarfile.open(archive_path, "w:gz") as archive:
+            archive.add(self.bundle_dir, arcname="faster-whisper-tiny")
+
+        model_dir = self.store.import_model(archive_path, quantization="int8")
+        self.assertEqual(self.store.resolve("tiny"), model_dir)
+        self.assertEqual(self.store.resolve("small"), "small")
+        manifest = self.store.manifest("tiny")
+        self.assertEqual((manifest["checksums_verified"], manifest["quantization"]), ("SHA256SUMS", "int8"))
+        self.assertEqual(self.store.verify("tiny"), [])
+
+        variables, aliases = _read_variables(os.path.join(model_dir, "model.bin"))
+        self.assertEqual(aliases, 1)
+        type_id, shape, data = variables["decoder/projection/weight"]
+        self.assertEqual((type_id, shape), (1, (2, 3)))
+        self.assertEqual(np.frombuffer(data, dtype=np.int8).tolist(), [64, -127, 32, 0, 0, 0])
+        np.testing.assert_allclose(np.frombuffer(variables["decoder/projection/weight_scale"][2], dtype=np.float32), [127.0, 1.0])
+        self.assertEqual(variables["decoder/projection/bias"][0], 4)
+        self.assertEqual(quantize_ct2_model(model_dir)[0], 0)
+
+        with open(os.path.join(model_dir, "config.json"), "a", encoding="utf-8") as f:
+            f.write(" ")
+        self.assertEqual(self.store.verify("tiny"), ["modified: config.json"])
+
+    def test_import_rejects_checksum_mismatch(self):
+        with open(os.path.join(self.bundle_dir, "config.json"), "w", encoding="utf-8") as f:
+            f.write('{"tampered": true}')
+        with self.assertRaises(ValueError):
+            self.store.import_model(self.bundle_dir)
+        self.assertFalse(self.store.has_model("tiny"))
+        self.assertEqual(os.listdir(self.store.root), [])
+
+    def test_store_weights_are_part_of_cache_signature_and_pool_key(self):
+        self.store.import_model(self.bundle_dir)
+        service = WhisperService(model_name="tiny", lazy_load=True, model_store=self.store)
+        original = service.cache_signature()["model_store"]
+        self.assertEqual((original["path"], original["quantization"]), (self.store.path_for("tiny"), None))
+        original_key = service._pool_key("tiny", "int8")
+
+        self.store.quantize("tiny", "int8") # Same name and path, different weights
+        quantized = service.cache_signature()["model_store"]
+        self.assertEqual(quantized["quantization"], "int8")
+        self.assertNotEqual(quantized["model_sha256"], original["model_sha256"])
+        self.assertNotEqual(service._pool_key("tiny", "int8"), original_key)
+        self.assertEqual(service._pool_key("tiny", "int8")[0], self.store.path_for("tiny"))
+        self.assertNotIn("model_store", WhisperService(model_name="small", lazy_load=True, model_store=self.store).cache_signature())
+
+    @unittest.skipIf(whisper_spec is None, "ctranslate2 is not installed")
+    def test_int8_matches_ctranslate2_conversion(self):
+        """The re-quantized model.bin must be byte-identical to CTranslate2's own int8 conversion of the same weights."""
+        for name, quantization in (("float16", None), ("reference", "int8")):
+            spec = _tiny_whisper_spec()
+            spec.optimize(quantization=quantization)
+            os.makedirs(os.path.join(self.temp_dir.name, name))
+            spec.save(os.path.join(self.temp_dir.name, name))
+        quantize_ct2_model(os.path.join(self.temp_dir.name, "float16"), "int8")
+
+        with open(os.path.join(self.temp_dir.name, "float16", "model.bin"), "rb") as f:
+            quantized = f.read()
+        with open(os.path.join(self.temp_dir.name, "reference", "model.bin"), "rb") as f:
+            self.assertEqual(quantized, f.read())
+
+if __name__ == '__main__':
+    unittest.main()
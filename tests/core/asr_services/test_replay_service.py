@@ -0,0 +1,37 @@
+# Unit tests for the replay / synthetic ASR backend
+import json
+import os
+import tempfile
+import unittest
+
+from intellisubs.core.asr_services.replay_service import ReplayASRService
+
+class TestReplayASRService(unittest.TestCase):
+
+    def test_synthetic_stream_is_deterministic_and_ordered(self):
+        settings = {"count": 500, "text_chars_mean": 10, "text_chars_std": 3, "seed": 7}
+        segments, info = ReplayASRService(synthetic=settings).transcribe(None, language="zh")
+        self.assertEqual(len(segments), 500)
+        self.assertEqual(info.language, "zh")
+        self.assertEqual(segments, ReplayASRService(synthetic=settings).transcribe(None, language="zh")[0])
+        for previous, current in zip(segments, segments[1:]):
+            self.assertLessEqual(previous["end"], current["start"])
+            self.assertLess(current["start"], current["end"])
+        self.assertTrue(all(seg["text"] for seg in segments))
+
+    def test_replays_recorded_segments(self):
+        recorded = {"segments": [{"start": 0.0, "end": 1.2, "text": "hello"}], "info": {"language": "en"}}
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "segments.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(recorded, f)
+            progress_updates = []
+            service = ReplayASRService(replay_path=path)
+            segments, info = service.transcribe("ignored.wav", progress_callback=lambda p, rtf, seg: progress_updates.append(p))
+        self.assertEqual(segments, recorded["segments"])
+        self.assertEqual(info.language, "en")
+        self.assertEqual(progress_updates, [1.0])
+        self.assertEqual(service.detect_language(None), ("en", 1.0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+# Unit tests for ASRResultCache
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+from intellisubs.core.asr_services.result_cache import ASRResultCache
+
+class TestASRResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = ASRResultCache(os.path.join(self.temp_dir.name, "asr_results"), max_size_mb=1)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_key_depends_on_audio_and_decoding_params(self):
+        params = {"language": "ja", "asr": {"model": "small", "compute_type": "int8", "beam_size": 5}}
+        key = ASRResultCache.make_key("audio-a", params)
+        self.assertEqual(key, ASRResultCache.make_key("audio-a", dict(params)))
+        self.assertNotEqual(key, ASRResultCache.make_key("audio-b", params))
+        self.assertNotEqual(key, ASRResultCache.make_key("audio-a", {**params, "language": "zh"}))
+        self.assertNotEqual(key, ASRResultCache.make_key("audio-a", {**params, "asr": {**params["asr"], "beam_size": 1}}))
+
+    def test_put_get_round_trip(self):
+        key = ASRResultCache.make_key("audio-a", {"language": "auto"})
+        self.assertIsNone(self.cache.get(key))
+        segments = [{"start": 0.0, "end": 1.5, "text": "こんにちは"}]
+        self.cache.put(key, segments, SimpleNamespace(language="ja", language_probability=0.98, duration=1.5, extra="ignored"))
+
+        cached_segments, info = self.cache.get(key)
+        self.assertEqual(cached_segments, segments)
+        self.assertEqual((info.language, info.language_probability, info.duration), ("ja", 0.98, 1.5))
+
+if __name__ == '__main__':
+    unittest.main()
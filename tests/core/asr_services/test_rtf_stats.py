@@ -0,0 +1,26 @@
+# Unit tests for RTFStatsStore
+import os
+import tempfile
+import unittest
+
+from intellisubs.core.asr_services.rtf_stats import RTFStatsStore
+
+class TestRTFStatsStore(unittest.TestCase):
+
+    def test_aggregates_runs_per_preset(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = RTFStatsStore(path=os.path.join(temp_dir, "rtf.json"))
+            store.record("small", "cpu", "int8", "draft", audio_sec=100.0, elapsed_sec=5.0)
+            store.record("small", "cpu", "int8", "draft", audio_sec=300.0, elapsed_sec=25.0)
+            store.record("small", "cpu", "int8", "final", audio_sec=100.0, elapsed_sec=40.0)
+            store.record("small", "cpu", "int8", "final", audio_sec=0.0, elapsed_sec=1.0) # Ignored
+
+            summary = RTFStatsStore(path=store.path).summary()
+        draft = summary["small|cpu|int8|draft"]
+        self.assertEqual((draft["runs"], draft["audio_sec"]), (2, 400.0))
+        self.assertAlmostEqual(draft["rtf"], 30.0 / 400.0)
+        self.assertAlmostEqual(draft["last_rtf"], 25.0 / 300.0)
+        self.assertEqual(summary["small|cpu|int8|final"]["runs"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+# Unit tests for the ASR segment merge helpers
+import unittest
+
+from intellisubs.core.asr_services.segment_utils import (WindowedSegmentMerger, find_low_confidence_runs, merge_chunk_segments,
+                                                         shift_segments, stitch_clip_segments)
+
+class TestWindowedSegmentMerger(unittest.TestCase):
+
+    def test_shift_segments_copies(self):
+        segments = [{"start": 0.5, "end": 1.0, "text": "a"}]
+        shifted = shift_segments(segments, 30.0)
+        self.assertEqual(shifted[0]["start"], 30.5)
+        self.assertEqual(segments[0]["start"], 0.5, "Input segments must not be mutated")
+
+    def test_overlap_duplicates_are_dropped(self):
+        merger = WindowedSegmentMerger(overlap_sec=2.0)
+        merger.add_window(0.0, [
+            {"start": 0.0, "end": 10.0, "text": "first"},
+            {"start": 27.5, "end": 29.5, "text": "seam"}, # midpoint 28.5 < cutoff 29.0
+        ])
+        merger.add_window(28.0, [
+            {"start": 28.0, "end": 29.6, "text": "seam"}, # midpoint 28.8 < cutoff -> duplicate
+            {"start": 29.4, "end": 35.0, "text": "second"},
+        ])
+        merged = merger.flush()
+        self.assertEqual([seg["text"] for seg in merged], ["first", "seam", "second"])
+        self.assertGreaterEqual(merged[2]["start"], merged[1]["end"])
+
+    def test_empty_window_keeps_previous_seam(self):
+        merger = WindowedSegmentMerger(overlap_sec=2.0)
+        merger.add_window(0.0, [{"start": 29.2, "end": 30.0, "text": "seam"}])
+        merger.add_window(29.0, []) # Silent or failed window
+        merger.add_window(58.0, [{"start": 60.0, "end": 61.0, "text": "later"}])
+        self.assertEqual([seg["text"] for seg in merger.flush()], ["seam", "later"])
+
+    def test_stitch_clip_segments_clamps_to_clips_and_removes_overlaps(self):
+        clips = [(0.0, 10.0), (10.0, 25.0)]
+        segments = [
+            {"start": 9.0, "end": 10.8, "text": "runs past clip"},
+            {"start": 10.5, "end": 12.0, "text": "next clip"},
+            {"start": 2.0, "end": 4.0, "text": "first"},
+        ]
+        stitched = stitch_clip_segments(segments, clips)
+        self.assertEqual([seg["text"] for seg in stitched], ["first", "runs past clip", "next clip"])
+        self.assertEqual(stitched[1]["end"], 10.0)
+        self.assertEqual(stitched[2]["start"], 10.5)
+
+    def test_merge_chunk_segments_removes_seam_repeats(self):
+        first_chunk = [
+            {"start": 290.0, "end": 295.0, "text": "今日はいい天気ですね"},
+            {"start": 296.0, "end": 299.8, "text": "散歩に行きましょう"},
+        ]
+        second_chunk = [
+            {"start": 299.6, "end": 300.3, "text": "散歩に行きましょう。"}, # Whole segment repeated from the padding
+            {"start": 300.2, "end": 303.0, "text": "行きましょう、公園まで"}, # Repeated prefix
+            {"start": 305.0, "end": 308.0, "text": "はい"},
+        ]
+        merged = merge_chunk_segments([(300.0, second_chunk), (0.0, first_chunk)])
+        self.assertEqual([seg["text"] for seg in merged], ["今日はいい天気ですね", "散歩に行きましょう", "公園まで", "はい"])
+        self.assertEqual(merged[2]["start"], 300.2)
+        self.assertEqual(second_chunk[1]["text"], "行きましょう、公園まで", "Input segments must not be mutated")
+
+    def test_find_low_confidence_runs_groups_close_segments(self):
+        segments = [
+            {"start": 0.0, "end": 2.0, "avg_logprob": -0.2, "no_speech_prob": 0.01, "compression_ratio": 1.3},
+            {"start": 2.1, "end": 4.0, "avg_logprob": -1.2, "no_speech_prob": 0.02, "compression_ratio": 1.4},
+            {"start": 4.2, "end": 6.0, "avg_logprob": -0.3, "no_speech_prob": 0.01, "compression_ratio": 3.1},
+            {"start": 9.0, "end": 10.0, "avg_logprob": -0.4, "no_speech_prob": 0.9, "compression_ratio": 1.1},
+            {"start": 10.5, "end": 11.0, "text": "no confidence fields"},
+        ]
+        self.assertEqual(find_low_confidence_runs(segments), [(1, 3), (3, 4)])
+        self.assertEqual(find_low_confidence_runs(segments, max_gap_sec=5.0, min_avg_logprob=-2.0), [(2, 4)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,6 @@
 import unittest
 import logging
+import weakref
 from unittest.mock import MagicMock, patch
 
 # Attempt to import WhisperModel for type hinting and spec for MagicMock
@@ -22,7 +23,7 @@ except ImportError:
     ActualVadOptions = type('VadOptions', (object,), {}) # Added dummy
 
 
-from intellisubs.core.asr_services.whisper_service import WhisperService
+from intellisubs.core.asr_services.whisper_service import WhisperService, DECODING_PRESETS
 
 # Setup basic logging for tests
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -151,8 +152,111 @@ class TestWhisperService(unittest.TestCase):
         self.service_cpu._model.transcribe.assert_called_once_with(
             "dummy_audio.wav", 
             language="en", 
-            beam_size=5 # Default beam_size in WhisperService.transcribe
+            word_timestamps=False,
+            **DECODING_PRESETS["balanced"] # Default decoding preset of WhisperService
         )
 
+    def test_transcribe_stream_reports_progress(self):
+        """Segments are yielded lazily and each one reports progress against info.duration."""
+        mock_segments = [MagicMock(start=0.0, end=0.5, text=" first "), MagicMock(start=0.5, end=1.0, text="second")]
+        mock_info = MagicMock(duration=1.0, language="en", language_probability=0.99)
+        self.mock_whisper_model_instance.transcribe.return_value = (iter(mock_segments), mock_info)
+        progress_updates = []
+
+        segments_iterator, info_result = self.service_cpu.transcribe_stream(
+            "dummy_audio.wav", language="en",
+            progress_callback=lambda progress, rtf, segment: progress_updates.append((progress, segment["text"]))
+        )
+        self.assertIs(info_result, mock_info)
+        self.assertEqual(progress_updates, []) # Nothing is decoded before iterating
+
+        first_segment = next(segments_iterator)
+        self.assertEqual(first_segment["text"], "first")
+        self.assertEqual(progress_updates, [(0.5, "first")])
+        self.assertEqual(len(list(segments_iterator)), 1)
+        self.assertEqual(progress_updates[-1], (1.0, "second"))
+
+    def test_lazy_load_in_background_with_warm_up(self):
+        """A lazy service loads nothing at construction; the background load warms the model up once."""
+        self.MockWhisperModelClass_PATCHED.reset_mock()
+        self.mock_whisper_model_instance.transcribe.reset_mock()
+        self.mock_whisper_model_instance.transcribe.return_value = (iter([]), MagicMock(duration=1.0))
+        service = WhisperService(model_name="base", device="cpu", logger=self.logger, lazy_load=True, warm_up=True)
+        self.assertFalse(service.is_ready)
+        self.MockWhisperModelClass_PATCHED.assert_not_called()
+
+        future = service.start_background_load()
+        self.assertIs(future.result(timeout=5), self.mock_whisper_model_instance)
+        self.assertIs(service.start_background_load(), future)
+        self.assertTrue(service.is_ready)
+        self.assertEqual(self.mock_whisper_model_instance.transcribe.call_count, 1) # The warm-up inference
+
+    def test_decoding_preset_sets_transcribe_options(self):
+        """The draft preset decodes greedily without temperature fallback; unknown presets are rejected."""
+        self.mock_whisper_model_instance.transcribe.reset_mock()
+        self.mock_whisper_model_instance.transcribe.return_value = (iter([]), MagicMock(duration=1.0))
+        self.service_cpu.set_decoding_preset("draft")
+        self.service_cpu.transcribe("dummy_audio.wav", language="en")
+        _, kwargs = self.mock_whisper_model_instance.transcribe.call_args
+        self.assertEqual((kwargs["beam_size"], kwargs["best_of"], kwargs["temperature"]), (1, 1, [0.0]))
+        self.assertTrue(kwargs["vad_filter"])
+        self.assertEqual(self.service_cpu.cache_signature()["decoding_preset"], "draft")
+        with self.assertRaises(ValueError):
+            self.service_cpu.set_decoding_preset("fastest")
+
+    def test_transcribe_with_other_model_keeps_confidence_fields(self):
+        """A per-call model comes from the model pool; segments carry the decoder's confidence measures."""
+        refine_model = MagicMock()
+        refine_model.transcribe.return_value = (iter([MagicMock(start=0.0, end=1.0, text=" refined ", avg_logprob=-0.2,
+                                                               no_speech_prob=0.01, compression_ratio=1.2)]),
+                                                MagicMock(duration=1.0, language="en", language_probability=0.99))
+        self.MockWhisperModelClass_PATCHED.return_value = refine_model
+        segments, _ = self.service_cpu.transcribe("dummy_audio.wav", language="en", model_name="medium")
+        self.assertEqual(self.MockWhisperModelClass_PATCHED.call_args[0][0], "medium")
+        self.assertEqual(segments, [{"start": 0.0, "end": 1.0, "text": "refined", "avg_logprob": -0.2,
+                                     "no_speech_prob": 0.01, "compression_ratio": 1.2}])
+        self.assertEqual(self.service_cpu.model_name, "tiny")
+        self.assertIs(self.service_cpu._model, self.mock_whisper_model_instance)
+
+    def test_word_timestamps_are_kept_in_compact_store(self):
+        """With word_timestamps, each segment carries its words as parallel arrays instead of word objects."""
+        words = [MagicMock(start=0.0, end=0.4, word=" hello", probability=0.9), MagicMock(start=0.5, end=1.0, word=" there", probability=0.8)]
+        self.mock_whisper_model_instance.transcribe.return_value = (
+            iter([MagicMock(start=0.0, end=1.0, text=" hello there", words=words)]),
+            MagicMock(duration=1.0, language="en", language_probability=0.99))
+        self.service_cpu.word_timestamps = True
+        segments, _ = self.service_cpu.transcribe("dummy_audio.wav", language="en")
+        self.assertTrue(self.mock_whisper_model_instance.transcribe.call_args.kwargs["word_timestamps"])
+        self.assertEqual(segments[0]["words"].text, " hello there")
+        self.assertEqual(segments[0]["words"].starts.dtype.name, "float32")
+
+    def test_switching_models_frees_the_evicted_model_before_loading(self):
+        """With a zero pool budget the previous model is collected before the next one is built."""
+        class FakeModel:
+            pass
+
+        previous_refs = []
+        collected_before_load = []
+
+        def fake_model_class(model_name, **kwargs):
+            collected_before_load.append(all(ref() is None for ref in previous_refs))
+            model = FakeModel()
+            previous_refs.append(weakref.ref(model))
+            return model
+
+        self.MockWhisperModelClass_PATCHED.side_effect = fake_model_class
+        service = WhisperService(model_name="small", device="cpu", compute_type="int8", logger=self.logger, model_pool_max_mb=0)
+        service.update_model_and_device("medium", "cpu")
+        self.assertEqual(collected_before_load, [True, True])
+        self.assertIsNone(previous_refs[0]())
+        self.assertIs(service._model, previous_refs[1]())
+
+    def test_detect_language_uses_model_detector(self):
+        """Language detection is a single detector call, not a transcription."""
+        self.mock_whisper_model_instance.detect_language.return_value = ("zh", 0.93, [("zh", 0.93), ("ja", 0.05)])
+        language, probability = self.service_cpu.detect_language(MagicMock())
+        self.assertEqual((language, probability), ("zh", 0.93))
+        self.mock_whisper_model_instance.transcribe.assert_not_called()
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,51 @@
+# Unit tests for WordTimestampStore
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+from intellisubs.core.asr_services.word_store import WordTimestampStore
+
+def make_words(*words):
+    return [SimpleNamespace(start=start, end=end, word=text, probability=0.9) for start, end, text in words]
+
+class TestWordTimestampStore(unittest.TestCase):
+
+    def setUp(self):
+        self.first = WordTimestampStore.from_words(make_words((0.0, 0.4, " Hello"), (0.5, 0.9, " world")))
+        self.second = WordTimestampStore.from_words(make_words((2.0, 2.3, " good"), (2.4, 3.0, " morning")))
+
+    def test_concatenate_orders_words_and_keeps_one_text_buffer(self):
+        store = WordTimestampStore.concatenate([self.second, self.first])
+        self.assertEqual(len(store), 4)
+        self.assertEqual(store.text, " Hello world good morning")
+        start, end, text = store.word(2)
+        self.assertEqual((start, text), (2.0, " good"))
+        self.assertAlmostEqual(end, 2.3, places=5)
+        self.assertEqual(store.index_range(0.45, 2.35), (1, 3))
+        self.assertEqual(store.words_text(*store.index_range(0.45, 2.35)), " world good")
+        self.assertAlmostEqual(store.nearest_boundary(1.0, 0.0, 3.0), 1.45, places=5)
+
+    def test_transforms_and_serialization(self):
+        store = WordTimestampStore.concatenate([self.first, self.second])
+        shifted = store.shifted(10.0)
+        self.assertAlmostEqual(float(shifted.starts[0]), 10.0)
+        self.assertEqual(store.starts[0], 0.0, "Transforms return new stores")
+
+        replacement = WordTimestampStore.from_words(make_words((2.0, 3.0, " evening")))
+        self.assertEqual(store.splice(1.5, 3.5, replacement).text, " Hello world evening")
+
+        restored = WordTimestampStore.from_dict(store.to_dict())
+        self.assertEqual(restored.text, store.text)
+        np.testing.assert_allclose(restored.ends, store.ends, atol=1e-3)
+
+    def test_hour_of_words_stays_small(self):
+        count = 100000
+        starts = np.arange(count, dtype=np.float32) * 0.36
+        offsets = np.arange(count + 1, dtype=np.int32) * 2
+        store = WordTimestampStore(starts, starts + 0.3, "言葉" * count, offsets)
+        self.assertLess(store.nbytes, 3 * 1024 * 1024)
+        self.assertEqual(store.word(count - 1)[2], "言葉")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+# Unit tests for DecodedAudioCache
+import os
+import tempfile
+import time
+import unittest
+
+import numpy as np
+
+from intellisubs.core.audio_processing.audio_cache import DecodedAudioCache
+
+class TestDecodedAudioCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = DecodedAudioCache(os.path.join(self.temp_dir.name, "cache"), max_size_mb=1)
+        self.media_path = os.path.join(self.temp_dir.name, "clip.mp4")
+        with open(self.media_path, "wb") as f:
+            f.write(os.urandom(2 * 1024 * 1024))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _store(self, key: str, size: int) -> str:
+        partial_path = self.cache.reserve_path(key)
+        with open(partial_path, "wb") as f:
+            f.write(b"\0" * size)
+        return self.cache.commit(key, partial_path)
+
+    def test_fingerprint_depends_on_content_and_params(self):
+        key = self.cache.fingerprint(self.media_path, {"sample_rate": 16000})
+        self.assertEqual(key, self.cache.fingerprint(self.media_path, {"sample_rate": 16000}))
+        self.assertNotEqual(key, self.cache.fingerprint(self.media_path, {"sample_rate": 8000}))
+
+        with open(self.media_path, "r+b") as f:
+            f.write(b"changed")
+        os.utime(self.media_path, ns=(0, 0))
+        self.assertNotEqual(key, self.cache.fingerprint(self.media_path, {"sample_rate": 16000}))
+
+    def test_get_after_commit_and_lru_eviction(self):
+        self.assertIsNone(self.cache.get("a"))
+        path_a = self._store("a", 400 * 1024)
+        os.utime(path_a, (time.time() - 20, time.time() - 20))
+        path_b = self._store("b", 400 * 1024)
+        os.utime(path_b, (time.time() - 10, time.time() - 10))
+
+        self.assertEqual(self.cache.get("a"), path_a) # Refreshes "a", so "b" is now least recently used
+        self._store("c", 400 * 1024)
+
+        self.assertIsNotNone(self.cache.get("a"))
+        self.assertIsNone(self.cache.get("b"))
+        self.assertIsNotNone(self.cache.get("c"))
+    def test_store_array_round_trip(self):
+        pcm16 = np.array([0, 1, -1, 32767, -32768], dtype=np.int16)
+        path = self.cache.store_array("arr", pcm16)
+        self.assertEqual(self.cache.get("arr"), path)
+        np.testing.assert_array_equal(np.fromfile(path, dtype=np.int16), pcm16)
+        self.assertFalse([name for name in os.listdir(self.cache.cache_dir) if name.endswith(".partial")])
+
+if __name__ == '__main__':
+    unittest.main()
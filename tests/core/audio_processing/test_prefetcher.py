@@ -0,0 +1,74 @@
+# Unit tests for AudioPrefetcher
+import threading
+import unittest
+
+from intellisubs.core.audio_processing.prefetcher import AudioPrefetcher
+
+class TestAudioPrefetcher(unittest.TestCase):
+
+    def test_results_in_order_and_bounded_lookahead(self):
+        decoded = []
+        lock = threading.Lock()
+
+        def fake_decode(path, cancel_event=None):
+            with lock:
+                decoded.append(path)
+            if path == "bad.mp4":
+                raise RuntimeError("corrupt")
+            return path.upper()
+
+        paths = ["a.mp4", "bad.mp4", "c.mp4", "d.mp4"]
+        prefetcher = AudioPrefetcher(fake_decode, paths, max_ahead=2)
+        prefetcher.start()
+        try:
+            self.assertEqual(prefetcher.get("a.mp4"), "A.MP4")
+            self.assertIsNone(prefetcher.get("bad.mp4"), "Failed prefetch falls back to None")
+            self.assertEqual(prefetcher.get("c.mp4"), "C.MP4")
+            self.assertEqual(prefetcher.get("d.mp4"), "D.MP4")
+            self.assertIsNone(prefetcher.get("unknown.mp4"))
+        finally:
+            prefetcher.close()
+        self.assertEqual(decoded, paths)
+
+    def test_producer_waits_for_consumer(self):
+        max_ahead = 2
+        paths = [str(i) for i in range(6)]
+        lock = threading.Lock()
+        gets_requested = 0
+        violations = []
+
+        def fake_decode(path, cancel_event=None):
+            with lock:
+                # A slot is only released by `get`, so file i may start once i - max_ahead files were requested
+                if int(path) >= gets_requested + max_ahead:
+                    violations.append((path, gets_requested))
+            return path
+
+        prefetcher = AudioPrefetcher(fake_decode, paths, max_ahead=max_ahead)
+        prefetcher.start()
+        try:
+            for path in paths:
+                with lock:
+                    gets_requested += 1
+                self.assertEqual(prefetcher.get(path), path)
+        finally:
+            prefetcher.close()
+        self.assertEqual(violations, [], "Only max_ahead files may be decoded before the consumer takes one")
+
+    def test_close_cancels_running_decode(self):
+        decode_started = threading.Event()
+        decode_finished = threading.Event()
+
+        def blocking_decode(path, cancel_event=None):
+            decode_started.set()
+            cancel_event.wait() # Stands in for ffmpeg being killed through the cancel event
+            decode_finished.set()
+
+        prefetcher = AudioPrefetcher(blocking_decode, ["a.mp4", "b.mp4"], max_ahead=1)
+        prefetcher.start()
+        self.assertTrue(decode_started.wait(timeout=5))
+        prefetcher.close()
+        self.assertTrue(decode_finished.is_set(), "close() must wait for the running decode to stop")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,233 @@
+# Unit tests for AudioProcessor
+import io
+import os
+import subprocess
+import tempfile
+import threading
+import unittest
+import logging
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from intellisubs.core.audio_processing.processor import AudioProcessor, DecodeCancelledError
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+class TestAudioProcessor(unittest.TestCase):
+
+    def setUp(self):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.processor = AudioProcessor(logger=self.logger)
+
+    @patch('intellisubs.core.audio_processing.processor.ffmpeg.input')
+    def test_decode_audio_to_array_single_pipe(self, mock_input):
+        """decode_audio_to_array should run one ffmpeg process and return float32 samples."""
+        pcm = np.array([0, 16384, -16384, 32767], dtype=np.int16).tobytes()
+        mock_output = MagicMock()
+        mock_output.run.return_value = (pcm, b"")
+        mock_input.return_value.output.return_value = mock_output
+
+        audio = self.processor.decode_audio_to_array("lecture.mkv")
+
+        mock_input.assert_called_once_with("lecture.mkv")
+        output_args, output_kwargs = mock_input.return_value.output.call_args
+        self.assertEqual(output_args[0], 'pipe:')
+        self.assertEqual(output_kwargs["format"], 's16le')
+        self.assertEqual(output_kwargs["ar"], 16000)
+        self.assertEqual(output_kwargs["ac"], 1)
+        mock_output.run.assert_called_once_with(capture_stdout=True, capture_stderr=True)
+
+        self.assertEqual(audio.dtype, np.float32)
+        np.testing.assert_allclose(audio, [0.0, 0.5, -0.5, 32767 / 32768.0])
+
+    @patch('intellisubs.core.audio_processing.processor.ffmpeg.input')
+    def test_decode_with_cancel_event_kills_ffmpeg(self, mock_input):
+        """Setting cancel_event must kill a running pipe decode instead of waiting for ffmpeg."""
+        cancel_event = threading.Event()
+
+        def fake_wait(timeout=None):
+            if timeout is None:
+                return 0 # Reaping the killed process
+            cancel_event.set() # ffmpeg is still running when the batch is cancelled
+            raise subprocess.TimeoutExpired("ffmpeg", timeout)
+
+        fake_process = MagicMock()
+        fake_process.stdout = io.BytesIO(b"")
+        fake_process.stderr = io.BytesIO(b"")
+        fake_process.wait.side_effect = fake_wait
+        fake_process.poll.return_value = None
+        mock_input.return_value.output.return_value.global_args.return_value.run_async.return_value = fake_process
+
+        with self.assertRaises(DecodeCancelledError):
+            self.processor.decode_audio_to_array("a.mkv", cancel_event=cancel_event)
+        fake_process.kill.assert_called_once()
+
+    @patch('intellisubs.core.audio_processing.processor.ffmpeg.probe')
+    def test_probe_media_is_cached(self, mock_probe):
+        """probe_media should summarise the audio streams and run ffprobe only once per file."""
+        mock_probe.return_value = {
+            "format": {"format_name": "matroska,webm", "duration": "1834.5"},
+            "streams": [
+                {"index": 0, "codec_type": "video", "codec_name": "h264"},
+                {"index": 1, "codec_type": "audio", "codec_name": "aac", "sample_rate": "48000", "channels": 2, "tags": {"language": "jpn"}},
+                {"index": 2, "codec_type": "audio", "codec_name": "opus", "sample_rate": "48000", "channels": 6, "tags": {"language": "eng"}},
+            ],
+        }
+        with tempfile.NamedTemporaryFile(suffix=".mkv") as media_file:
+            info = self.processor.probe_media(media_file.name)
+            self.assertEqual(self.processor.probe_media(media_file.name), info)
+
+        mock_probe.assert_called_once()
+        self.assertAlmostEqual(info["duration"], 1834.5)
+        self.assertEqual([s["language"] for s in info["audio_streams"]], ["jpn", "eng"])
+        self.assertEqual(info["audio_streams"][1]["audio_index"], 1)
+        self.assertEqual(info["audio_streams"][1]["sample_rate"], 48000)
+
+    @patch('intellisubs.core.audio_processing.processor.ffmpeg.input')
+    def test_decode_maps_only_selected_audio_stream(self, mock_input):
+        """A language-tag selection should be resolved via probe and map only that audio stream."""
+        self.processor.probe_media = MagicMock(return_value={"duration": 10.0, "format": "matroska", "audio_streams": [
+            {"index": 1, "audio_index": 0, "codec": "aac", "sample_rate": 48000, "channels": 2, "language": "eng"},
+            {"index": 2, "audio_index": 1, "codec": "aac", "sample_rate": 48000, "channels": 2, "language": "jpn"},
+        ]})
+        mapped_stream = mock_input.return_value.__getitem__.return_value
+        mapped_stream.output.return_value.run.return_value = (np.zeros(4, dtype=np.int16).tobytes(), b"")
+
+        self.processor.decode_audio_to_array("movie.mkv", audio_stream="ja")
+
+        mock_input.return_value.__getitem__.assert_called_once_with("a:1")
+        mapped_stream.output.return_value.run.assert_called_once()
+        self.assertEqual(self.processor.get_decode_params(1)["audio_stream"], 1)
+        self.assertNotIn("audio_stream", self.processor.get_decode_params())
+        with self.assertRaises(RuntimeError):
+            self.processor.resolve_audio_stream("movie.mkv", "fr")
+
+    def test_preprocess_removes_temp_wav_for_selected_audio_stream(self):
+        """An audio file with a selected stream is extracted to a temp WAV too, which must not be left behind."""
+        def fake_extract(input_path, temp_path, audio_stream=None):
+            open(temp_path, "wb").close()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_path = os.path.join(temp_dir, "out.wav")
+            with patch.object(self.processor, "extract_audio_from_video", side_effect=fake_extract), \
+                 patch.object(self.processor, "convert_to_standard_format") as mock_convert:
+                self.processor.preprocess_audio("album.flac", output_path, audio_stream=1)
+            self.assertEqual(mock_convert.call_args.args[0], f"{output_path}.temp_extracted_audio.wav")
+            self.assertEqual(os.listdir(temp_dir), [])
+
+    def test_pcm_memmap_range_and_peaks(self):
+        """Ranges and waveform peaks should be read from the mapped PCM without loading it all."""
+        processor = AudioProcessor(target_sample_rate=10, logger=self.logger)
+        samples = (np.arange(100, dtype=np.int16) - 50) * 100
+        with tempfile.TemporaryDirectory() as temp_dir:
+            pcm_path = os.path.join(temp_dir, "audio.pcm")
+            samples.tofile(pcm_path)
+            pcm = processor.open_pcm_memmap(pcm_path)
+
+            self.assertIsInstance(pcm, np.memmap)
+            np.testing.assert_allclose(processor.read_pcm_range(pcm, 2.0, 3.5), samples[20:35] / 32768.0)
+            self.assertEqual(len(processor.read_pcm_range(pcm, 9.5, 20.0)), 5)
+
+            peaks = processor.compute_waveform_peaks(pcm, 4, start_sec=0.0, end_sec=8.0, block_peaks=3)
+            np.testing.assert_allclose(peaks[:, 0] * 32768.0, samples[[0, 20, 40, 60]])
+            np.testing.assert_allclose(peaks[:, 1] * 32768.0, samples[[19, 39, 59, 79]])
+            self.assertEqual(processor.compute_waveform_peaks(pcm, 300).shape, (300, 2)) # More buckets than samples
+            del pcm
+
+    @patch('intellisubs.core.audio_processing.processor.ffmpeg.input')
+    def test_iter_audio_chunks_overlapping_windows(self, mock_input):
+        """iter_audio_chunks should yield fixed windows with the configured overlap from the pipe."""
+        processor = AudioProcessor(target_sample_rate=10, logger=self.logger) # 10 samples per second
+        samples = np.arange(25, dtype=np.int16)
+        fake_process = MagicMock()
+        fake_process.stdout = io.BytesIO(samples.tobytes())
+        fake_process.stderr = io.BytesIO(b"")
+        fake_process.poll.return_value = 0
+        fake_process.returncode = 0
+        mock_input.return_value.output.return_value.global_args.return_value.run_async.return_value = fake_process
+
+        windows = list(processor.iter_audio_chunks("long.mp4", chunk_sec=1.0, overlap_sec=0.2))
+
+        self.assertEqual([start for start, _ in windows], [0.0, 0.8, 1.6])
+        np.testing.assert_array_equal(np.round(windows[0][1] * 32768).astype(int), np.arange(0, 10))
+        np.testing.assert_array_equal(np.round(windows[1][1] * 32768).astype(int), np.arange(8, 18))
+        np.testing.assert_array_equal(np.round(windows[2][1] * 32768).astype(int), np.arange(16, 25))
+
+    @patch('intellisubs.core.audio_processing.processor.ffmpeg.input')
+    def test_iter_audio_chunks_raises_on_ffmpeg_failure(self, mock_input):
+        """A non-zero ffmpeg exit after some windows must not yield a silently truncated stream."""
+        processor = AudioProcessor(target_sample_rate=10, logger=self.logger)
+        fake_process = MagicMock()
+        fake_process.stdout = io.BytesIO(np.arange(15, dtype=np.int16).tobytes())
+        fake_process.stderr = io.BytesIO(b"Invalid data found when processing input\n")
+        fake_process.poll.return_value = 1
+        fake_process.returncode = 1
+        mock_input.return_value.output.return_value.global_args.return_value.run_async.return_value = fake_process
+
+        with self.assertRaises(RuntimeError) as ctx:
+            list(processor.iter_audio_chunks("corrupt.mkv", chunk_sec=1.0, overlap_sec=0.2))
+        self.assertIn("Invalid data", str(ctx.exception))
+
+    def test_detect_speech_regions_and_remap(self):
+        """VAD should find the loud regions and remapping should restore original timestamps."""
+        sr = self.processor.target_sample_rate
+        rng = np.random.default_rng(0)
+        audio = (rng.standard_normal(10 * sr) * 0.001).astype(np.float32) # Quiet noise floor
+        t = np.arange(2 * sr) / sr
+        audio[2 * sr:4 * sr] += 0.3 * np.sin(2 * np.pi * 220 * t)   # "Speech" at 2-4s
+        audio[7 * sr:9 * sr] += 0.3 * np.sin(2 * np.pi * 330 * t)   # "Speech" at 7-9s
+
+        regions = self.processor.detect_speech_regions(audio, padding_sec=0.1)
+
+        self.assertEqual(len(regions), 2)
+        self.assertAlmostEqual(regions[0][0], 1.9, delta=0.05)
+        self.assertAlmostEqual(regions[0][1], 4.1, delta=0.05)
+        self.assertAlmostEqual(regions[1][0], 6.9, delta=0.05)
+
+        speech_audio = self.processor.collect_speech_audio(audio, regions)
+        first_len = (int(regions[0][1] * sr) - int(regions[0][0] * sr)) / sr
+        self.assertAlmostEqual(len(speech_audio) / sr, first_len + (int(regions[1][1] * sr) - int(regions[1][0] * sr)) / sr)
+
+        remapped = self.processor.remap_segment_times(
+            [{"start": 0.5, "end": first_len, "text": "a"}, {"start": first_len + 0.2, "end": first_len + 1.0, "text": "b"}],
+            regions
+        )
+        self.assertAlmostEqual(remapped[0]["start"], regions[0][0] + 0.5)
+        self.assertAlmostEqual(remapped[0]["end"], regions[0][1], places=3)
+        self.assertAlmostEqual(remapped[1]["start"], regions[1][0] + 0.2, places=3)
+        self.assertAlmostEqual(remapped[1]["end"], regions[1][0] + 1.0, places=3)
+    def test_detect_speech_regions_without_silence(self):
+        """Audio that never falls silent must reach ASR instead of being dropped as noise."""
+        sr = self.processor.target_sample_rate
+        rng = np.random.default_rng(1)
+        t = np.arange(10 * sr) / sr
+        envelope = 0.05 + 0.25 * (0.5 + 0.5 * np.sin(2 * np.pi * 4 * t)) # Syllable-rate loudness changes
+        continuous_speech = (rng.standard_normal(10 * sr) * envelope).astype(np.float32)
+
+        regions = self.processor.detect_speech_regions(continuous_speech)
+        covered_sec = sum(end - start for start, end in regions)
+        self.assertGreaterEqual(covered_sec, 9.0)
+
+        constant_tone = (0.2 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+        self.assertEqual(self.processor.detect_speech_regions(constant_tone), [(0.0, 10.0)])
+
+        near_silence = (rng.standard_normal(10 * sr) * 0.0005).astype(np.float32)
+        self.assertEqual(self.processor.detect_speech_regions(near_silence), [])
+
+    def test_plan_clips_packs_short_regions_and_cuts_long_ones_at_quiet_points(self):
+        sr = self.processor.target_sample_rate
+        audio = np.full(70 * sr, 0.3, dtype=np.float32)
+        audio[int(26.0 * sr):int(26.3 * sr)] = 0.0 # Pause near the end of the first 30 s window
+
+        clips = self.processor.plan_clips(audio, [(0.0, 70.0), (71.0, 72.0), (73.0, 74.0)])
+
+        self.assertTrue(26.0 <= clips[0][1] <= 26.3, clips)
+        self.assertTrue(all(end - start <= 30.0 for start, end in clips))
+        self.assertEqual(clips[0][0], 0.0)
+        self.assertTrue(all(prev[1] == cur[0] for prev, cur in zip(clips[:2], clips[1:3])))
+        self.assertEqual(clips[-1][1], 74.0) # The two short regions were packed into the last clip
+        self.assertEqual(len(clips), 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,25 @@
+# Unit tests for the multi-process ASR executor configuration
+import unittest
+
+from intellisubs.core.asr_process_pool import build_worker_config, partition_cpu_threads
+
+class TestASRProcessPool(unittest.TestCase):
+
+    def test_partition_cpu_threads(self):
+        self.assertEqual(partition_cpu_threads(4, cpu_count=32), 8)
+        self.assertEqual(partition_cpu_threads(3, cpu_count=8), 2) # Never oversubscribe
+        self.assertEqual(partition_cpu_threads(16, cpu_count=8), 1)
+
+    def test_worker_config_uses_calibrated_compute_type_and_thread_share(self):
+        config = {"asr_model": "small", "asr_compute_type": "auto", "asr_cpu_threads": 0, "llm_enabled": True}
+        worker_config = build_worker_config(config, 4, tuned_settings={"compute_type": "int8", "cpu_threads": 32}, cpu_count=32)
+
+        self.assertEqual(worker_config["asr_compute_type"], "int8")
+        self.assertEqual(worker_config["asr_cpu_threads"], 8)
+        self.assertEqual(worker_config["asr_num_workers"], 1)
+        self.assertFalse(worker_config["llm_enabled"])
+        self.assertEqual(config["asr_compute_type"], "auto") # The application config is not modified
+        self.assertEqual(build_worker_config({"asr_compute_type": "auto"}, 2, cpu_count=4)["asr_compute_type"], "float32")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,32 @@
+# Unit tests for batch planning helpers
+import unittest
+
+from intellisubs.core.batch_scheduler import plan_batch, RealTimeFactorEstimator, format_duration
+
+class TestBatchScheduler(unittest.TestCase):
+
+    def test_plan_batch_orders_longest_first_and_rejects_unreadable(self):
+        durations = {"short.mp3": 60.0, "long.mkv": 3600.0, "mid.mp4": 600.0, "also_mid.wav": 600.0}
+
+        def fake_probe(path):
+            if path == "broken.mp4":
+                raise RuntimeError("moov atom not found")
+            return {"duration": durations[path]}
+
+        jobs, rejected = plan_batch(["short.mp3", "broken.mp4", "mid.mp4", "long.mkv", "also_mid.wav"], fake_probe)
+
+        self.assertEqual([path for path, _ in jobs], ["long.mkv", "mid.mp4", "also_mid.wav", "short.mp3"])
+        self.assertEqual(rejected, [("broken.mp4", "moov atom not found")])
+
+    def test_rtf_estimator(self):
+        estimator = RealTimeFactorEstimator(smoothing=0.5)
+        self.assertIsNone(estimator.eta_seconds(100.0))
+        estimator.record(100.0, 20.0)   # RTF 0.2
+        estimator.record(100.0, 40.0)   # RTF 0.4 -> EMA 0.3
+        estimator.record(0.0, 10.0)     # Unknown duration is ignored
+        self.assertAlmostEqual(estimator.eta_seconds(1000.0), 300.0)
+        self.assertEqual(format_duration(300.0), "5:00")
+        self.assertEqual(format_duration(3725.0), "1:02:05")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+# Unit tests for partial re-transcription splicing
+import unittest
+
+import pysrt
+
+from intellisubs.core.subtitle_splice import expand_range_to_items, merge_refined_items, splice_subtitle_items
+
+def make_item(index, start_sec, end_sec, text):
+    return pysrt.SubRipItem(index=index, start=pysrt.SubRipTime(seconds=start_sec),
+                            end=pysrt.SubRipTime(seconds=end_sec), text=text)
+
+class TestSubtitleSplice(unittest.TestCase):
+
+    def setUp(self):
+        self.items = [make_item(1, 0, 4, "a"), make_item(2, 5, 9, "b"), make_item(3, 10, 14, "c"), make_item(4, 15, 19, "d")]
+
+    def test_expand_range_covers_overlapping_cues(self):
+        self.assertEqual(expand_range_to_items(self.items, 6.0, 11.0), (5.0, 14.0))
+        self.assertEqual(expand_range_to_items(self.items, 4.2, 4.8), (4.2, 4.8)) # Gap between cues stays as is
+
+    def test_splice_replaces_range_clamps_and_renumbers(self):
+        new_items = [make_item(1, 4.5, 8, "B1"), make_item(2, 8, 12, "B2"), make_item(3, 13, 16, "C")]
+        spliced = splice_subtitle_items(self.items, new_items, 5.0, 14.0)
+
+        self.assertEqual([item.text for item in spliced], ["a", "B1", "B2", "C", "d"])
+        self.assertEqual([item.index for item in spliced], [1, 2, 3, 4, 5])
+        self.assertEqual(spliced[1].start.ordinal, 5000) # Clamped into the range
+        self.assertEqual(spliced[3].end.ordinal, 14000)
+        self.assertEqual(self.items[1].text, "b") # Input is not modified
+        self.assertEqual(len(splice_subtitle_items(self.items, [], 5.0, 14.0)), 2)
+
+    def test_merge_refined_items_replaces_only_changed_cues(self):
+        draft = list(self.items)
+        refined = [make_item(1, 0, 4, "a"), make_item(2, 5, 7, "B1"), make_item(3, 7, 9, "B2"),
+                   make_item(4, 10, 14, "c"), make_item(5, 15, 19, "D")]
+        merged, changed, skipped = merge_refined_items(draft, list(draft), refined)
+        self.assertEqual([item.text for item in merged], ["a", "B1", "B2", "c", "D"])
+        self.assertEqual((changed, skipped), ([1, 2, 4], 0))
+        self.assertIs(merged[0], self.items[0]) # Unchanged cues keep their objects
+        self.assertEqual([item.index for item in merged], [1, 2, 3, 4, 5])
+
+        edited = [self.items[0], self.items[1], self.items[2], make_item(4, 15, 19, "d (edited)")]
+        merged, changed, skipped = merge_refined_items(draft, edited, refined)
+        self.assertEqual([item.text for item in merged], ["a", "B1", "B2", "c", "d (edited)"])
+        self.assertEqual((changed, skipped), ([1, 2], 1))
+
+if __name__ == '__main__':
+    unittest.main()